@@ -0,0 +1,153 @@
+"""
+Baseline schema: bridge_field_metadata, bridge_core and bridge_details as first created by init_db.
+Databases created with init_db before migrations existed can run `alembic stamp 0001` and upgrade from there.
+
+Revision ID: 0001
+Revises:
+"""
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+
+    op.create_table(
+        "bridge_field_metadata",
+        sa.Column("table_name", sa.String(length=30), nullable=False),
+        sa.Column("field_name", sa.String(length=50), nullable=False),
+        sa.Column("data_type", sa.String(length=30), nullable=True),
+        sa.Column("description", sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint("table_name", "field_name"),
+    )
+    op.create_table(
+        "bridge_core",
+        sa.Column("structure_number_008", sa.String(length=15), nullable=False),
+        sa.Column("state_code_001", sa.CHAR(length=3), nullable=True),
+        sa.Column("lat_016", sa.Float(), nullable=True),
+        sa.Column("long_017", sa.Float(), nullable=True),
+        sa.Column("geom", Geometry(geometry_type="POINT", srid=4326, spatial_index=False), nullable=True),
+        sa.Column("location_009", sa.String(length=50), nullable=True),
+        sa.Column("record_type_005a", sa.CHAR(length=1), nullable=True),
+        sa.Column("route_prefix_005b", sa.CHAR(length=1), nullable=True),
+        sa.Column("service_level_005c", sa.CHAR(length=1), nullable=True),
+        sa.Column("maintenance_021", sa.CHAR(length=2), nullable=True),
+        sa.Column("owner_022", sa.CHAR(length=2), nullable=True),
+        sa.Column("functional_class_026", sa.CHAR(length=2), nullable=True),
+        sa.Column("year_built_027", sa.Integer(), nullable=True),
+        sa.Column("traffic_lanes_on_028a", sa.Integer(), nullable=True),
+        sa.Column("traffic_lanes_und_028b", sa.Integer(), nullable=True),
+        sa.Column("adt_029", sa.Integer(), nullable=True),
+        sa.Column("design_load_031", sa.CHAR(length=1), nullable=True),
+        sa.Column("structure_kind_043a", sa.CHAR(length=1), nullable=True),
+        sa.Column("structure_type_043b", sa.CHAR(length=2), nullable=True),
+        sa.Column("deck_cond_058", sa.CHAR(length=1), nullable=True),
+        sa.Column("superstructure_cond_059", sa.CHAR(length=1), nullable=True),
+        sa.Column("substructure_cond_060", sa.CHAR(length=1), nullable=True),
+        sa.Column("channel_cond_061", sa.CHAR(length=1), nullable=True),
+        sa.Column("culvert_cond_062", sa.CHAR(length=1), nullable=True),
+        sa.Column("year_reconstructed_106", sa.Integer(), nullable=True),
+        sa.Column("bridge_condition", sa.CHAR(length=1), nullable=True),
+        sa.Column("lowest_rating", sa.Integer(), nullable=True),
+        sa.Column("deck_area", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("structure_number_008"),
+    )
+    op.create_table(
+        "bridge_details",
+        sa.Column("structure_number_008", sa.String(length=15), nullable=False),
+        sa.Column("features_desc_006a", sa.String(length=50), nullable=True),
+        sa.Column("critical_facility_006b", sa.CHAR(length=1), nullable=True),
+        sa.Column("facility_carried_007", sa.String(length=50), nullable=True),
+        sa.Column("min_vert_clr_010", sa.Float(), nullable=True),
+        sa.Column("kilometerpoint_011", sa.Float(), nullable=True),
+        sa.Column("base_hwy_network_012", sa.CHAR(length=1), nullable=True),
+        sa.Column("lrs_inv_route_013a", sa.String(length=10), nullable=True),
+        sa.Column("subroute_no_013b", sa.CHAR(length=1), nullable=True),
+        sa.Column("route_number_005d", sa.CHAR(length=5), nullable=True),
+        sa.Column("direction_005e", sa.CHAR(length=1), nullable=True),
+        sa.Column("highway_district_002", sa.CHAR(length=2), nullable=True),
+        sa.Column("county_code_003", sa.CHAR(length=3), nullable=True),
+        sa.Column("place_code_004", sa.CHAR(length=5), nullable=True),
+        sa.Column("detour_kilos_019", sa.Integer(), nullable=True),
+        sa.Column("toll_020", sa.CHAR(length=1), nullable=True),
+        sa.Column("year_adt_030", sa.Integer(), nullable=True),
+        sa.Column("appr_width_mt_032", sa.Float(), nullable=True),
+        sa.Column("median_code_033", sa.CHAR(length=1), nullable=True),
+        sa.Column("degrees_skew_034", sa.Integer(), nullable=True),
+        sa.Column("structure_flared_035", sa.CHAR(length=1), nullable=True),
+        sa.Column("railings_036a", sa.CHAR(length=1), nullable=True),
+        sa.Column("transitions_036b", sa.CHAR(length=1), nullable=True),
+        sa.Column("appr_rail_036c", sa.CHAR(length=1), nullable=True),
+        sa.Column("appr_rail_end_036d", sa.CHAR(length=1), nullable=True),
+        sa.Column("history_037", sa.CHAR(length=1), nullable=True),
+        sa.Column("navigation_038", sa.CHAR(length=1), nullable=True),
+        sa.Column("nav_vert_clr_mt_039", sa.Float(), nullable=True),
+        sa.Column("nav_horr_clr_mt_040", sa.Float(), nullable=True),
+        sa.Column("open_closed_posted_041", sa.CHAR(length=1), nullable=True),
+        sa.Column("service_on_042a", sa.CHAR(length=1), nullable=True),
+        sa.Column("service_und_042b", sa.CHAR(length=1), nullable=True),
+        sa.Column("operating_rating_064", sa.Float(), nullable=True),
+        sa.Column("opr_rating_meth_063", sa.CHAR(length=1), nullable=True),
+        sa.Column("inventory_rating_066", sa.Float(), nullable=True),
+        sa.Column("inv_rating_meth_065", sa.CHAR(length=1), nullable=True),
+        sa.Column("structural_eval_067", sa.CHAR(length=1), nullable=True),
+        sa.Column("deck_geometry_eval_068", sa.CHAR(length=1), nullable=True),
+        sa.Column("undclrenc_eval_069", sa.CHAR(length=1), nullable=True),
+        sa.Column("posting_eval_070", sa.CHAR(length=1), nullable=True),
+        sa.Column("waterway_eval_071", sa.CHAR(length=1), nullable=True),
+        sa.Column("appr_road_eval_072", sa.CHAR(length=1), nullable=True),
+        sa.Column("work_proposed_075a", sa.CHAR(length=2), nullable=True),
+        sa.Column("work_done_by_075b", sa.CHAR(length=1), nullable=True),
+        sa.Column("imp_len_mt_076", sa.Float(), nullable=True),
+        sa.Column("date_of_inspect_090", sa.String(length=5), nullable=True),
+        sa.Column("inspect_freq_months_091", sa.CHAR(length=2), nullable=True),
+        sa.Column("fracture_092a", sa.CHAR(length=3), nullable=True),
+        sa.Column("undwater_look_see_092b", sa.CHAR(length=3), nullable=True),
+        sa.Column("spec_inspect_092c", sa.CHAR(length=3), nullable=True),
+        sa.Column("fracture_last_date_093a", sa.String(length=5), nullable=True),
+        sa.Column("undwater_last_date_093b", sa.String(length=5), nullable=True),
+        sa.Column("spec_last_date_093c", sa.String(length=5), nullable=True),
+        sa.Column("bridge_imp_cost_094", sa.Integer(), nullable=True),
+        sa.Column("roadway_imp_cost_095", sa.Integer(), nullable=True),
+        sa.Column("total_imp_cost_096", sa.Integer(), nullable=True),
+        sa.Column("year_of_imp_097", sa.Integer(), nullable=True),
+        sa.Column("other_state_code_098a", sa.CHAR(length=3), nullable=True),
+        sa.Column("other_state_pcnt_098b", sa.CHAR(length=2), nullable=True),
+        sa.Column("othr_state_struc_no_099", sa.String(length=15), nullable=True),
+        sa.Column("parallel_structure_101", sa.CHAR(length=1), nullable=True),
+        sa.Column("temp_structure_103", sa.CHAR(length=1), nullable=True),
+        sa.Column("deck_structure_type_107", sa.CHAR(length=1), nullable=True),
+        sa.Column("surface_type_108a", sa.CHAR(length=1), nullable=True),
+        sa.Column("membrane_type_108b", sa.CHAR(length=1), nullable=True),
+        sa.Column("deck_protection_108c", sa.CHAR(length=1), nullable=True),
+        sa.Column("percent_adt_truck_109", sa.Integer(), nullable=True),
+        sa.Column("national_network_110", sa.CHAR(length=1), nullable=True),
+        sa.Column("pier_protection_111", sa.CHAR(length=1), nullable=True),
+        sa.Column("bridge_len_ind_112", sa.CHAR(length=1), nullable=True),
+        sa.Column("scour_critical_113", sa.CHAR(length=1), nullable=True),
+        sa.Column("future_adt_114", sa.Integer(), nullable=True),
+        sa.Column("year_of_future_adt_115", sa.Integer(), nullable=True),
+        sa.Column("min_nav_clr_mt_116", sa.Float(), nullable=True),
+        sa.Column("strahnet_highway_100", sa.CHAR(length=1), nullable=True),
+        sa.Column("traffic_direction_102", sa.CHAR(length=1), nullable=True),
+        sa.Column("highway_system_104", sa.CHAR(length=1), nullable=True),
+        sa.Column("federal_lands_105", sa.CHAR(length=1), nullable=True),
+        sa.Column("fed_agency", sa.CHAR(length=1), nullable=True),
+        sa.Column("submitted_by", sa.CHAR(length=2), nullable=True),
+        sa.ForeignKeyConstraint(["structure_number_008"], ["bridge_core.structure_number_008"]),
+        sa.PrimaryKeyConstraint("structure_number_008"),
+    )
+    op.create_index("idx_bridge_core_geom", "bridge_core", ["geom"], postgresql_using="gist")
+
+
+def downgrade():
+    op.drop_table("bridge_details")
+    op.drop_index("idx_bridge_core_geom", table_name="bridge_core")
+    op.drop_table("bridge_core")
+    op.drop_table("bridge_field_metadata")
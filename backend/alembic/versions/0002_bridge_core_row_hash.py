@@ -0,0 +1,21 @@
+"""
+Add bridge_core.row_hash used by incremental (delta) reloads.
+
+Revision ID: 0002
+Revises: 0001
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: init_db may already have added the column
+    op.execute("ALTER TABLE bridge_core ADD COLUMN IF NOT EXISTS row_hash BIGINT")
+
+
+def downgrade():
+    op.drop_column("bridge_core", "row_hash")
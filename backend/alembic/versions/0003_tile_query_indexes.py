@@ -0,0 +1,31 @@
+"""
+Partial indexes matching each filterKey ORDER BY used by the tile queries.
+
+Revision ID: 0003
+Revises: 0002
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (index name, ordered column expression), see ORDER_CLAUSES in app/utils/bridge_service.py
+TILE_INDEXES = [
+    ("ix_bridge_core_lowest_rating", "lowest_rating ASC NULLS LAST"),
+    ("ix_bridge_core_adt_029", "adt_029 DESC NULLS LAST"),
+    ("ix_bridge_core_bridge_condition", "bridge_condition ASC NULLS LAST"),
+]
+
+
+def upgrade():
+    for name, expression in TILE_INDEXES:
+        op.create_index(name, "bridge_core", [sa.text(expression)], postgresql_where=sa.text("geom IS NOT NULL"))
+    op.execute("ANALYZE bridge_core")
+
+
+def downgrade():
+    for name, _ in TILE_INDEXES:
+        op.drop_index(name, table_name="bridge_core")
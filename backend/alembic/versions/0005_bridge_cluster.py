@@ -0,0 +1,36 @@
+"""
+Per-zoom bridge_cluster summary table used for low-zoom aggregation tiles.
+
+Revision ID: 0005
+Revises: 0004
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "bridge_cluster",
+        sa.Column("zoom", sa.SmallInteger(), nullable=False),
+        sa.Column("cell_x", sa.Integer(), nullable=False),
+        sa.Column("cell_y", sa.Integer(), nullable=False),
+        sa.Column("lat", sa.Float(), nullable=True),
+        sa.Column("lon", sa.Float(), nullable=True),
+        sa.Column("bridge_count", sa.Integer(), nullable=False),
+        sa.Column("worst_lowest_rating", sa.Integer(), nullable=True),
+        sa.Column("max_adt_029", sa.Integer(), nullable=True),
+        sa.Column("good_count", sa.Integer(), nullable=False),
+        sa.Column("fair_count", sa.Integer(), nullable=False),
+        sa.Column("poor_count", sa.Integer(), nullable=False),
+        sa.Column("unknown_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("zoom", "cell_x", "cell_y"),
+    )
+
+
+def downgrade():
+    op.drop_table("bridge_cluster")
@@ -0,0 +1,35 @@
+"""
+Materialized per-tile top-N table (bridge_tile_top) keyed by (zoom, x, y, filter_key).
+
+The table starts empty and unstamped (dataset_version.tile_top_version), so tile
+queries stay live until the next load or `python -m app.db.tile_top` builds it.
+
+Revision ID: 0006
+Revises: 0005
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "bridge_tile_top",
+        sa.Column("zoom", sa.SmallInteger(), nullable=False),
+        sa.Column("x", sa.Integer(), nullable=False),
+        sa.Column("y", sa.Integer(), nullable=False),
+        sa.Column("filter_key", sa.String(length=32), nullable=False),
+        sa.Column("structure_numbers", postgresql.ARRAY(sa.String(length=15)), nullable=False),
+        sa.PrimaryKeyConstraint("zoom", "x", "y", "filter_key"),
+    )
+    op.add_column("dataset_version", sa.Column("tile_top_version", sa.BigInteger()))
+
+
+def downgrade():
+    op.drop_column("dataset_version", "tile_top_version")
+    op.drop_table("bridge_tile_top")
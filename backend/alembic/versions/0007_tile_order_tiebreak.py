@@ -0,0 +1,36 @@
+"""
+Add the structure number tie-breaker (C collation) to the filterKey ordering indexes.
+
+Revision ID: 0007
+Revises: 0006
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# (index name, ordered column expression), see ORDER_CLAUSES in app/utils/bridge_service.py
+TILE_INDEXES = [
+    ("ix_bridge_core_lowest_rating", "lowest_rating ASC NULLS LAST"),
+    ("ix_bridge_core_adt_029", "adt_029 DESC NULLS LAST"),
+    ("ix_bridge_core_bridge_condition", "bridge_condition ASC NULLS LAST"),
+]
+
+
+def _recreate(columns: list):
+    for name, expression in TILE_INDEXES:
+        op.drop_index(name, table_name="bridge_core")
+        op.create_index(name, "bridge_core", [sa.text(expression)] + [sa.text(c) for c in columns],
+                        postgresql_where=sa.text("geom IS NOT NULL"))
+
+
+def upgrade():
+    _recreate(['structure_number_008 COLLATE "C"'])
+    op.execute("ANALYZE bridge_core")
+
+
+def downgrade():
+    _recreate([])
@@ -0,0 +1,64 @@
+"""
+Narrow map points table (bridge_map_points) with per-filterKey ranking keys.
+
+The table starts empty and unstamped (dataset_version.map_points_version), so tile
+queries keep reading bridge_core until the next load or `python -m app.db.map_points` fills it.
+
+Revision ID: 0008
+Revises: 0007
+"""
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# (index name, ranking key), see RANK_COLUMNS in app/db/map_points.py
+RANK_INDEXES = [
+    ("ix_bridge_map_points_lowest_rating", "rank_lowest_rating"),
+    ("ix_bridge_map_points_adt_029", "rank_adt_029"),
+    ("ix_bridge_map_points_bridge_condition", "rank_bridge_condition"),
+]
+
+
+def upgrade():
+    op.create_table(
+        "bridge_map_points",
+        sa.Column("lat_016", sa.Float()),
+        sa.Column("long_017", sa.Float()),
+        sa.Column("deck_area", sa.Float()),
+        sa.Column("year_built_027", sa.Integer()),
+        sa.Column("adt_029", sa.Integer()),
+        sa.Column("year_reconstructed_106", sa.Integer()),
+        sa.Column("lowest_rating", sa.Integer()),
+        sa.Column("rank_lowest_rating", sa.Integer(), nullable=False),
+        sa.Column("rank_adt_029", sa.Integer(), nullable=False),
+        sa.Column("rank_bridge_condition", sa.SmallInteger(), nullable=False),
+        sa.Column("bridge_condition", sa.CHAR(1)),
+        sa.Column("deck_cond_058", sa.CHAR(1)),
+        sa.Column("superstructure_cond_059", sa.CHAR(1)),
+        sa.Column("substructure_cond_060", sa.CHAR(1)),
+        sa.Column("channel_cond_061", sa.CHAR(1)),
+        sa.Column("culvert_cond_062", sa.CHAR(1)),
+        sa.Column("state_code_001", sa.CHAR(3)),
+        sa.Column("structure_number_008", sa.String(length=15), nullable=False),
+        sa.Column("geom", Geometry(geometry_type="POINT", srid=4326, spatial_index=False), nullable=False),
+        sa.PrimaryKeyConstraint("structure_number_008"),
+    )
+
+    op.create_index(
+        "idx_bridge_map_points_geom", "bridge_map_points", ["geom"], postgresql_using="gist",
+        postgresql_include=["rank_lowest_rating", "rank_adt_029", "rank_bridge_condition", "structure_number_008"],
+    )
+    for name, column in RANK_INDEXES:
+        op.create_index(name, "bridge_map_points", [sa.text(column), sa.text('structure_number_008 COLLATE "C"')],
+                        postgresql_include=["geom"])
+    op.add_column("dataset_version", sa.Column("map_points_version", sa.BigInteger()))
+
+
+def downgrade():
+    op.drop_column("dataset_version", "map_points_version")
+    op.drop_table("bridge_map_points")
@@ -4,8 +4,14 @@ from fastapi import APIRouter
 """
 from fastapi import APIRouter
 from app.api.endpoints import bridges
+from app.core.config import settings
 
 api_router = APIRouter()
 
+# Async tile/detail handlers are matched first so they take over those paths
+if settings.ASYNC_DB:
+    from app.api.endpoints import bridges_async
+    api_router.include_router(bridges_async.router, prefix="/bridges", tags=["bridges"])
+
 # Include all routes from bridges.py under the /bridges path
-api_router.include_router(bridges.router, prefix="/bridges", tags=["bridges"])
\ No newline at end of file
+api_router.include_router(bridges.router, prefix="/bridges", tags=["bridges"])
@@ -19,92 +19,367 @@ Endpoints:
         • `zoom` (int): Tile zoom level
         • `filterKey` (str): One of ["lowestRating", "highestADT", "worstBridgeCondition"]
         • `limit` (int): Max records to return
+        • `format` (str): `rows` (list of objects, default) or `columnar` (parallel arrays per field)
+    - Rows are written straight to JSON without a Pydantic model per bridge.
+    - `Accept: application/vnd.apache.arrow.stream` or `application/vnd.bridges.packed` returns a
+      columnar binary body instead (see app/utils/tile_formats.py); gzip/brotli per Accept-Encoding.
+    - Every response carries an `X-Tile-Have` token; tokens sent back in the body's `have` list
+      leave out bridges the client already received (see app/utils/viewport_diff.py).
 
-3. GET `/api/bridges/detail/{structure_number}`
+3. POST `/api/bridges/clusters`
+    - Accepts the same tile payload as `/batch` (zoom 0-10) and returns precomputed grid clusters:
+      bridge count, worst lowest rating, max ADT and a condition histogram per cell.
+
+4. GET `/api/bridges/export`
+    - Streams bridge core rows as NDJSON (default) or CSV straight from a server-side cursor.
+    - Query Params: `format`, `state` (repeatable), `bbox` (west,south,east,north),
+      `min_lowest_rating`, `max_lowest_rating`, `min_adt`, `bridge_condition` (repeatable),
+      `after` (keyset cursor: last structure number received), `limit`.
+
+5. GET `/api/bridges/cache/stats`
+    - Hit/miss counters, entry count and byte size of the per-tile result cache, plus
+      single-flight counters (queries executed and saved by sharing an in-flight one).
+
+6. GET `/api/bridges/db/stats`
+    - Per read workload (tiles, details): each replica and the primary fallback with its health
+      and sessions opened, plus failover count (see app/db/routing.py).
+
+7. GET `/api/bridges/statements/stats`
+    - Prepare/execute counts and timings of the tile statements per query kind and filterKey.
+
+8. GET `/api/bridges/tiles/{z}/{x}/{y}.mvt`
+    - Bridges of one XYZ tile as a Mapbox Vector Tile built by PostGIS.
+    - Query Params: `filterKey` (str) and `limit` (int, features per tile).
+    - Feature attributes are thinned at low zooms; ETag follows the dataset version (304 on match).
+
+9. GET `/api/bridges/detail/{structure_number}`
     - Fetches detailed info for a specific bridge by its structure number.
+    - Payloads are cached per dataset version; ETag follows the dataset version (304 on match).
+
+10. POST `/api/bridges/details`
+    - Accepts `{"structure_numbers": [...]}` (up to DETAIL_BATCH_MAX) and returns the details of
+      every known bridge in request order with one query for the uncached ones.
+    - ETag covers the dataset version and the requested structure numbers (304 on match).
 
 Raises:
 --------
 - 400 Bad Request: If query parameters or tile input are invalid
+- 406 Not Acceptable: If the Accept header allows none of the offered formats
 - 404 Not Found: If a specific bridge structure number doesn't exist
 - 500 Internal Server Error: For unhandled database or server issues
 """
-from fastapi import APIRouter, Depends, Query, Body, HTTPException
+from fastapi import APIRouter, Depends, Query, Body, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from typing import List
-from app.db.session import get_db
-from app.db.models import BridgeCore, BridgeDetails
-from app.schemas.bridge import BridgeCoreResponse, TileBatchRequest, BridgeDetailsResponse
-from app.utils.bridge_service import tile_to_bbox, single_tile_query, batch_tile_query
+from sqlalchemy import select, text
+from typing import List, Optional
+from app.db.session import get_db, get_detail_db, get_tile_db, detail_router, tile_router
+from app.db.tables import bridge_core
+from app.schemas.bridge import (
+    BridgeCoreResponse, TileBatchRequest, BridgeDetailsResponse, BridgeDetailsBatchRequest, BridgeClusterResponse,
+    BridgeExportFilters
+)
+from app.core.config import settings
+from app.core.metrics import timed
+from app.db.clusters import CLUSTER_MAX_ZOOM
+from app.db.dataset_version import current_dataset_version
+from app.db.prepared import statement_stats
+from app.utils.bridge_service import (
+    ORDER_CLAUSES, TILE_COLUMNS, cluster_tile_query, fetch_tile_bridges, tile_cache, tile_flights
+)
+from app.utils.detail_service import detail_etag, fetch_bridge_details, join_details
+from app.utils.export_service import EXPORT_FORMATS, stream_export
+from app.utils.fast_json import TILE_FORMATS
+from app.utils.tile_formats import compress_body, encode_tile_body, negotiate_media_type
+from app.utils.vector_tiles import MVT_MEDIA_TYPE, mvt_etag, mvt_tile, tile_in_range
+from app.utils.viewport_diff import HAVE_HEADER, decode_have_token, diff_tile_rows
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def validate_tile_request(req: TileBatchRequest, limit: int, filterKey: str, format: str = "rows"):
+    # Validate tile input
+    if not req.tiles:
+        raise HTTPException(status_code=400, detail="Tiles list cannot be empty.")
+    
+    # Validate limit
+    if limit <= 0:
+        raise HTTPException(status_code=400, detail="Limit must be a positive integer.")
+    if limit > settings.TILE_LIMIT_MAX:
+        raise HTTPException(status_code=400, detail=f"Limit must be at most {settings.TILE_LIMIT_MAX}.")
+
+    # filterKey must map to a SQL ORDER BY clause
+    if filterKey not in ORDER_CLAUSES:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid filterKey. Must be one of: lowestRating, highestADT, worstBridgeCondition."
+        )
+
+    # Response layout
+    if format not in TILE_FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format. Must be one of: rows, columnar.")
+
+
+def validate_have_tokens(req: TileBatchRequest) -> list:
+    # "Already have" tokens are bounded in number and must parse
+    if len(req.have) > settings.TILE_HAVE_MAX_TOKENS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.TILE_HAVE_MAX_TOKENS} have tokens per request.")
+    try:
+        return [decode_have_token(token) for token in req.have]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid have token.")
+
+
+def negotiate_tile_format(request: Request) -> str:
+    # Pick JSON, Arrow or packed arrays from the Accept header
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(status_code=406, detail="Not Acceptable. Supported: application/json, "
+                            "application/vnd.apache.arrow.stream, application/vnd.bridges.packed.")
+    return media_type
+
+
+def tile_response(rows: list, format: str, media_type: str, request: Request, have_token: str = None) -> Response:
+    # Rows already have the BridgeCoreResponse fields and types, so skip per-row model validation
+    with timed("encode"):
+        body = encode_tile_body(rows, media_type, format)
+    with timed("compress"):
+        body, encoding = compress_body(body, request.headers.get("accept-encoding"))
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    if have_token:
+        headers[HAVE_HEADER] = have_token
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def detail_response(body: bytes, etag: str, request: Request) -> Response:
+    # Details are always revalidated with the ETag, which changes only after a data load
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    with timed("compress"):
+        body, encoding = compress_body(body, request.headers.get("accept-encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def validate_details_request(req: BridgeDetailsBatchRequest) -> list:
+    # Structure numbers must be present and bounded; duplicates are dropped, order kept
+    structure_numbers = list(dict.fromkeys(req.structure_numbers))
+    if not structure_numbers:
+        raise HTTPException(status_code=400, detail="Structure numbers list cannot be empty.")
+    if len(structure_numbers) > settings.DETAIL_BATCH_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.DETAIL_BATCH_MAX} structure numbers per request."
+        )
+    return structure_numbers
+
+
 @router.get("/", response_model=List[BridgeCoreResponse])
 def get_bridges(limit: int = Query(100), db: Session = Depends(get_db)):
     # Returns a limited number of bridge core records
-    return db.query(BridgeCore).limit(limit).all()
+    return db.execute(select(*[bridge_core.c[column] for column in TILE_COLUMNS]).limit(limit)).mappings().all()
 
 
 @router.post("/batch", response_model=List[BridgeCoreResponse])
 def get_bridges_by_tiles(
+    request: Request,
     req: TileBatchRequest = Body(...),
     limit: int = Query(100),
     filterKey: str = Query("default"),
     mode: str = Query("batch"),  
-    db: Session = Depends(get_db)
+    format: str = Query("rows"),
+    db: Session = Depends(get_tile_db)
 ):
+    validate_tile_request(req, limit, filterKey, format)
+    have = validate_have_tokens(req)
+    media_type = negotiate_tile_format(request)
+
+    try:
+        # Per-tile top N from the tile cache (PostGIS only for missing tiles),
+        # assembled per tile (single mode) or as top N of the union (batch mode)
+        rows, version = fetch_tile_bridges(req, limit, filterKey, mode, db)
+
+        # Leave out what the client's have tokens cover, and describe the full answer in a new token
+        # stamped with the version the rows actually came from
+        with timed("diff"):
+            rows, have_token = diff_tile_rows(rows, have, version, filterKey, req.zoom, req.tiles, limit)
+        return tile_response(rows, format, media_type, request, have_token)
+    
+    except Exception as e:
+        logger.exception("Failed to fetch bridges")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+        
+
+@router.post("/clusters", response_model=List[BridgeClusterResponse])
+def get_clusters_by_tiles(req: TileBatchRequest = Body(...), db: Session = Depends(get_tile_db)):
 
     # Validate tile input
     if not req.tiles:
         raise HTTPException(status_code=400, detail="Tiles list cannot be empty.")
-    
+
+    # Clusters are only precomputed for low zooms
+    if req.zoom < 0 or req.zoom > CLUSTER_MAX_ZOOM:
+        raise HTTPException(status_code=400, detail=f"Clusters are available for zoom 0-{CLUSTER_MAX_ZOOM}.")
+
+    try:
+        # Precomputed per-zoom grid aggregates, no scan of bridge_core
+        return cluster_tile_query(req, db)
+
+    except Exception as e:
+        logger.exception("Failed to fetch clusters")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+
+@router.get("/export")
+def export_bridges(
+    format: str = Query("ndjson"),
+    state: Optional[List[str]] = Query(None),
+    bbox: Optional[str] = Query(None),
+    min_lowest_rating: Optional[int] = Query(None),
+    max_lowest_rating: Optional[int] = Query(None),
+    min_adt: Optional[int] = Query(None),
+    bridge_condition: Optional[List[str]] = Query(None),
+    after: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None),
+):
+
+    # Validate output format
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format. Must be one of: ndjson, csv.")
+
+    # Validate bbox as west,south,east,north
+    bounds = None
+    if bbox:
+        try:
+            bounds = [float(value) for value in bbox.split(",")]
+        except ValueError:
+            bounds = []
+        if len(bounds) != 4:
+            raise HTTPException(status_code=400, detail="bbox must be west,south,east,north.")
+
     # Validate limit
-    if limit <= 0:
+    if limit is not None and limit <= 0:
         raise HTTPException(status_code=400, detail="Limit must be a positive integer.")
 
-    # Map filterKey to SQL ORDER BY clause
-    match filterKey:
-        case "lowestRating":
-            order_clause = "lowest_rating ASC NULLS LAST"
-        case "highestADT":
-            order_clause = "adt_029 DESC NULLS LAST"
-        case "worstBridgeCondition":
-            order_clause = "bridge_condition ASC NULLS LAST"
-        case _:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid filterKey. Must be one of: lowestRating, highestADT, worstBridgeCondition."
-            )
+    filters = BridgeExportFilters(
+        state=state, bbox=bounds, min_lowest_rating=min_lowest_rating, max_lowest_rating=max_lowest_rating,
+        min_adt=min_adt, bridge_condition=bridge_condition, after=after, limit=limit,
+    )
+
+    # Rows are fetched and sent batch by batch; the generator owns its database session
+    return StreamingResponse(
+        stream_export(filters, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="bridges.{format}"'},
+    )
+
+
+@router.get("/cache/stats")
+def get_tile_cache_stats():
+    # Hit/miss counters and size of the per-tile result cache, and queries saved by single-flight
+    return {**tile_cache.stats(), "single_flight": tile_flights.stats()}
+
+
+def read_routers() -> dict:
+    """
+    Routers serving the tile and detail reads (the async ones when ASYNC_DB is set)
+    """
+    if settings.ASYNC_DB:
+        from app.db.async_session import async_detail_router, async_tile_router
+        return {"tiles": async_tile_router, "details": async_detail_router}
+    return {"tiles": tile_router, "details": detail_router}
+
+
+@router.get("/db/stats")
+def get_db_route_stats():
+    # Health and usage of every read target per workload
+    return {workload: router.stats() for workload, router in read_routers().items()}
+
+
+@router.get("/statements/stats")
+def get_statement_stats():
+    # Prepare/execute timings of the prepared tile statements
+    return statement_stats.stats()
+
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+def get_vector_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    filterKey: str = Query("lowestRating"),
+    limit: int = Query(None),
+    db: Session = Depends(get_tile_db)
+):
+
+    # Validate tile coordinates
+    if z < 0 or z > 24 or not tile_in_range(z, x, y):
+        raise HTTPException(status_code=400, detail="Invalid tile coordinates.")
+
+    # Validate limit (defaults to the configured maximum)
+    limit = settings.MVT_MAX_FEATURES if limit is None else limit
+    if limit <= 0 or limit > settings.MVT_MAX_FEATURES:
+        raise HTTPException(status_code=400, detail=f"Limit must be between 1 and {settings.MVT_MAX_FEATURES}.")
+
+    if filterKey not in ORDER_CLAUSES:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid filterKey. Must be one of: lowestRating, highestADT, worstBridgeCondition."
+        )
 
     try:
-        # Run query per tile 
-        if mode == "single":
-            result = single_tile_query(req, limit, order_clause, db)
-        # Run spatial union query across all tiles (batch mode)
-        else:
-            result = batch_tile_query(req, limit, order_clause, db)
-        
-        # Return result rows as dictionaries
-        return [dict(row) for row in result]
-    
+        # A tile only changes when the data does, so the dataset version is its ETag
+        etag = mvt_etag(current_dataset_version(db), z, x, y, filterKey, limit)
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.MVT_CACHE_MAX_AGE_SECONDS}"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=mvt_tile(z, x, y, filterKey, limit, db), media_type=MVT_MEDIA_TYPE, headers=headers)
+
     except Exception as e:
-        logger.exception("Failed to fetch bridges")
+        logger.exception("Failed to build vector tile")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
-        
+
 
 @router.get("/detail/{structure_number}", response_model=BridgeDetailsResponse)
-def get_bridge_details(structure_number: str, db: Session = Depends(get_db)):
+def get_bridge_details(structure_number: str, request: Request, db: Session = Depends(get_detail_db)):
 
-    # Fetch detailed bridge info using structure number
-    bridge = db.query(BridgeDetails).filter(
-        BridgeDetails.structure_number_008 == structure_number
-    ).first()
+    # The client's copy is current as long as the dataset version has not changed
+    version = current_dataset_version(db)
+    etag = detail_etag(version, [structure_number])
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    # Fetch detailed bridge info using structure number (cached serialized payload)
+    payloads = fetch_bridge_details([structure_number], version, db)
 
     # Return 404 if not found
-    if not bridge:
+    if structure_number not in payloads:
         raise HTTPException(status_code=404, detail="Bridge not found")
 
-    return bridge
\ No newline at end of file
+    return detail_response(payloads[structure_number], etag, request)
+
+
+@router.post("/details", response_model=List[BridgeDetailsResponse])
+def get_bridge_details_batch(
+    request: Request,
+    req: BridgeDetailsBatchRequest = Body(...),
+    db: Session = Depends(get_detail_db)
+):
+    structure_numbers = validate_details_request(req)
+
+    try:
+        version = current_dataset_version(db)
+        etag = detail_etag(version, structure_numbers)
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        payloads = fetch_bridge_details(structure_numbers, version, db)
+        return detail_response(join_details(structure_numbers, payloads), etag, request)
+
+    except Exception as e:
+        logger.exception("Failed to fetch bridge details")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
@@ -0,0 +1,98 @@
+"""
+Async Bridge API Router
+
+Async (asyncpg + AsyncSession) versions of the tile and detail endpoints from bridges.py,
+mounted in front of them when ASYNC_DB is enabled. Requests wait on PostGIS without
+holding a threadpool thread; validation, SQL and responses are identical.
+
+Endpoints:
+-----------
+1. POST `/api/bridges/batch`
+2. GET `/api/bridges/detail/{structure_number}`
+3. POST `/api/bridges/details`
+"""
+from fastapi import APIRouter, Depends, Query, Body, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.api.endpoints.bridges import (
+    detail_response, negotiate_tile_format, tile_response, validate_details_request, validate_have_tokens,
+    validate_tile_request
+)
+from app.db.async_session import get_async_detail_db, get_async_tile_db
+from app.schemas.bridge import BridgeCoreResponse, TileBatchRequest, BridgeDetailsResponse, BridgeDetailsBatchRequest
+from app.utils.async_bridge_service import (
+    current_dataset_version_async, fetch_bridge_details_async, fetch_tile_bridges_async
+)
+from app.utils.detail_service import detail_etag, join_details
+from app.utils.viewport_diff import diff_tile_rows
+from app.core.metrics import timed
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post("/batch", response_model=List[BridgeCoreResponse])
+async def get_bridges_by_tiles(
+    request: Request,
+    req: TileBatchRequest = Body(...),
+    limit: int = Query(100),
+    filterKey: str = Query("default"),
+    mode: str = Query("batch"),
+    format: str = Query("rows"),
+    db: AsyncSession = Depends(get_async_tile_db)
+):
+    validate_tile_request(req, limit, filterKey, format)
+    have = validate_have_tokens(req)
+    media_type = negotiate_tile_format(request)
+
+    try:
+        rows, version = await fetch_tile_bridges_async(req, limit, filterKey, mode, db)
+        with timed("diff"):
+            rows, have_token = diff_tile_rows(rows, have, version, filterKey, req.zoom, req.tiles, limit)
+        return tile_response(rows, format, media_type, request, have_token)
+
+    except Exception as e:
+        logger.exception("Failed to fetch bridges")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+
+@router.get("/detail/{structure_number}", response_model=BridgeDetailsResponse)
+async def get_bridge_details(structure_number: str, request: Request, db: AsyncSession = Depends(get_async_detail_db)):
+
+    # The client's copy is current as long as the dataset version has not changed
+    version = await current_dataset_version_async(db)
+    etag = detail_etag(version, [structure_number])
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    # Fetch detailed bridge info using structure number (cached serialized payload)
+    payloads = await fetch_bridge_details_async([structure_number], version, db)
+
+    # Return 404 if not found
+    if structure_number not in payloads:
+        raise HTTPException(status_code=404, detail="Bridge not found")
+
+    return detail_response(payloads[structure_number], etag, request)
+
+
+@router.post("/details", response_model=List[BridgeDetailsResponse])
+async def get_bridge_details_batch(
+    request: Request,
+    req: BridgeDetailsBatchRequest = Body(...),
+    db: AsyncSession = Depends(get_async_detail_db)
+):
+    structure_numbers = validate_details_request(req)
+
+    try:
+        version = await current_dataset_version_async(db)
+        etag = detail_etag(version, structure_numbers)
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        payloads = await fetch_bridge_details_async(structure_numbers, version, db)
+        return detail_response(join_details(structure_numbers, payloads), etag, request)
+
+    except Exception as e:
+        logger.exception("Failed to fetch bridge details")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
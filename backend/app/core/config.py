@@ -2,15 +2,93 @@
 Loads environment-based configuration settings (e.g., database URL) using Pydantic for global app access.
 """
 
-from pydantic_settings import BaseSettings 
+from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     # Define your expected environment variables here
     DATABASE_URL: str
 
+    # Connection pool of the primary engine (sync and async alike)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+
+    # Primary (writes, ETL and every endpoint not listed below): statement_timeout in ms (0 = none)
+    # and connect timeout in seconds for every engine
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_CONNECT_TIMEOUT_SECONDS: int = 5
+
+    # Read replicas (comma-separated URLs) for the tile (/batch, /clusters, .mvt) and detail workloads.
+    # Each workload has its own pool per replica and on the primary, which it falls back to.
+    READ_REPLICA_URLS: str = ""
+    REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    TILE_DB_POOL_SIZE: int = 10
+    TILE_DB_MAX_OVERFLOW: int = 10
+    TILE_DB_POOL_TIMEOUT: float = 5.0
+    TILE_DB_STATEMENT_TIMEOUT_MS: int = 5000
+    DETAIL_DB_POOL_SIZE: int = 5
+    DETAIL_DB_MAX_OVERFLOW: int = 5
+    DETAIL_DB_POOL_TIMEOUT: float = 5.0
+    DETAIL_DB_STATEMENT_TIMEOUT_MS: int = 5000
+
+    # Serve tile and detail endpoints with asyncpg + AsyncSession instead of the sync threadpool path.
+    # ASYNC_DATABASE_URL defaults to DATABASE_URL with the asyncpg driver (replicas are switched the same way).
+    ASYNC_DB: bool = False
+    ASYNC_DATABASE_URL: str | None = None
+
+    # Tile result cache (0 disables it) and how often each database's dataset version is re-checked
+    TILE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    DATASET_VERSION_TTL_SECONDS: float = 5.0
+
+    # Answer tile queries from the materialized bridge_tile_top table when it covers the request
+    TILE_TOP_ENABLED: bool = True
+
+    # Read live tile queries from the narrow bridge_map_points table instead of bridge_core
+    # (once a rebuild has filled it for the current dataset version)
+    MAP_POINTS_ENABLED: bool = True
+
+    # Serve tile queries from an in-process NumPy index of bridge_core (needs numpy),
+    # and how long to wait before loading it again after a failed load
+    MEMORY_INDEX_ENABLED: bool = False
+    MEMORY_INDEX_RETRY_SECONDS: float = 60.0
+
+    # Run tile queries as per-connection prepared statements (disable behind transaction-mode poolers)
+    PREPARED_STATEMENTS: bool = True
+
+    # Prometheus metrics at /metrics, and Server-Timing headers for requests sending `X-Server-Timing: 1`
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = False
+
+    # Rows fetched per server-side cursor round trip by the streaming export
+    EXPORT_BATCH_SIZE: int = 5000
+
+    # Vector tiles: most features per tile and how long browsers/CDNs may reuse a tile
+    MVT_MAX_FEATURES: int = 20000
+    MVT_CACHE_MAX_AGE_SECONDS: int = 3600
+
+    # Serialized bridge detail cache (0 disables it) and structure numbers per batch detail request
+    DETAIL_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    DETAIL_BATCH_MAX: int = 500
+
+    # Share one query among concurrent identical tile requests
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Most tiles per /batch or /clusters request, and the largest limit a tile request may ask for
+    TILE_BATCH_MAX_TILES: int = 512
+    TILE_LIMIT_MAX: int = 1000
+
+    # Batch-mode requests are assembled from cached per-tile lists only while tiles x limit stays
+    # under this many rows; larger ones run the single batch query instead
+    TILE_ASSEMBLE_MAX_ROWS: int = 20000
+
+    # "Already have" tokens accepted per /batch request, and the largest tile bounding box a token covers
+    TILE_HAVE_MAX_TOKENS: int = 64
+    TILE_HAVE_MAX_AREA: int = 4096
+
     class Config:
         env_file = ".env"
 
 # Create a global settings object to be used across the app
-settings = Settings()
\ No newline at end of file
+settings = Settings()
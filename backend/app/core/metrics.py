@@ -0,0 +1,245 @@
+"""
+Request-level performance metrics in the Prometheus text format, plus Server-Timing headers.
+
+Recorded per process:
+    http_request_duration_seconds{method, route, status}   histogram, per endpoint
+    http_response_size_bytes{route}                        histogram of body sizes
+    db_query_duration_seconds{statement}                   histogram, SQLAlchemy cursor events
+    db_rows_returned{statement}                            histogram of cursor row counts
+    db_pool_checkout_wait_seconds{pool}                    histogram of waits for a pooled connection (per engine)
+    app_phase_duration_seconds{phase}                      histogram of timed() blocks (bbox, encode, ...)
+
+Statements are labelled with the `metrics_label` execution option (the tile statements
+set it) or their first SQL keyword. Requests that send `X-Server-Timing: 1` get a
+Server-Timing header with the same breakdown when SERVER_TIMING_ENABLED is set.
+Values are per worker process; scrape every worker or aggregate in Prometheus.
+"""
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket upper bounds (seconds / bytes / rows)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+
+
+class Histogram:
+    """
+    Prometheus histogram with labels; thread-safe
+    """
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values)]
+                bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+                counts = series["buckets"] + [series["count"]]
+                for bound, count in zip(bounds, counts):
+                    bucket_labels = _labels(labels + ['le="%s"' % bound])
+                    lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+                lines.append(f"{self.name}_sum{_labels(labels)} {series['sum']}")
+                lines.append(f"{self.name}_count{_labels(labels)} {series['count']}")
+        return lines
+
+
+def _labels(pairs: list) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_family(name: str, kind: str, help: str, samples: list) -> list:
+    """
+    Text lines of one counter or gauge family; samples are (labels dict, value) pairs
+    """
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        pairs = [f'{label}="{_escape(label_value)}"' for label, label_value in labels.items()]
+        lines.append(f"{name}{_labels(pairs)} {value}")
+    return lines
+
+
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "Request latency per endpoint",
+                             ("method", "route", "status"))
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size per endpoint", ("route",), SIZE_BUCKETS)
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "Database time per statement", ("statement",))
+DB_ROWS = Histogram("db_rows_returned", "Rows returned per statement", ("statement",), ROW_BUCKETS)
+POOL_WAIT = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("pool",))
+PHASE_DURATION = Histogram("app_phase_duration_seconds", "Time spent in instrumented request phases", ("phase",))
+
+HISTOGRAMS = [REQUEST_DURATION, RESPONSE_SIZE, DB_QUERY_DURATION, DB_ROWS, POOL_WAIT, PHASE_DURATION]
+
+# Extra gauge/counter lines (e.g. cache statistics, see render_family) appended at scrape time
+_collectors = []
+
+# Server-Timing entries of the current request: {name: [total seconds, count]}
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def register_collector(collect):
+    """
+    Add a callable returning Prometheus text lines to every scrape
+    """
+    _collectors.append(collect)
+
+
+def render_metrics() -> bytes:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for collect in _collectors:
+        lines.extend(collect())
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _add_timing(name: str, seconds: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+@contextmanager
+def timed(phase: str):
+    """
+    Time a block of request work as an app phase (and a Server-Timing entry)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        PHASE_DURATION.observe(elapsed, phase)
+        _add_timing(phase, elapsed)
+
+
+def server_timing_header(timings: dict, total: float) -> str:
+    entries = [f'{name};dur={seconds * 1000:.2f};desc="{count}x"' for name, (seconds, count) in timings.items()]
+    return ", ".join(entries + [f"total;dur={total * 1000:.2f}"])
+
+
+# ─── Database hooks ────────────────────────────────────────────────────────────
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waits for a connection
+    """
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            POOL_WAIT.observe(elapsed, self._orig_logging_name or "primary")
+            _add_timing("pool", elapsed)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool counterpart of TimedQueuePool
+    """
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            POOL_WAIT.observe(elapsed, self._orig_logging_name or "primary")
+            _add_timing("pool", elapsed)
+
+
+def _statement_label(statement: str, context) -> str:
+    label = context.execution_options.get("metrics_label") if context is not None else None
+    if label:
+        return label
+    words = statement.split(None, 1)
+    return words[0].lower() if words else "unknown"
+
+
+def instrument_engine(engine):
+    """
+    Record per-statement DB time and row counts for a (sync) engine
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        label = _statement_label(statement, context)
+        DB_QUERY_DURATION.observe(elapsed, label)
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            DB_ROWS.observe(cursor.rowcount, label)
+        _add_timing("db", elapsed)
+
+
+# ─── ASGI middleware ───────────────────────────────────────────────────────────
+
+class MetricsMiddleware:
+    """
+    Records latency and response size per route and adds Server-Timing on request
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = {}
+        token = _request_timings.set(timings)
+        wants_timing = settings.SERVER_TIMING_ENABLED and (b"x-server-timing", b"1") in scope.get("headers", [])
+        state = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                if wants_timing:
+                    header = server_timing_header(timings, time.perf_counter() - started)
+                    message = {**message, "headers": list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode())
+                    ]}
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], path, state["status"])
+            RESPONSE_SIZE.observe(state["bytes"], path)
@@ -0,0 +1,103 @@
+"""
+Async database engine and session management (asyncpg), used when ASYNC_DB is enabled.
+
+Mirrors app/db/session.py: the primary engine plus per-workload routers for the tile
+and detail reads, with every URL switched to the asyncpg driver.
+"""
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.core.metrics import TimedAsyncQueuePool, instrument_engine
+from app.db.routing import (
+    ReplicaRouter, RouteTarget, open_async_session, replica_urls, target_name, workload_options
+)
+
+
+def asyncpg_url(url: str) -> str:
+    """
+    A database URL switched to the asyncpg driver
+    """
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def async_database_url() -> str:
+    """
+    ASYNC_DATABASE_URL, or DATABASE_URL switched to the asyncpg driver
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return asyncpg_url(settings.DATABASE_URL)
+
+
+def make_async_engine(url: str, pool_size: int, max_overflow: int, pool_timeout: float, statement_timeout_ms: int,
+                      name: str = "primary"):
+    """
+    Async counterpart of session.make_engine: connections are held without blocking a thread
+    """
+    connect_args = {"timeout": settings.DB_CONNECT_TIMEOUT_SECONDS}
+    if statement_timeout_ms:
+        connect_args["server_settings"] = {"statement_timeout": str(statement_timeout_ms)}
+    engine = create_async_engine(
+        url,
+        poolclass=TimedAsyncQueuePool,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_logging_name=name,
+        connect_args=connect_args,
+    )
+    # Cursor events fire on the sync engine underneath the async one
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def make_async_router(workload: str, prefix: str) -> ReplicaRouter:
+    """
+    Async router of one read workload: a pool per replica, then a pool of its own on the primary
+    """
+    options = workload_options(prefix, settings)
+
+    def target(url: str, replica: bool) -> RouteTarget:
+        name = target_name(url)
+        workload_engine = make_async_engine(url, **options, name=f"{workload}@{name}")
+        factory = async_sessionmaker(bind=workload_engine, autoflush=False, expire_on_commit=False)
+        return RouteTarget(name, factory, workload_engine.sync_engine, replica)
+
+    replicas = [target(asyncpg_url(url), replica=True) for url in replica_urls(settings.READ_REPLICA_URLS)]
+    return ReplicaRouter(workload, replicas, target(async_database_url(), replica=False),
+                         settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+
+# Same pool sizing as the sync engine
+async_engine = make_async_engine(async_database_url(), **workload_options("DB", settings))
+
+# Create an async session maker
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Read workloads with their own pools (replicas first, primary as fallback)
+async_tile_router = make_async_router("tiles", "TILE_DB")
+async_detail_router = make_async_router("details", "DETAIL_DB")
+
+# Dependency to get an async database session
+async def get_async_db() -> AsyncSession:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependencies for the async tile and detail endpoints
+async def get_async_tile_db() -> AsyncSession:
+    db = await open_async_session(async_tile_router)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_async_detail_db() -> AsyncSession:
+    db = await open_async_session(async_detail_router)
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -2,4 +2,4 @@
 Imports database base class and bridge models for use in the app.
 """
 from app.db.session import Base
-from app.db.models import BridgeCore, BridgeDetails, BridgeFieldMetadata
\ No newline at end of file
+from app.db.models import BridgeCore, BridgeDetails, BridgeFieldMetadata, DatasetVersion, BridgeCluster, BridgeTileTop, BridgeMapPoints
\ No newline at end of file
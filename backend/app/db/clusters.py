@@ -0,0 +1,56 @@
+"""
+Per-zoom bridge cluster summaries: grid-cell aggregates rebuilt by the ETL so low-zoom views skip live scans.
+"""
+from app.db.tile_math import mappable_sql, tile_x_sql, tile_y_sql
+
+CORE_TABLE = "bridge_core"
+CLUSTER_TABLE = "bridge_cluster"
+
+# Zooms 0..CLUSTER_MAX_ZOOM are precomputed; each map tile is split into 2^CLUSTER_CELL_BITS cells per side
+CLUSTER_MAX_ZOOM = 10
+CLUSTER_CELL_BITS = 3
+
+
+def refresh_clusters_sql(source_table: str = CORE_TABLE) -> list[str]:
+    """
+    Statements that rebuild bridge_cluster from source_table. They work on both a DBAPI
+    cursor and (wrapped in text()) a SQLAlchemy session, inside the caller's transaction.
+    """
+    return [
+        f"DELETE FROM {CLUSTER_TABLE}",
+        f"""
+        INSERT INTO {CLUSTER_TABLE} (
+            zoom, cell_x, cell_y, lat, lon, bridge_count, worst_lowest_rating, max_adt_029,
+            good_count, fair_count, poor_count, unknown_count
+        )
+        SELECT z.zoom, cells.cell_x, cells.cell_y,
+               AVG(b.lat), AVG(b.lon), COUNT(*), MIN(b.lowest_rating), MAX(b.adt_029),
+               COUNT(*) FILTER (WHERE b.bridge_condition = 'G'),
+               COUNT(*) FILTER (WHERE b.bridge_condition = 'F'),
+               COUNT(*) FILTER (WHERE b.bridge_condition = 'P'),
+               COUNT(*) FILTER (WHERE b.bridge_condition IS NULL OR b.bridge_condition NOT IN ('G', 'F', 'P'))
+        FROM (
+            SELECT geom, ST_Y(geom) AS lat, ST_X(geom) AS lon, lowest_rating, adt_029, bridge_condition
+            FROM {source_table}
+            WHERE {mappable_sql("geom")}
+        ) b
+        CROSS JOIN generate_series(0, {CLUSTER_MAX_ZOOM}) AS z(zoom)
+        CROSS JOIN LATERAL (
+            SELECT CAST(power(2, z.zoom + {CLUSTER_CELL_BITS}) AS integer) AS n
+        ) grid
+        CROSS JOIN LATERAL (
+            SELECT {tile_x_sql("b.geom", "grid.n")} AS cell_x,
+                   {tile_y_sql("b.geom", "grid.n")} AS cell_y
+        ) cells
+        GROUP BY z.zoom, cells.cell_x, cells.cell_y
+        """,
+        f"ANALYZE {CLUSTER_TABLE}",
+    ]
+
+
+def refresh_bridge_clusters(cursor, source_table: str = CORE_TABLE):
+    """
+    Rebuild bridge_cluster inside the caller's load transaction (DBAPI cursor)
+    """
+    for statement in refresh_clusters_sql(source_table):
+        cursor.execute(statement)
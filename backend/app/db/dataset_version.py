@@ -0,0 +1,132 @@
+"""
+Dataset version stamp: the ETL bumps it after every load, the API uses it to invalidate cached results.
+
+The API caches it per database (primary or read replica). A session reads the version
+from the database that answers its queries, so a lagging replica's rows are never
+cached under a version it has not replayed yet.
+
+The same row records, per derived table, the version it was last fully rebuilt for. A
+table created by a migration starts empty and unstamped, and the tile queries keep
+reading bridge_core until a rebuild stamps it.
+"""
+import time
+import threading
+from typing import NamedTuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.routing import target_name
+
+# Derived table -> dataset_version column holding the version it was built for
+BUILD_STAMPS = {
+    "bridge_tile_top": "tile_top_version",
+    "bridge_map_points": "map_points_version",
+}
+
+# Every load maintains the derived tables in the same transaction as the bump, so a stamp
+# that matched the old version is carried to the new one; an unbuilt table stays unbuilt
+_CARRY_STAMPS_SQL = "".join(
+    f",\n        {column} = CASE WHEN dataset_version.{column} = dataset_version.version"
+    f" THEN dataset_version.version + 1 END"
+    for column in BUILD_STAMPS.values()
+)
+
+# Works on both a DBAPI cursor and (wrapped in text()) a SQLAlchemy session
+BUMP_VERSION_SQL = f"""
+    INSERT INTO dataset_version (id, version, updated_at) VALUES (1, 1, now())
+    ON CONFLICT (id) DO UPDATE SET version = dataset_version.version + 1, updated_at = now(){_CARRY_STAMPS_SQL}
+"""
+
+READ_VERSION_SQL = f"SELECT version, {', '.join(BUILD_STAMPS.values())} FROM dataset_version WHERE id = 1"
+
+_lock = threading.Lock()
+# target_name -> (state, monotonic time it was read)
+_cached = {}
+
+
+class DatasetState(NamedTuple):
+    """
+    Current dataset version and the derived tables built for it
+    """
+    version: int
+    built: frozenset
+
+
+def build_stamp_sql(table: str) -> str:
+    """
+    Statement marking a derived table as rebuilt for the current version (run in the rebuild's transaction)
+    """
+    column = BUILD_STAMPS[table]
+    return f"""
+    INSERT INTO dataset_version (id, version, {column}) VALUES (1, 0, 0)
+    ON CONFLICT (id) DO UPDATE SET {column} = dataset_version.version
+    """
+
+
+def bump_dataset_version(cursor):
+    """
+    Increment the dataset version inside the caller's load transaction (DBAPI cursor)
+    """
+    cursor.execute(BUMP_VERSION_SQL)
+
+
+def dataset_state(row) -> DatasetState:
+    """
+    DatasetState from a READ_VERSION_SQL row (None before the first load)
+    """
+    if row is None:
+        return DatasetState(0, frozenset())
+    version, *stamps = row
+    return DatasetState(version, frozenset(table for table, stamp in zip(BUILD_STAMPS, stamps) if stamp == version))
+
+
+def state_key(db) -> str:
+    """
+    Cache key of the database a (sync or async) session reads from
+    """
+    return target_name(db.get_bind().url)
+
+
+def read_dataset_state(db: Session) -> DatasetState:
+    """
+    Read the current dataset version and build stamps from the database
+    """
+    return dataset_state(db.execute(text(READ_VERSION_SQL)).first())
+
+
+def cached_dataset_state(key: str) -> DatasetState | None:
+    """
+    State of database key read within the last DATASET_VERSION_TTL_SECONDS, or None when it must be re-read
+    """
+    with _lock:
+        entry = _cached.get(key)
+    if entry is not None and time.monotonic() - entry[1] < settings.DATASET_VERSION_TTL_SECONDS:
+        return entry[0]
+    return None
+
+
+def remember_dataset_state(key: str, state: DatasetState) -> DatasetState:
+    """
+    Store a freshly read state of database key for the next DATASET_VERSION_TTL_SECONDS
+    """
+    with _lock:
+        _cached[key] = (state, time.monotonic())
+    return state
+
+
+def current_dataset_state(db: Session) -> DatasetState:
+    """
+    Dataset state of the database db reads from, re-read at most every DATASET_VERSION_TTL_SECONDS
+    """
+    key = state_key(db)
+    state = cached_dataset_state(key)
+    if state is None:
+        state = remember_dataset_state(key, read_dataset_state(db))
+    return state
+
+
+def current_dataset_version(db: Session) -> int:
+    """
+    Dataset version of the database db reads from, re-read at most every DATASET_VERSION_TTL_SECONDS
+    """
+    return current_dataset_state(db).version
@@ -0,0 +1,139 @@
+"""
+Runs EXPLAIN ANALYZE on the real single/batch tile queries to confirm they use index scans.
+With --prepared, each query runs as a prepared statement several times to show planning
+time dropping once Postgres switches to its cached generic plan.
+
+Usage:
+    python -m app.db.explain --zoom 12 --lat 40.27 --lon -76.88 --span 4
+    python -m app.db.explain --prepared --runs 8
+"""
+import json
+import argparse
+from math import cos, floor, log, pi, radians, tan
+from sqlalchemy import text
+from app.db.dataset_version import read_dataset_state
+from app.db.prepared import prepared_statement
+from app.db.session import SessionLocal
+from app.schemas.bridge import TileBatchRequest
+from app.utils.bridge_service import (
+    FILTER_KEYS, ORDER_CLAUSES, build_batch_tile_sql, build_single_tile_sql, build_tile_top_sql, map_points_ready
+)
+
+
+def lat_lng_to_tile(lat: float, lng: float, zoom: int):
+    """
+    Convert latitude/longitude to tile X/Y (same math as the frontend's latLngToTile)
+    """
+    n = 2 ** zoom
+    x = floor((lng + 180) / 360 * n)
+    y = floor((1 - log(tan(radians(lat)) + 1 / cos(radians(lat))) / pi) / 2 * n)
+    return x, y
+
+
+def sample_request(lat: float, lon: float, zoom: int, span: int) -> TileBatchRequest:
+    """
+    Build a span x span block of tiles around a point, like a map viewport
+    """
+    cx, cy = lat_lng_to_tile(lat, lon, zoom)
+    half = span // 2
+    tiles = [[x, y] for x in range(cx - half, cx - half + span) for y in range(cy - half, cy - half + span)]
+    return TileBatchRequest(zoom=zoom, tiles=tiles)
+
+
+def _plan_nodes(plan: dict):
+    """
+    Flatten a JSON plan tree into (node type, relation, index) tuples
+    """
+    yield plan["Node Type"], plan.get("Relation Name"), plan.get("Index Name")
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _heap_fetches(plan: dict) -> int:
+    """
+    Heap fetches of all index-only scans in a JSON plan tree (0 when the visibility map is current)
+    """
+    return plan.get("Heap Fetches", 0) + sum(_heap_fetches(child) for child in plan.get("Plans", []))
+
+
+def explain_query(db, sql: str, params: dict) -> dict:
+    """
+    EXPLAIN (ANALYZE, BUFFERS) one query and summarize its plan
+    """
+    raw = db.execute(text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql), params).scalar()
+    result = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    nodes = list(_plan_nodes(result["Plan"]))
+    return {
+        "planning_ms": result.get("Planning Time"),
+        "execution_ms": result.get("Execution Time"),
+        "seq_scans": [relation for node, relation, _ in nodes if node == "Seq Scan"],
+        "indexes": sorted({index for _, _, index in nodes if index}),
+        "shared_hit": result["Plan"].get("Shared Hit Blocks"),
+        "shared_read": result["Plan"].get("Shared Read Blocks"),
+        "heap_fetches": _heap_fetches(result["Plan"]),
+    }
+
+
+def explain_prepared(db, sql: str, params: dict, runs: int) -> dict:
+    """
+    PREPARE a query and EXPLAIN ANALYZE `runs` executions; reports the first and last run
+    """
+    _, prepare, execute = prepared_statement(sql, params)
+    db.execute(text("DEALLOCATE ALL"))
+    db.execute(text(prepare))
+    reports = [explain_query(db, execute, params) for _ in range(runs)]
+    return {
+        **reports[-1],
+        "first_planning_ms": reports[0]["planning_ms"],
+        "first_execution_ms": reports[0]["execution_ms"],
+    }
+
+
+def run(zoom: int, lat: float, lon: float, span: int, limit: int, prepared_runs: int = 0) -> list:
+    """
+    Explain both tile modes and the bridge_tile_top lookup for every filterKey and print one line per query
+    """
+    req = sample_request(lat, lon, zoom, span)
+    builders = {
+        "single": build_single_tile_sql,
+        "batch": build_batch_tile_sql,
+        "tiletop": lambda req, limit, order, map_points: build_tile_top_sql(
+            req.tiles, req.zoom, limit, FILTER_KEYS[order], map_points),
+    }
+    reports = []
+
+    db = SessionLocal()
+    try:
+        # The same table choice the API makes for the current dataset version
+        map_points = map_points_ready(read_dataset_state(db).built)
+        for mode, build in builders.items():
+            for filter_key, order_clause in ORDER_CLAUSES.items():
+                sql, params = build(req, limit, order_clause, map_points)
+                if prepared_runs:
+                    report = {"mode": mode, "filterKey": filter_key, **explain_prepared(db, sql, params, prepared_runs)}
+                else:
+                    report = {"mode": mode, "filterKey": filter_key, **explain_query(db, sql, params)}
+                reports.append(report)
+                status = "SEQ SCAN on " + ", ".join(report["seq_scans"]) if report["seq_scans"] else "no seq scans"
+                first = (f"first plan {report['first_planning_ms']:.2f}ms exec {report['first_execution_ms']:.2f}ms -> "
+                         if prepared_runs else "")
+                print(f"{mode:7} {filter_key:22} {first}plan {report['planning_ms']:.2f}ms  "
+                      f"exec {report['execution_ms']:.2f}ms  {status}  "
+                      f"blocks={(report['shared_hit'] or 0) + (report['shared_read'] or 0)}  "
+                      f"indexes={report['indexes']}")
+    finally:
+        db.close()
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the tile queries")
+    parser.add_argument("--zoom", type=int, default=12)
+    parser.add_argument("--lat", type=float, default=40.2732)
+    parser.add_argument("--lon", type=float, default=-76.8867)
+    parser.add_argument("--span", type=int, default=4, help="Tiles per side of the sample viewport")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--prepared", action="store_true", help="Explain EXECUTEs of prepared statements")
+    parser.add_argument("--runs", type=int, default=8, help="Executions per prepared statement")
+    args = parser.parse_args()
+    run(args.zoom, args.lat, args.lon, args.span, args.limit, args.runs if args.prepared else 0)
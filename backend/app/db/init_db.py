@@ -1,22 +1,32 @@
 """
 Initializes the database by dropping and recreating all tables using SQLAlchemy.
 """
-from sqlalchemy import inspect
+import argparse
+from sqlalchemy import inspect, text
 from app.db.session import engine
-from app.db.base import Base 
+from app.db.base import Base
 
-def init_db():
+def init_db(reset: bool = True):
     """
-    Initializes the database by dropping and creating all tables based on models.py
+    Initializes the database based on models.py. With reset, all tables are dropped
+    and recreated; without it, only missing tables and columns are created.
     """
     # Drop all tables (if exist) and recreate from metadata
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine) 
-  
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    # Columns added after tables may already exist in a deployed database
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE bridge_core ADD COLUMN IF NOT EXISTS row_hash BIGINT"))
+
     # Log created tables for verification
     inspector = inspect(engine)
     print("Tables created:", inspector.get_table_names())
 
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create the bridge database schema")
+    parser.add_argument("--keep", action="store_true", help="Keep existing tables and data")
+    args = parser.parse_args()
+    init_db(reset=not args.keep)
@@ -0,0 +1,36 @@
+"""
+Post-load table maintenance: physically cluster bridge_core by location and refresh planner statistics.
+"""
+from app.db.session import engine
+
+CORE_TABLE = "bridge_core"
+DETAILS_TABLE = "bridge_details"
+GEOM_INDEX = "idx_bridge_core_geom"
+
+
+def cluster_and_analyze(cursor, core_table: str = CORE_TABLE, details_table: str = DETAILS_TABLE,
+                        geom_index: str = GEOM_INDEX, cluster: bool = True):
+    """
+    CLUSTER the core table on its GiST index so nearby bridges share heap pages, then ANALYZE.
+    CLUSTER takes an exclusive lock, so run it on staging tables or during a full reload only.
+    """
+    if cluster:
+        cursor.execute(f"CLUSTER {core_table} USING {geom_index}")
+    cursor.execute(f"ANALYZE {core_table}")
+    cursor.execute(f"ANALYZE {details_table}")
+
+
+def optimize_bridge_tables(cluster: bool = True):
+    """
+    Run cluster_and_analyze on the live tables in its own transaction
+    """
+    connection = engine.raw_connection()
+    try:
+        cluster_and_analyze(connection.cursor(), cluster=cluster)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    optimize_bridge_tables()
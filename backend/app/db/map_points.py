@@ -0,0 +1,122 @@
+"""
+Narrow bridge_map_points table: the map's response fields, geometry and one numeric ranking key per filterKey.
+
+bridge_core is wide (location text, route and classification codes, row hash), so
+tile queries touch many heap pages for a few bridges. This derived table keeps only
+what tiles return, with fixed-width columns first so rows pack tightly, and is
+written in spatial order so a tile's bridges share pages. Each filterKey ordering
+becomes an integer key (NULLs mapped past every value), ordered by a btree
+(key, structure number in C collation) that also carries the geometry. A wide-area batch query can
+then pick its top N from the index alone and fetch just those N rows.
+
+It is a table rather than a materialized view so the staging swap can drop and
+replace bridge_core underneath it. Full loads rebuild it next to bridge_cluster and
+bridge_tile_top and VACUUM it so the visibility map allows index-only scans; delta
+loads re-copy only the bridges they changed.
+"""
+from sqlalchemy import text
+from app.db.dataset_version import build_stamp_sql
+from app.db.session import engine
+
+CORE_TABLE = "bridge_core"
+MAP_POINTS_TABLE = "bridge_map_points"
+
+# Ranking key column per filterKey; ORDER BY key, structure_number_008 matches bridge_service.ORDER_CLAUSES
+RANK_COLUMNS = {
+    "lowestRating": "rank_lowest_rating",
+    "highestADT": "rank_adt_029",
+    "worstBridgeCondition": "rank_bridge_condition",
+}
+
+# How each key is derived from bridge_core (ascending key = filterKey order, NULLs last)
+RANK_EXPRESSIONS = {
+    "rank_lowest_rating": "COALESCE(lowest_rating, 2147483647)",
+    "rank_adt_029": "COALESCE(-adt_029, 2147483647)",
+    "rank_bridge_condition": "COALESCE(ascii(bridge_condition), 32767)",
+}
+
+# Response fields copied from bridge_core, in storage order (8-byte, 4-byte, then variable width)
+POINT_COLUMNS = [
+    "lat_016", "long_017", "deck_area",
+    "year_built_027", "adt_029", "year_reconstructed_106", "lowest_rating",
+    "bridge_condition", "deck_cond_058", "superstructure_cond_059", "substructure_cond_060",
+    "channel_cond_061", "culvert_cond_062", "state_code_001", "structure_number_008", "geom",
+]
+
+
+def map_points_order(filter_key: str) -> str:
+    """
+    ORDER BY clause on bridge_map_points for a filterKey
+    """
+    return f'{RANK_COLUMNS[filter_key]}, structure_number_008 COLLATE "C"'
+
+
+def refresh_map_points_sql(source_table: str = CORE_TABLE) -> list[str]:
+    """
+    Statements that rebuild bridge_map_points from source_table inside the caller's transaction.
+    Rows are inserted in geometry order, which PostGIS sorts along a space-filling curve.
+    """
+    columns = ", ".join(POINT_COLUMNS + list(RANK_EXPRESSIONS))
+    values = ", ".join(POINT_COLUMNS + list(RANK_EXPRESSIONS.values()))
+    return [
+        f"DELETE FROM {MAP_POINTS_TABLE}",
+        f"""
+        INSERT INTO {MAP_POINTS_TABLE} ({columns})
+        SELECT {values}
+        FROM {source_table}
+        WHERE geom IS NOT NULL
+        ORDER BY geom
+        """,
+        build_stamp_sql(MAP_POINTS_TABLE),
+        f"ANALYZE {MAP_POINTS_TABLE}",
+    ]
+
+
+def refresh_map_points_keys_sql(source_table: str = CORE_TABLE) -> list[str]:
+    """
+    Statements that re-copy the bridges in :keys (delta loads); keys no longer in source_table are removed
+    """
+    columns = ", ".join(POINT_COLUMNS + list(RANK_EXPRESSIONS))
+    values = ", ".join(POINT_COLUMNS + list(RANK_EXPRESSIONS.values()))
+    return [
+        f"DELETE FROM {MAP_POINTS_TABLE} WHERE structure_number_008 = ANY(:keys)",
+        f"""
+        INSERT INTO {MAP_POINTS_TABLE} ({columns})
+        SELECT {values}
+        FROM {source_table}
+        WHERE structure_number_008 = ANY(:keys) AND geom IS NOT NULL
+        """,
+    ]
+
+
+def refresh_map_points(cursor, source_table: str = CORE_TABLE):
+    """
+    Rebuild bridge_map_points inside the caller's load transaction (DBAPI cursor)
+    """
+    for statement in refresh_map_points_sql(source_table):
+        cursor.execute(statement)
+
+
+def vacuum_map_points():
+    """
+    VACUUM the rebuilt table so the visibility map allows index-only scans (needs autocommit)
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"VACUUM (ANALYZE) {MAP_POINTS_TABLE}"))
+
+
+def rebuild_map_points():
+    """
+    Rebuild bridge_map_points from the live tables in its own transaction (e.g. right after a migration)
+    """
+    connection = engine.raw_connection()
+    try:
+        refresh_map_points(connection.cursor())
+        connection.commit()
+    finally:
+        connection.close()
+    vacuum_map_points()
+
+
+if __name__ == "__main__":
+    rebuild_map_points()
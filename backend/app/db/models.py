@@ -2,8 +2,9 @@
 SQLAlchemy models for bridge core, details, and metadata tables.
 """
 from app.db.session import Base 
-from sqlalchemy import Column, String, Integer, Float, CHAR, Date, ForeignKey
+from sqlalchemy import Column, String, Integer, SmallInteger, BigInteger, Float, CHAR, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import ARRAY
 from geoalchemy2 import Geometry
 
 # ───────────────────────────────────────────────
@@ -17,6 +18,20 @@ class BridgeFieldMetadata(Base):
     data_type = Column(String(30))
     description = Column(String(255))
 
+# ───────────────────────────────────────────────
+# Dataset Version Table (single row, bumped by the ETL after every load)
+# ───────────────────────────────────────────────
+class DatasetVersion(Base):
+    __tablename__ = "dataset_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True))
+    # Version bridge_tile_top was last rebuilt for; the API reads the table only while it equals version
+    tile_top_version = Column(BigInteger)
+    # Same for bridge_map_points
+    map_points_version = Column(BigInteger)
+
 # ───────────────────────────────────────────────
 # Core Bridge Info Table
 # ───────────────────────────────────────────────
@@ -30,7 +45,7 @@ class BridgeCore(Base):
     state_code_001 = Column(CHAR(3))
     lat_016 = Column(Float)
     long_017 = Column(Float)
-    geom = Column(Geometry(geometry_type='POINT', srid=4326))
+    geom = Column(Geometry(geometry_type='POINT', srid=4326, spatial_index=False))
     location_009 = Column(String(50))
 
     # Classification & Route Info
@@ -65,6 +80,38 @@ class BridgeCore(Base):
     lowest_rating = Column(Integer)
     deck_area = Column(Float)
 
+    # Sync Bookkeeping (hash of the source row, used by incremental reloads)
+    row_hash = Column(BigInteger)
+
+
+# ───────────────────────────────────────────────
+# Bridge Core Indexes
+# ───────────────────────────────────────────────
+# Spatial index for tile envelopes; the table is also CLUSTERed on it after each load
+Index("idx_bridge_core_geom", BridgeCore.geom, postgresql_using="gist")
+
+# One index per filterKey ordering, matching ORDER BY (including the structure number
+# tie-breaker in C collation) exactly so top-N can stop early.
+# Partial on mapped bridges only, which tile queries state explicitly.
+Index(
+    "ix_bridge_core_lowest_rating",
+    BridgeCore.lowest_rating.asc().nulls_last(),
+    BridgeCore.structure_number_008.collate("C"),
+    postgresql_where=BridgeCore.geom.isnot(None),
+)
+Index(
+    "ix_bridge_core_adt_029",
+    BridgeCore.adt_029.desc().nulls_last(),
+    BridgeCore.structure_number_008.collate("C"),
+    postgresql_where=BridgeCore.geom.isnot(None),
+)
+Index(
+    "ix_bridge_core_bridge_condition",
+    BridgeCore.bridge_condition.asc().nulls_last(),
+    BridgeCore.structure_number_008.collate("C"),
+    postgresql_where=BridgeCore.geom.isnot(None),
+)
+
 
 # ───────────────────────────────────────────────
 # Detailed Bridge Info Table
@@ -186,4 +233,112 @@ class BridgeDetails(Base):
     highway_system_104 = Column(CHAR(1))
     federal_lands_105 = Column(CHAR(1))
     fed_agency = Column(CHAR(1))
-    submitted_by = Column(CHAR(2))
\ No newline at end of file
+    submitted_by = Column(CHAR(2))
+
+
+# ───────────────────────────────────────────────
+# Bridge Cluster Summary Table (per-zoom grid aggregates, rebuilt by the ETL)
+# ───────────────────────────────────────────────
+class BridgeCluster(Base):
+    __tablename__ = "bridge_cluster"
+
+    # Grid Cell (a tile at `zoom` holds 2^CLUSTER_CELL_BITS x 2^CLUSTER_CELL_BITS cells)
+    zoom = Column(SmallInteger, primary_key=True)
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+
+    # Marker Position (mean location of the bridges in the cell)
+    lat = Column(Float)
+    lon = Column(Float)
+
+    # Aggregates
+    bridge_count = Column(Integer, nullable=False)
+    worst_lowest_rating = Column(Integer)
+    max_adt_029 = Column(Integer)
+
+    # Condition Histogram (bridge_condition G/F/P, anything else counts as unknown)
+    good_count = Column(Integer, nullable=False)
+    fair_count = Column(Integer, nullable=False)
+    poor_count = Column(Integer, nullable=False)
+    unknown_count = Column(Integer, nullable=False)
+
+
+# ───────────────────────────────────────────────
+# Per-Tile Top-N Table (materialized single-mode answers, rebuilt by the ETL)
+# ───────────────────────────────────────────────
+class BridgeTileTop(Base):
+    __tablename__ = "bridge_tile_top"
+
+    # Tile and Ordering
+    zoom = Column(SmallInteger, primary_key=True)
+    x = Column(Integer, primary_key=True)
+    y = Column(Integer, primary_key=True)
+    filter_key = Column(String(32), primary_key=True)
+
+    # Best bridges of the tile in filterKey order
+    structure_numbers = Column(ARRAY(String(15)), nullable=False)
+
+
+# ───────────────────────────────────────────────
+# Map Points Table (narrow copy of the tile fields, rebuilt by the ETL)
+# ───────────────────────────────────────────────
+class BridgeMapPoints(Base):
+    __tablename__ = "bridge_map_points"
+
+    # Fixed-width columns first so rows pack without alignment padding
+    lat_016 = Column(Float)
+    long_017 = Column(Float)
+    deck_area = Column(Float)
+    year_built_027 = Column(Integer)
+    adt_029 = Column(Integer)
+    year_reconstructed_106 = Column(Integer)
+    lowest_rating = Column(Integer)
+
+    # Ranking Keys (ascending key = filterKey order, NULLs last; see app/db/map_points.py)
+    rank_lowest_rating = Column(Integer, nullable=False)
+    rank_adt_029 = Column(Integer, nullable=False)
+    rank_bridge_condition = Column(SmallInteger, nullable=False)
+
+    # Condition Ratings and Identification
+    bridge_condition = Column(CHAR(1))
+    deck_cond_058 = Column(CHAR(1))
+    superstructure_cond_059 = Column(CHAR(1))
+    substructure_cond_060 = Column(CHAR(1))
+    channel_cond_061 = Column(CHAR(1))
+    culvert_cond_062 = Column(CHAR(1))
+    state_code_001 = Column(CHAR(3))
+    structure_number_008 = Column(String(15), primary_key=True)
+    geom = Column(Geometry(geometry_type='POINT', srid=4326, spatial_index=False), nullable=False)
+
+
+# ───────────────────────────────────────────────
+# Map Points Indexes
+# ───────────────────────────────────────────────
+# Spatial index carrying the ranking keys, for small-area tile queries
+Index(
+    "idx_bridge_map_points_geom",
+    BridgeMapPoints.geom,
+    postgresql_using="gist",
+    postgresql_include=["rank_lowest_rating", "rank_adt_029", "rank_bridge_condition", "structure_number_008"],
+)
+
+# One index per filterKey in ORDER BY order, carrying the geometry so a wide-area
+# top N can be picked by an index-only scan
+Index(
+    "ix_bridge_map_points_lowest_rating",
+    BridgeMapPoints.rank_lowest_rating,
+    BridgeMapPoints.structure_number_008.collate("C"),
+    postgresql_include=["geom"],
+)
+Index(
+    "ix_bridge_map_points_adt_029",
+    BridgeMapPoints.rank_adt_029,
+    BridgeMapPoints.structure_number_008.collate("C"),
+    postgresql_include=["geom"],
+)
+Index(
+    "ix_bridge_map_points_bridge_condition",
+    BridgeMapPoints.rank_bridge_condition,
+    BridgeMapPoints.structure_number_008.collate("C"),
+    postgresql_include=["geom"],
+)
@@ -0,0 +1,111 @@
+"""
+Server-side prepared statements for the hot tile queries.
+
+Tile SQL has a fixed shape per query kind and filterKey with every value bound, so each
+shape is PREPAREd once per pooled connection and afterwards run with EXECUTE. Postgres
+then skips parsing, and after a few executions switches to a cached generic plan, so
+planning drops out of the request path. Statements are named after a hash of their
+SQL and parameter types; the names a connection already has are kept in its pool
+`info` dict, which lives as long as the DBAPI connection.
+
+Each caller passes a label (e.g. "single:lowestRating"); prepare and execute timings
+are aggregated per label for GET /api/bridges/statements/stats. The async engine
+(asyncpg) prepares and caches statements by SQL text on its own, so it only records
+execution timings. Disable with PREPARED_STATEMENTS=false behind poolers that do
+not keep session state (e.g. PgBouncer in transaction mode).
+"""
+import re
+import time
+import hashlib
+import threading
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+# PostgreSQL types for bound Python values
+PARAM_TYPES = {bool: "boolean", int: "bigint", float: "float8", str: "text"}
+ARRAY_TYPES = {int: "integer[]", float: "float8[]", str: "text[]"}
+
+
+def param_type(value) -> str:
+    """
+    PostgreSQL type of a bound value (lists become arrays of their first element's type)
+    """
+    if isinstance(value, (list, tuple)):
+        return ARRAY_TYPES[type(value[0]) if value else float]
+    return PARAM_TYPES[type(value)]
+
+
+class StatementStats:
+    """
+    Thread-safe prepare/execute counters and timings per statement label
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, label: str, phase: str, seconds: float):
+        with self._lock:
+            entry = self._stats.setdefault(label, {"prepares": 0, "prepare_ms": 0.0, "executions": 0, "execute_ms": 0.0})
+            if phase == "prepare":
+                entry["prepares"] += 1
+                entry["prepare_ms"] += seconds * 1000
+            else:
+                entry["executions"] += 1
+                entry["execute_ms"] += seconds * 1000
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                label: {
+                    **{key: round(value, 3) if isinstance(value, float) else value for key, value in entry.items()},
+                    "avg_execute_ms": round(entry["execute_ms"] / entry["executions"], 3) if entry["executions"] else 0.0,
+                }
+                for label, entry in sorted(self._stats.items())
+            }
+
+
+statement_stats = StatementStats()
+
+
+def prepared_statement(sql: str, params: dict):
+    """
+    Return (name, PREPARE statement, EXECUTE statement) for a SQL text with named bind parameters
+    """
+    names = sorted(params, key=len, reverse=True)
+    types = {name: param_type(params[name]) for name in params}
+    statement_name = "tile_" + hashlib.md5((sql + repr(sorted(types.items()))).encode()).hexdigest()[:16]
+
+    # Replace :name with $n (longest names first so :lat doesn't eat :lat_min)
+    order = list(params)
+    body = sql.strip().rstrip(";")
+    for name in names:
+        body = re.sub(rf":{name}\b", f"${order.index(name) + 1}", body)
+
+    prepare = f"PREPARE {statement_name} ({', '.join(types[name] for name in order)}) AS {body}"
+    execute = f"EXECUTE {statement_name} ({', '.join(':' + name for name in order)})"
+    return statement_name, prepare, execute
+
+
+def execute_prepared(db: Session, label: str, sql: str, params: dict) -> list:
+    """
+    Run a query through a per-connection prepared statement and return its rows as mappings
+    """
+    if not settings.PREPARED_STATEMENTS:
+        started = time.perf_counter()
+        rows = db.execute(text(sql).execution_options(metrics_label=label), params).mappings().all()
+        statement_stats.record(label, "execute", time.perf_counter() - started)
+        return rows
+
+    name, prepare, execute = prepared_statement(sql, params)
+    prepared = db.connection().info.setdefault("prepared_statements", set())
+    if name not in prepared:
+        started = time.perf_counter()
+        db.execute(text(prepare).execution_options(metrics_label=f"prepare {label}"))
+        prepared.add(name)
+        statement_stats.record(label, "prepare", time.perf_counter() - started)
+
+    started = time.perf_counter()
+    rows = db.execute(text(execute).execution_options(metrics_label=label), params).mappings().all()
+    statement_stats.record(label, "execute", time.perf_counter() - started)
+    return rows
@@ -0,0 +1,175 @@
+"""
+Read-replica routing with a separate connection pool per workload.
+
+Tile and detail reads each get their own engines, so a detail burst or a reload on
+the primary cannot use up the connections tile queries need. Each engine has its own
+pool size, overflow, checkout timeout and statement_timeout. A workload spreads its
+sessions round robin over the replicas in READ_REPLICA_URLS, then falls back to its
+own pool on the primary.
+
+Health is checked without a background thread. At most once every
+REPLICA_HEALTH_CHECK_SECONDS per replica, a request checks out its connection up front
+(the pool pre-pings it). If that fails, the replica leaves the rotation and the request
+moves on to the next target. A dropped or refused connection on the sync engines also
+takes a replica out immediately. Query errors such as statement timeouts do not.
+"""
+import time
+import logging
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the target could not be reached (asyncpg raises OSError unwrapped on connect)
+CONNECT_ERRORS = (DBAPIError, OSError)
+
+
+def replica_urls(value: str) -> list[str]:
+    """
+    Split the comma-separated READ_REPLICA_URLS setting
+    """
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+def target_name(url: str) -> str:
+    """
+    host:port/database of a URL, for logs and metrics (never the password)
+    """
+    url = make_url(url)
+    return f"{url.host or 'localhost'}:{url.port or 5432}/{url.database}"
+
+
+def workload_options(prefix: str, settings) -> dict:
+    """
+    Pool options of a workload from its settings (prefix "DB" is the primary, "TILE_DB", "DETAIL_DB", ...)
+    """
+    return {
+        "pool_size": getattr(settings, f"{prefix}_POOL_SIZE"),
+        "max_overflow": getattr(settings, f"{prefix}_MAX_OVERFLOW"),
+        "pool_timeout": getattr(settings, f"{prefix}_POOL_TIMEOUT"),
+        "statement_timeout_ms": getattr(settings, f"{prefix}_STATEMENT_TIMEOUT_MS"),
+    }
+
+
+class RouteTarget:
+    """
+    One database a workload can read from: its engine, session factory and health
+    """
+    def __init__(self, name: str, session_factory, sync_engine, replica: bool):
+        self.name = name
+        self.session_factory = session_factory
+        self.sync_engine = sync_engine
+        self.replica = replica
+        self.healthy = True
+        self.next_check = 0.0
+        self.sessions = 0
+
+
+class ReplicaRouter:
+    """
+    Picks the target for each session of one workload: healthy replicas round robin, then the primary
+    """
+    def __init__(self, workload: str, replicas: list, primary: RouteTarget, check_seconds: float):
+        self.workload = workload
+        self.replicas = replicas
+        self.primary = primary
+        self.check_seconds = check_seconds
+        self.failovers = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        for target in replicas:
+            event.listen(target.sync_engine, "handle_error", self._error_listener(target))
+
+    def _error_listener(self, target: RouteTarget):
+        def handle_error(context):
+            # Lost or refused connections only; query errors (including statement_timeout) keep the replica
+            if context.is_disconnect or context.connection is None:
+                self.report(target, False)
+        return handle_error
+
+    def candidates(self) -> list:
+        """
+        (target, check) pairs to try in order; check means "verify the connection before use".
+        A replica due for its periodic check is claimed by this caller only.
+        """
+        now = time.monotonic()
+        order = []
+        with self._lock:
+            count = len(self.replicas)
+            start, self._next = self._next, (self._next + 1) % max(count, 1)
+            for i in range(count):
+                target = self.replicas[(start + i) % count]
+                if target.next_check <= now:
+                    target.next_check = now + self.check_seconds
+                    order.append((target, True))
+                elif target.healthy:
+                    order.append((target, False))
+        order.append((self.primary, False))
+        return order
+
+    def report(self, target: RouteTarget, healthy: bool):
+        """
+        Record a health check result; a failing replica waits check_seconds before the next try
+        """
+        with self._lock:
+            if target.healthy and not healthy:
+                self.failovers += 1
+                logger.warning("Read replica %s unavailable for %s, using other targets", target.name, self.workload)
+            elif healthy and not target.healthy:
+                logger.info("Read replica %s back in rotation for %s", target.name, self.workload)
+            target.healthy = healthy
+            if not healthy:
+                target.next_check = time.monotonic() + self.check_seconds
+
+    def chosen(self, target: RouteTarget):
+        with self._lock:
+            target.sessions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "failovers": self.failovers,
+                "targets": [
+                    {"name": target.name, "replica": target.replica, "healthy": target.healthy,
+                     "sessions": target.sessions}
+                    for target in self.replicas + [self.primary]
+                ],
+            }
+
+
+def open_session(router: ReplicaRouter):
+    """
+    Open a sync Session on the first usable target of the router
+    """
+    for target, check in router.candidates():
+        db = target.session_factory()
+        if check:
+            try:
+                db.connection()
+            except CONNECT_ERRORS:
+                db.close()
+                router.report(target, False)
+                continue
+            router.report(target, True)
+        router.chosen(target)
+        return db
+
+
+async def open_async_session(router: ReplicaRouter):
+    """
+    Open an AsyncSession on the first usable target of the router
+    """
+    for target, check in router.candidates():
+        db = target.session_factory()
+        if check:
+            try:
+                await db.connection()
+            except CONNECT_ERRORS:
+                await db.close()
+                router.report(target, False)
+                continue
+            router.report(target, True)
+        router.chosen(target)
+        return db
@@ -1,19 +1,70 @@
 """
 Database setup and session management using SQLAlchemy.
+
+`engine`/`SessionLocal` talk to the primary and serve writes, the ETL and the default
+endpoints. Tile and detail reads go through their own pools, on read replicas when
+READ_REPLICA_URLS is set (see app/db/routing.py).
 """
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy import create_engine
 from app.core.config import settings
+from app.core.metrics import TimedQueuePool, instrument_engine
+from app.db.routing import ReplicaRouter, RouteTarget, open_session, replica_urls, target_name, workload_options
 
 # Load database URL from environment
 DATABASE_URL = settings.DATABASE_URL
 
+
+def make_engine(url: str, pool_size: int, max_overflow: int, pool_timeout: float, statement_timeout_ms: int,
+                name: str = "primary"):
+    """
+    Engine with pre-ping, its own timed pool and an optional per-connection statement_timeout
+    """
+    connect_args = {"connect_timeout": settings.DB_CONNECT_TIMEOUT_SECONDS}
+    if statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    engine = create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_logging_name=name,
+        connect_args=connect_args,
+    )
+    # Per-statement timings and row counts for /metrics
+    instrument_engine(engine)
+    return engine
+
+
+def make_router(workload: str, prefix: str) -> ReplicaRouter:
+    """
+    Router of one read workload: a pool per replica, then a pool of its own on the primary
+    """
+    options = workload_options(prefix, settings)
+
+    def target(url: str, replica: bool) -> RouteTarget:
+        name = target_name(url)
+        workload_engine = make_engine(url, **options, name=f"{workload}@{name}")
+        factory = sessionmaker(bind=workload_engine, autocommit=False, autoflush=False)
+        return RouteTarget(name, factory, workload_engine, replica)
+
+    replicas = [target(url, replica=True) for url in replica_urls(settings.READ_REPLICA_URLS)]
+    return ReplicaRouter(workload, replicas, target(DATABASE_URL, replica=False), settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+
 # Create the database engine with pre-ping for better connection health
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = make_engine(DATABASE_URL, **workload_options("DB", settings))
 
 # Create a session maker 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# Read workloads with their own pools (replicas first, primary as fallback)
+tile_router = make_router("tiles", "TILE_DB")
+detail_router = make_router("details", "DETAIL_DB")
+
 # Base class for all ORM models
 Base = declarative_base()
 
@@ -23,4 +74,21 @@ def get_db() -> Session:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Dependencies for the tile and detail endpoints
+def get_tile_db() -> Session:
+    db = open_session(tile_router)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_detail_db() -> Session:
+    db = open_session(detail_router)
+    try:
+        yield db
+    finally:
+        db.close()
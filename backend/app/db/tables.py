@@ -0,0 +1,20 @@
+"""
+Lightweight table references for the serving path.
+
+The API reads bridge_core and bridge_details through fixed column sets, so it builds
+its SELECTs on plain `table()` constructs named after the response schemas instead of
+the ORM models. That keeps app.db.models, and geoalchemy2, shapely and NumPy under it,
+out of the uvicorn workers; the ETL, migrations and init_db keep using the models.
+"""
+from sqlalchemy import column, table
+from app.schemas.bridge import BridgeCoreResponse, BridgeDetailsResponse
+
+# bridge_core: the BridgeCoreResponse fields plus the geometry used for spatial filters
+bridge_core = table(
+    "bridge_core",
+    *(column(name) for name in BridgeCoreResponse.model_fields),
+    column("geom"),
+)
+
+# bridge_details: exactly the BridgeDetailsResponse fields (the model's columns, in order)
+bridge_details = table("bridge_details", *(column(name) for name in BridgeDetailsResponse.model_fields))
@@ -0,0 +1,46 @@
+"""
+SQL expressions for XYZ tile math, matching tile_to_bbox and the frontend's latLngToTile.
+"""
+
+# Web Mercator latitude limit, beyond which tile math is undefined
+MERCATOR_MAX_LAT = 85.0511287798
+
+
+def grid_size_sql(zoom: str) -> str:
+    """
+    Number of tiles per side at a zoom, as an integer
+    """
+    return f"CAST(power(2, {zoom}) AS integer)"
+
+
+def tile_x_sql(geom: str, n: str) -> str:
+    """
+    Column index of the tile containing a point, on an n x n grid
+    """
+    return f"LEAST(GREATEST(CAST(floor((ST_X({geom}) + 180) / 360 * {n}) AS integer), 0), {n} - 1)"
+
+
+def tile_y_sql(geom: str, n: str) -> str:
+    """
+    Row index of the tile containing a point, on an n x n grid
+    """
+    fraction = f"(1 - ln(tan(radians(ST_Y({geom}))) + 1 / cos(radians(ST_Y({geom})))) / pi()) / 2"
+    return f"LEAST(GREATEST(CAST(floor({fraction} * {n}) AS integer), 0), {n} - 1)"
+
+
+def tile_envelope_sql(zoom: str, x: str, y: str) -> str:
+    """
+    EPSG:4326 envelope of tile (x, y) at a zoom, the SQL twin of tile_to_bbox
+    """
+    n = f"power(2, {zoom})"
+    return (
+        f"ST_MakeEnvelope({x} / {n} * 360 - 180, degrees(atan(sinh(pi() * (1 - 2 * ({y} + 1) / {n})))), "
+        f"({x} + 1) / {n} * 360 - 180, degrees(atan(sinh(pi() * (1 - 2 * {y} / {n})))), 4326)"
+    )
+
+
+def mappable_sql(geom: str) -> str:
+    """
+    Predicate for points that have a tile (geometry present and within Web Mercator latitudes)
+    """
+    return f"{geom} IS NOT NULL AND ST_Y({geom}) BETWEEN -{MERCATOR_MAX_LAT} AND {MERCATOR_MAX_LAT}"
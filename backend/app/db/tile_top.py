@@ -0,0 +1,135 @@
+"""
+Materialized per-tile top-N bridges for every filterKey, keyed by (zoom, x, y, filter_key).
+
+Each row stores the structure numbers of a tile's best TILE_TOP_N bridges in filterKey
+order, so a tile query becomes a primary key lookup plus a join on bridge_core. A bridge
+belongs to the one tile containing its point (on a shared edge, the tile to its right/below).
+Full loads rebuild the table; delta loads refresh only the tiles whose bridges changed.
+"""
+from app.db.dataset_version import build_stamp_sql
+from app.db.session import engine
+from app.db.tile_math import grid_size_sql, mappable_sql, tile_envelope_sql, tile_x_sql, tile_y_sql
+
+CORE_TABLE = "bridge_core"
+TILE_TOP_TABLE = "bridge_tile_top"
+
+# Materialized zooms and list length; requests outside these fall back to the live queries
+TILE_TOP_MIN_ZOOM = 4
+TILE_TOP_MAX_ZOOM = 12
+TILE_TOP_N = 100
+
+# Positions of changed bridges (before and after the change), filled during a delta load
+TOUCHED_TABLE = "tile_top_touched"
+
+# Same orderings as bridge_service.ORDER_CLAUSES (structure number breaks ties, in C collation)
+TILE_TOP_ORDER = {
+    "lowestRating": 'lowest_rating ASC NULLS LAST, structure_number_008 COLLATE "C"',
+    "highestADT": 'adt_029 DESC NULLS LAST, structure_number_008 COLLATE "C"',
+    "worstBridgeCondition": 'bridge_condition ASC NULLS LAST, structure_number_008 COLLATE "C"',
+}
+
+
+def refresh_tile_top_sql(source_table: str = CORE_TABLE) -> list[str]:
+    """
+    Statements that rebuild bridge_tile_top from source_table inside the caller's transaction
+    """
+    statements = [f"DELETE FROM {TILE_TOP_TABLE}"]
+    for filter_key, order in TILE_TOP_ORDER.items():
+        statements.append(f"""
+        INSERT INTO {TILE_TOP_TABLE} (zoom, x, y, filter_key, structure_numbers)
+        SELECT zoom, x, y, '{filter_key}', array_agg(structure_number_008 ORDER BY rank)
+        FROM (
+            SELECT z.zoom, tile.x, tile.y, b.structure_number_008,
+                   row_number() OVER (PARTITION BY z.zoom, tile.x, tile.y ORDER BY {order}) AS rank
+            FROM (
+                SELECT geom, structure_number_008, lowest_rating, adt_029, bridge_condition
+                FROM {source_table}
+                WHERE {mappable_sql("geom")}
+            ) b
+            CROSS JOIN generate_series({TILE_TOP_MIN_ZOOM}, {TILE_TOP_MAX_ZOOM}) AS z(zoom)
+            CROSS JOIN LATERAL (
+                SELECT {tile_x_sql("b.geom", grid_size_sql("z.zoom"))} AS x,
+                       {tile_y_sql("b.geom", grid_size_sql("z.zoom"))} AS y
+            ) tile
+        ) ranked
+        WHERE rank <= {TILE_TOP_N}
+        GROUP BY zoom, x, y
+        """)
+    statements.append(build_stamp_sql(TILE_TOP_TABLE))
+    statements.append(f"ANALYZE {TILE_TOP_TABLE}")
+    return statements
+
+
+# Delta loads: record positions of changed bridges, then rebuild only the tiles containing them
+CREATE_TOUCHED_SQL = f"CREATE TEMP TABLE IF NOT EXISTS {TOUCHED_TABLE} (geom geometry) ON COMMIT DROP"
+
+RECORD_TOUCHED_SQL = f"""
+    INSERT INTO {TOUCHED_TABLE} (geom)
+    SELECT geom FROM {CORE_TABLE}
+    WHERE structure_number_008 = ANY(:keys) AND {mappable_sql("geom")}
+"""
+
+
+def refresh_touched_tiles_sql() -> list[str]:
+    """
+    Statements that recompute the tiles listed in tile_top_touched, one lateral top-N per tile
+    """
+    touched_tiles = f"""
+        SELECT DISTINCT z.zoom, {tile_x_sql("t.geom", grid_size_sql("z.zoom"))} AS x,
+                        {tile_y_sql("t.geom", grid_size_sql("z.zoom"))} AS y
+        FROM {TOUCHED_TABLE} t
+        CROSS JOIN generate_series({TILE_TOP_MIN_ZOOM}, {TILE_TOP_MAX_ZOOM}) AS z(zoom)
+    """
+    statements = [
+        "DROP TABLE IF EXISTS tile_top_dirty",
+        f"CREATE TEMP TABLE tile_top_dirty ON COMMIT DROP AS {touched_tiles}",
+        f"""
+        DELETE FROM {TILE_TOP_TABLE} top
+        USING tile_top_dirty d
+        WHERE top.zoom = d.zoom AND top.x = d.x AND top.y = d.y
+        """,
+    ]
+    for filter_key, order in TILE_TOP_ORDER.items():
+        statements.append(f"""
+        INSERT INTO {TILE_TOP_TABLE} (zoom, x, y, filter_key, structure_numbers)
+        SELECT d.zoom, d.x, d.y, '{filter_key}', top.structure_numbers
+        FROM tile_top_dirty d
+        CROSS JOIN LATERAL (
+            SELECT ARRAY(
+                SELECT b.structure_number_008
+                FROM {CORE_TABLE} b
+                WHERE b.geom IS NOT NULL
+                  AND ST_Intersects(b.geom, {tile_envelope_sql("d.zoom", "d.x", "d.y")})
+                  AND {tile_x_sql("b.geom", grid_size_sql("d.zoom"))} = d.x
+                  AND {tile_y_sql("b.geom", grid_size_sql("d.zoom"))} = d.y
+                ORDER BY {order}
+                LIMIT {TILE_TOP_N}
+            ) AS structure_numbers
+        ) top
+        WHERE cardinality(top.structure_numbers) > 0
+        """)
+    return statements
+
+
+def refresh_tile_top(cursor, source_table: str = CORE_TABLE):
+    """
+    Rebuild bridge_tile_top inside the caller's load transaction (DBAPI cursor)
+    """
+    for statement in refresh_tile_top_sql(source_table):
+        cursor.execute(statement)
+
+
+def rebuild_tile_top():
+    """
+    Rebuild bridge_tile_top from the live tables in its own transaction (e.g. right after a migration)
+    """
+    connection = engine.raw_connection()
+    try:
+        refresh_tile_top(connection.cursor())
+        connection.commit()
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    rebuild_tile_top()
@@ -1,9 +1,16 @@
 """
-Main entry point for FastAPI app with CORS and API routing setup.
+Main entry point for FastAPI app with CORS, metrics and API routing setup.
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
+from app.api.endpoints.bridges import read_routers
+from app.core.config import settings
+from app.core.metrics import (
+    PROMETHEUS_MEDIA_TYPE, MetricsMiddleware, register_collector, render_family, render_metrics
+)
+from app.utils.bridge_service import tile_cache, tile_flights
+from app.utils.detail_service import detail_cache
 
 app = FastAPI()
 
@@ -15,7 +22,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the map client read the "already have" token of tile responses
+    expose_headers=["X-Tile-Have"],
 )
 
 # Include all API routes under the /api prefix
-app.include_router(api_router, prefix="/api")
\ No newline at end of file
+app.include_router(api_router, prefix="/api")
+
+# Per-endpoint latency, response size, DB and pool timings, exported at /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+    # (stats key, metric type, help) of the tile and detail caches
+    CACHE_METRICS = [
+        ("hits", "counter", "Cache lookups answered from this process"),
+        ("shared_hits", "counter", "Cache lookups answered from the shared backend"),
+        ("misses", "counter", "Cache lookups that had to query the database"),
+        ("evictions", "counter", "Entries evicted to stay within the size limit"),
+        ("bytes", "gauge", "Bytes of cached entries"),
+    ]
+
+    def cache_metrics():
+        caches = {"tile": tile_cache.stats(), "detail": detail_cache.stats()}
+        lines = []
+        for key, kind, help in CACHE_METRICS:
+            name = f"cache_{key}_total" if kind == "counter" else f"cache_{key}"
+            lines += render_family(name, kind, help, [({"cache": cache}, stats[key]) for cache, stats in caches.items()])
+
+        flights = tile_flights.stats()
+        lines += render_family("tile_query_executions_total", "counter", "Tile queries run against the database",
+                               [({}, flights["executions"])])
+        lines += render_family("tile_query_saved_total", "counter", "Tile queries answered by a concurrent identical one",
+                               [({}, flights["saved"])])
+
+        routes = {workload: router.stats() for workload, router in read_routers().items()}
+        targets = [({"workload": workload, "target": target["name"]}, target)
+                   for workload, stats in routes.items() for target in stats["targets"]]
+        lines += render_family("db_route_failovers_total", "counter", "Replicas taken out of rotation",
+                               [({"workload": workload}, stats["failovers"]) for workload, stats in routes.items()])
+        lines += render_family("db_route_healthy", "gauge", "Whether a route target is in rotation",
+                               [(labels, int(target["healthy"])) for labels, target in targets])
+        lines += render_family("db_route_sessions_total", "counter", "Sessions opened on a route target",
+                               [(labels, target["sessions"]) for labels, target in targets])
+        return lines
+
+    register_collector(cache_metrics)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(content=render_metrics(), media_type=PROMETHEUS_MEDIA_TYPE)
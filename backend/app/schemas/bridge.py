@@ -1,8 +1,12 @@
 """
 Pydantic schema definitions for bridge core, detailed responses, and tile batch request.
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, List
+from app.core.config import settings
+
+# Deepest zoom accepted in tile requests
+TILE_MAX_ZOOM = 24
 
 # Schema for summarized bridge core information
 class BridgeCoreResponse(BaseModel):
@@ -159,7 +163,70 @@ class BridgeDetailsResponse(BaseModel):
         from_attributes = True
 
 
+# Filters and keyset position of a streaming bridge export
+class BridgeExportFilters(BaseModel):
+    state: Optional[List[str]] = None
+    bbox: Optional[List[float]] = None  # west, south, east, north
+    min_lowest_rating: Optional[int] = None
+    max_lowest_rating: Optional[int] = None
+    min_adt: Optional[int] = None
+    bridge_condition: Optional[List[str]] = None
+    after: Optional[str] = None  # last structure_number_008 already received
+    limit: Optional[int] = None
+
+
 # Schema for tile batch request payload
 class TileBatchRequest(BaseModel):
-    zoom: int
+    zoom: int = Field(ge=0, le=TILE_MAX_ZOOM)
     tiles: List[List[int]]
+    # X-Tile-Have tokens from earlier responses; rows they cover are left out
+    have: List[str] = []
+
+    @field_validator("tiles")
+    @classmethod
+    def check_tiles(cls, tiles):
+        # Bounded list of [x, y] pairs
+        if len(tiles) > settings.TILE_BATCH_MAX_TILES:
+            raise ValueError(f"At most {settings.TILE_BATCH_MAX_TILES} tiles per request.")
+        if any(len(tile) != 2 for tile in tiles):
+            raise ValueError("Each tile must be an [x, y] pair.")
+        return tiles
+
+    @model_validator(mode="after")
+    def check_tile_range(self):
+        # Every tile must exist at the requested zoom
+        n = 2 ** self.zoom
+        if any(not (0 <= x < n and 0 <= y < n) for x, y in self.tiles):
+            raise ValueError(f"Tile indexes must be between 0 and {n - 1} at zoom {self.zoom}.")
+        return self
+
+
+# Schema for a batch lookup of bridge details
+class BridgeDetailsBatchRequest(BaseModel):
+    structure_numbers: List[str]
+
+
+# Schema for one aggregated grid cell of the low-zoom cluster view
+class BridgeClusterResponse(BaseModel):
+    # Grid Cell
+    zoom: int
+    cell_x: int
+    cell_y: int
+
+    # Marker Position
+    lat: Optional[float]
+    lon: Optional[float]
+
+    # Aggregates
+    bridge_count: int
+    worst_lowest_rating: Optional[int]
+    max_adt_029: Optional[int]
+
+    # Condition Histogram
+    good_count: int
+    fair_count: int
+    poor_count: int
+    unknown_count: int
+
+    class Config:
+        from_attributes = True
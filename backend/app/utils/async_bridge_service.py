@@ -0,0 +1,150 @@
+"""
+Async counterparts of the bridge_service queries for AsyncSession (asyncpg).
+SQL, caching and response assembly are shared with the sync path. asyncpg prepares
+and caches every statement by its SQL text, so the fixed tile statement shapes are
+planned once per connection without explicit PREPAREs.
+"""
+import time
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.metrics import timed
+from app.db.dataset_version import (
+    READ_VERSION_SQL, DatasetState, cached_dataset_state, dataset_state, remember_dataset_state, state_key
+)
+from app.db.prepared import statement_stats
+from app.schemas.bridge import TileBatchRequest
+from app.utils.bridge_service import (
+    FILTER_KEYS, ORDER_CLAUSES, assemble_from_cache, assemble_tiles, build_batch_tile_sql, build_single_tile_sql,
+    build_tile_top_sql, cached_tiles, flight_key, group_tile_rows, map_points_ready, memory_index, tile_cache, tile_flights,
+    tile_top_covers,
+)
+from app.utils.detail_service import build_details_query, cached_details, store_details
+
+
+async def current_dataset_state_async(db: AsyncSession) -> DatasetState:
+    """
+    current_dataset_state for an AsyncSession.
+    """
+    key = state_key(db)
+    state = cached_dataset_state(key)
+    if state is None:
+        state = remember_dataset_state(key, dataset_state((await db.execute(text(READ_VERSION_SQL))).first()))
+    return state
+
+
+async def current_dataset_version_async(db: AsyncSession) -> int:
+    """
+    current_dataset_version for an AsyncSession.
+    """
+    return (await current_dataset_state_async(db)).version
+
+
+async def execute_async(db: AsyncSession, label: str, sql: str, params: dict) -> list:
+    """
+    Run a tile statement and record its execution time under label.
+    """
+    started = time.perf_counter()
+    rows = (await db.execute(text(sql).execution_options(metrics_label=label), params)).mappings().all()
+    statement_stats.record(label, "execute", time.perf_counter() - started)
+    return rows
+
+
+async def single_tile_query_async(req: TileBatchRequest, limit: int, order_clause: str, db: AsyncSession):
+    """
+    Return top N bridges per tile using a lateral index lookup per tile,
+    or a primary key lookup in bridge_tile_top when it covers the request.
+    """
+    built = (await current_dataset_state_async(db)).built
+    if tile_top_covers(req.zoom, limit, built):
+        tiles = [list(tile) for tile in dict.fromkeys((x, y) for x, y in req.tiles)]
+        per_tile = await materialized_tile_query_async(tiles, req.zoom, limit, FILTER_KEYS[order_clause], db)
+        return [row for rows in per_tile.values() for row in rows]
+
+    sql, params = build_single_tile_sql(req, limit, order_clause, map_points_ready(built))
+    return await execute_async(db, f"single:{FILTER_KEYS[order_clause]}", sql, params)
+
+
+async def batch_tile_query_async(req: TileBatchRequest, limit: int, order_clause: str, db: AsyncSession):
+    """
+    Return top N bridges from the union of all tiles using spatial intersection.
+    """
+    built = (await current_dataset_state_async(db)).built
+    sql, params = build_batch_tile_sql(req, limit, order_clause, map_points_ready(built))
+    return await execute_async(db, f"batch:{FILTER_KEYS[order_clause]}", sql, params)
+
+
+async def materialized_tile_query_async(tiles: list, zoom: int, limit: int, filter_key: str,
+                                        db: AsyncSession) -> dict:
+    """
+    Return {(x, y): rows} with the materialized top N bridges of every tile.
+    """
+    built = (await current_dataset_state_async(db)).built
+    sql, params = build_tile_top_sql(tiles, zoom, limit, filter_key, map_points_ready(built))
+    return group_tile_rows(tiles, await execute_async(db, "tiletop", sql, params))
+
+
+async def per_tile_query_async(tiles: list, zoom: int, limit: int, order_clause: str, db: AsyncSession) -> dict:
+    """
+    Return {(x, y): rows} with the independent top N bridges of every tile.
+    """
+    built = (await current_dataset_state_async(db)).built
+    if tile_top_covers(zoom, limit, built):
+        return await materialized_tile_query_async(tiles, zoom, limit, FILTER_KEYS[order_clause], db)
+
+    req = TileBatchRequest(zoom=zoom, tiles=tiles)
+    sql, params = build_single_tile_sql(req, limit, order_clause, map_points_ready(built), exclusive=False)
+    return group_tile_rows(tiles, await execute_async(db, f"pertile:{FILTER_KEYS[order_clause]}", sql, params))
+
+
+async def fetch_tile_bridges_async(req: TileBatchRequest, limit: int, filter_key: str, mode: str,
+                                   db: AsyncSession) -> tuple[list, int]:
+    """
+    Answer a tile request from the in-memory index when loaded, otherwise from the
+    per-tile cache, querying PostGIS only for missing tiles. Concurrent identical
+    requests share one database round.
+    Returns (rows, dataset version the rows were answered from).
+    """
+    if settings.MEMORY_INDEX_ENABLED and memory_index.available:
+        # The index is loaded by a background thread with the sync engine, and may still be
+        # the previous version while its replacement loads
+        index = memory_index.current(await current_dataset_version_async(db))
+        if index is not None:
+            with timed("memory_index"):
+                return index.query(req.tiles, req.zoom, limit, filter_key, mode), index.version
+
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return await query_tile_bridges_async(req, limit, filter_key, mode, db)
+    return await tile_flights.do_async(flight_key(req, limit, filter_key, mode),
+                                       lambda: query_tile_bridges_async(req, limit, filter_key, mode, db))
+
+
+async def query_tile_bridges_async(req: TileBatchRequest, limit: int, filter_key: str, mode: str,
+                                   db: AsyncSession) -> tuple[list, int]:
+    """
+    Answer a tile request from the per-tile cache and PostGIS. Returns (rows, dataset version).
+    """
+    order_clause = ORDER_CLAUSES[filter_key]
+    version = await current_dataset_version_async(db)
+    if not assemble_from_cache(req, limit, mode):
+        query = single_tile_query_async if mode == "single" else batch_tile_query_async
+        return [dict(row) for row in await query(req, limit, order_clause, db)], version
+
+    keys, per_tile, missing = cached_tiles(req, limit, filter_key, version)
+    if missing:
+        fetched = await per_tile_query_async(missing, req.zoom, limit, order_clause, db)
+        tile_cache.put_many({keys[tile]: rows for tile, rows in fetched.items()})
+        per_tile.update(fetched)
+
+    with timed("assemble"):
+        return assemble_tiles([per_tile[tile] for tile in keys], limit, filter_key, mode), version
+
+
+async def fetch_bridge_details_async(structure_numbers: list, version: int, db: AsyncSession) -> dict:
+    """
+    fetch_bridge_details for an AsyncSession.
+    """
+    payloads, missing = cached_details(structure_numbers, version)
+    if missing:
+        payloads.update(store_details((await db.execute(build_details_query(missing))).mappings().all(), version))
+    return payloads
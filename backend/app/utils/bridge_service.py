@@ -4,7 +4,66 @@ Tile-based spatial query utilities for fetching bridge data using bounding boxes
 from math import atan, exp, pi
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from app.core.config import settings
+from app.core.metrics import timed
+from app.db.clusters import CLUSTER_CELL_BITS
+from app.db.dataset_version import current_dataset_state, current_dataset_version
+from app.db.map_points import MAP_POINTS_TABLE, RANK_COLUMNS, map_points_order
+from app.db.prepared import execute_prepared
+from app.db.tile_top import TILE_TOP_MAX_ZOOM, TILE_TOP_MIN_ZOOM, TILE_TOP_N, TILE_TOP_TABLE
 from app.schemas.bridge import TileBatchRequest
+from app.utils.memory_index import MemoryIndexManager
+from app.utils.single_flight import SingleFlight
+from app.utils.tile_cache import TileCache
+from app.utils.tile_rects import coalesce_tiles, rect_bounds
+
+# SQL ORDER BY clause for each supported filterKey (each one backed by an index in models.py).
+# The structure number breaks ties, so every path returns the same top N. It compares in C
+# collation, the order Python's str comparison gives when rows are merged in memory.
+ORDER_CLAUSES = {
+    "lowestRating": 'lowest_rating ASC NULLS LAST, structure_number_008 COLLATE "C"',
+    "highestADT": 'adt_029 DESC NULLS LAST, structure_number_008 COLLATE "C"',
+    "worstBridgeCondition": 'bridge_condition ASC NULLS LAST, structure_number_008 COLLATE "C"',
+}
+
+# filterKey for each ORDER BY clause
+FILTER_KEYS = {order_clause: filter_key for filter_key, order_clause in ORDER_CLAUSES.items()}
+
+# Columns returned by the tile queries (the fields of BridgeCoreResponse)
+TILE_COLUMNS = [
+    "structure_number_008",
+    "state_code_001",
+    "lat_016",
+    "long_017",
+    "year_built_027",
+    "adt_029",
+    "deck_cond_058",
+    "superstructure_cond_059",
+    "substructure_cond_060",
+    "channel_cond_061",
+    "culvert_cond_062",
+    "year_reconstructed_106",
+    "bridge_condition",
+    "lowest_rating",
+    "deck_area",
+]
+TILE_COLUMNS_SQL = ", ".join(TILE_COLUMNS)
+
+# (column, descending) per filterKey, the Python equivalent of ORDER_CLAUSES (NULLS LAST, then structure number)
+SORT_COLUMNS = {
+    "lowestRating": ("lowest_rating", False),
+    "highestADT": ("adt_029", True),
+    "worstBridgeCondition": ("bridge_condition", False),
+}
+
+# Per-tile result cache shared by all requests in this process
+tile_cache = TileCache(settings.TILE_CACHE_MAX_BYTES)
+
+# In-memory index of bridge_core, loaded on first use when MEMORY_INDEX_ENABLED is set
+memory_index = MemoryIndexManager(TILE_COLUMNS, SORT_COLUMNS, settings.MEMORY_INDEX_RETRY_SECONDS)
+
+# Identical tile requests in flight at the same time share one database query
+tile_flights = SingleFlight()
 
 def tile_to_bbox(tileX: int, tileY: int, zoom: int):
     """
@@ -35,87 +94,349 @@ def tile_to_bbox(tileX: int, tileY: int, zoom: int):
     return lat_min, lat_max, lon_min, lon_max
 
 
+def tile_bounds(tiles: list, zoom: int) -> dict:
+    """
+    Tile envelopes as parallel bound arrays for TILES_CTE.
+    """
+    with timed("bbox"):
+        return rect_bounds([(x, y, x, y) for x, y in tiles], zoom)
+
+
+# Tile envelopes unnested from bound arrays, so the SQL text never depends on the tiles
+TILES_CTE = """
+    WITH tiles AS (
+        SELECT t.tile_idx,
+               ST_MakeEnvelope(t.lon_min, t.lat_min, t.lon_max, t.lat_max, 4326) AS envelope
+        FROM unnest(
+            CAST(:lon_min AS float8[]), CAST(:lat_min AS float8[]),
+            CAST(:lon_max AS float8[]), CAST(:lat_max AS float8[])
+        ) WITH ORDINALITY AS t(lon_min, lat_min, lon_max, lat_max, tile_idx)
+    )"""
+
+
+def map_points_ready(built: frozenset) -> bool:
+    """
+    Whether tile queries read bridge_map_points. built is DatasetState.built: until a
+    rebuild stamps the table (e.g. right after its migration) it is empty.
+    """
+    return settings.MAP_POINTS_ENABLED and MAP_POINTS_TABLE in built
+
+
+def tile_source(order_clause: str, map_points: bool) -> tuple[str, str]:
+    """
+    Table and ORDER BY clause the live tile queries read: bridge_map_points and its ranking
+    key when map_points (see map_points_ready), else bridge_core and order_clause (the same row order).
+    """
+    if map_points:
+        return MAP_POINTS_TABLE, map_points_order(FILTER_KEYS[order_clause])
+    return "bridge_core", order_clause
+
+
+def build_single_tile_sql(req: TileBatchRequest, limit: int, order_clause: str, map_points: bool,
+                          exclusive: bool = True):
+    """
+    Build the SQL and bind parameters used by single_tile_query.
+    With exclusive=False every tile gets its own independent top N (plus a tile_idx column).
+    """
+    # For each tile, an index-driven top-N lookup limited to bridges inside that tile.
+    # A bridge on a shared tile edge belongs to the first tile containing it.
+    earlier_tiles = """
+          AND NOT EXISTS (
+              SELECT 1 FROM tiles earlier
+              WHERE earlier.tile_idx < tiles.tile_idx
+                AND ST_Intersects(geom, earlier.envelope)
+          )""" if exclusive else ""
+    tile_idx = "" if exclusive else "tiles.tile_idx, "
+    table, order = tile_source(order_clause, map_points)
+
+    sql = f"""{TILES_CTE}
+    SELECT {tile_idx}ranked.*
+    FROM tiles
+    CROSS JOIN LATERAL (
+        SELECT {TILE_COLUMNS_SQL}
+        FROM {table}
+        WHERE geom IS NOT NULL
+          AND ST_Intersects(geom, tiles.envelope){earlier_tiles}
+        ORDER BY {order}
+        LIMIT :limit
+    ) ranked
+    ORDER BY tiles.tile_idx;
+    """
+    return sql, {**tile_bounds(req.tiles, req.zoom), "limit": limit}
+
+
 def single_tile_query(req: TileBatchRequest, limit: int, order_clause: str, db: Session):
     """
-    Return top N bridges per tile using spatial intersection and partitioned row number.
-    """
-    cases = []
-    params = {}
-
-    # Generate SQL CASE WHEN clauses for each tile
-    for i, (x, y) in enumerate(req.tiles):
-        lat_min, lat_max, lon_min, lon_max = tile_to_bbox(x, y, req.zoom)
-        params.update({
-            f"lat{i}a": lat_min, f"lat{i}b": lat_max,
-            f"lon{i}a": lon_min, f"lon{i}b": lon_max
-        })
-        cases.append(
-            f"""
-            WHEN ST_Intersects(geom, ST_MakeEnvelope(:lon{i}a, :lat{i}a, :lon{i}b, :lat{i}b, 4326))
-            THEN 'tile_{i}'
-            """
-        )
-
-    # Create tile_id column from spatial conditions
-    case_sql = "CASE " + " ".join(cases) + " END AS tile_id"
-
-    # SQL with partitioned row_number to get top N bridges per tile
+    Return top N bridges per tile using a lateral index lookup per tile,
+    or a primary key lookup in bridge_tile_top when it covers the request.
+    """
+    built = current_dataset_state(db).built
+    if tile_top_covers(req.zoom, limit, built):
+        tiles = [list(tile) for tile in dict.fromkeys((x, y) for x, y in req.tiles)]
+        per_tile = materialized_tile_query(tiles, req.zoom, limit, FILTER_KEYS[order_clause], db)
+        return [row for rows in per_tile.values() for row in rows]
+
+    sql, params = build_single_tile_sql(req, limit, order_clause, map_points_ready(built))
+    return execute_prepared(db, f"single:{FILTER_KEYS[order_clause]}", sql, params)
+
+
+def tile_top_covers(zoom: int, limit: int, built: frozenset) -> bool:
+    """
+    Whether bridge_tile_top holds the answer for this zoom and limit.
+    built is DatasetState.built: until a rebuild stamps the table (e.g. right after
+    its migration) it is empty, and the live query answers instead.
+    """
+    return (settings.TILE_TOP_ENABLED and TILE_TOP_TABLE in built
+            and TILE_TOP_MIN_ZOOM <= zoom <= TILE_TOP_MAX_ZOOM and limit <= TILE_TOP_N)
+
+
+def build_tile_top_sql(tiles: list, zoom: int, limit: int, filter_key: str, map_points: bool):
+    """
+    Build the SQL and bind parameters that read tiles from bridge_tile_top (tile_idx tags each row).
+    """
+    columns = ", ".join(f"b.{column}" for column in TILE_COLUMNS)
+    table = MAP_POINTS_TABLE if map_points else "bridge_core"
+
+    # One primary key lookup per tile, then the first `limit` structure numbers joined back to the bridges
     sql = f"""
-    WITH per_tile_limited AS (
-        SELECT *,
-               ROW_NUMBER() OVER (
-                 PARTITION BY tile_id
-                 ORDER BY {order_clause}
-               ) AS rn
-        FROM (
-            SELECT *,
-                   {case_sql}
-            FROM bridge_core
-        ) sub
-    )
-    SELECT *
-    FROM per_tile_limited
-    WHERE rn <= :limit;
-    """
-    params["limit"] = limit
-    return db.execute(text(sql), params).mappings().all()
+    SELECT t.tile_idx, {columns}
+    FROM unnest(CAST(:tile_x AS integer[]), CAST(:tile_y AS integer[])) WITH ORDINALITY AS t(x, y, tile_idx)
+    JOIN bridge_tile_top top
+      ON top.zoom = :zoom AND top.x = t.x AND top.y = t.y AND top.filter_key = :filter_key
+    CROSS JOIN LATERAL unnest(top.structure_numbers[1:CAST(:limit AS integer)])
+        WITH ORDINALITY AS s(structure_number_008, rank)
+    JOIN {table} b ON b.structure_number_008 = s.structure_number_008
+    ORDER BY t.tile_idx, s.rank;
+    """
+    params = {"tile_x": [x for x, _ in tiles], "tile_y": [y for _, y in tiles], "zoom": zoom,
+              "filter_key": filter_key, "limit": limit}
+    return sql, params
+
+
+def materialized_tile_query(tiles: list, zoom: int, limit: int, filter_key: str, db: Session) -> dict:
+    """
+    Return {(x, y): rows} with the materialized top N bridges of every tile.
+    """
+    built = current_dataset_state(db).built
+    sql, params = build_tile_top_sql(tiles, zoom, limit, filter_key, map_points_ready(built))
+    return group_tile_rows(tiles, execute_prepared(db, "tiletop", sql, params))
+
+
+def build_batch_tile_sql(req: TileBatchRequest, limit: int, order_clause: str, map_points: bool):
+    """
+    Build the SQL and bind parameters used by batch_tile_query.
+    """
+    # The tiles are coalesced into a few rectangles (the rows of TILES_CTE here); a bridge
+    # matches when it falls in any of them, a plain bounding box test the GiST index answers
+    if map_points:
+        # Top N structure numbers first: over a wide area this walks the ranking index,
+        # which carries the geometry, without visiting the heap; then fetch just those rows
+        rank = RANK_COLUMNS[FILTER_KEYS[order_clause]]
+        columns = ", ".join(f"p.{column}" for column in TILE_COLUMNS)
+        sql = f"""{TILES_CTE}
+    SELECT {columns}
+    FROM (
+        SELECT structure_number_008, {rank}
+        FROM {MAP_POINTS_TABLE}
+        WHERE EXISTS (SELECT 1 FROM tiles WHERE {MAP_POINTS_TABLE}.geom && tiles.envelope)
+        ORDER BY {map_points_order(FILTER_KEYS[order_clause])}
+        LIMIT :limit
+    ) top
+    JOIN {MAP_POINTS_TABLE} p ON p.structure_number_008 = top.structure_number_008
+    ORDER BY top.{rank}, top.structure_number_008 COLLATE "C";
+    """
+    else:
+        sql = f"""{TILES_CTE}
+    SELECT {TILE_COLUMNS_SQL}
+    FROM bridge_core
+    WHERE geom IS NOT NULL
+      AND EXISTS (SELECT 1 FROM tiles WHERE bridge_core.geom && tiles.envelope)
+    ORDER BY {order_clause}
+    LIMIT :limit;
+    """
+    with timed("bbox"):
+        bounds = rect_bounds(coalesce_tiles(req.tiles), req.zoom)
+    return sql, {**bounds, "limit": limit}
 
 
 def batch_tile_query(req: TileBatchRequest, limit: int, order_clause: str, db: Session):
     """
     Return top N bridges from the union of all tiles using spatial intersection.
-    """    
-    envelopes = []
-    
-    # Convert each tile to an envelope bounding box
+    """
+    built = current_dataset_state(db).built
+    sql, params = build_batch_tile_sql(req, limit, order_clause, map_points_ready(built))
+    return execute_prepared(db, f"batch:{FILTER_KEYS[order_clause]}", sql, params)
+
+
+def per_tile_query(tiles: list, zoom: int, limit: int, order_clause: str, db: Session) -> dict:
+    """
+    Return {(x, y): rows} with the independent top N bridges of every tile.
+    """
+    built = current_dataset_state(db).built
+    if tile_top_covers(zoom, limit, built):
+        return materialized_tile_query(tiles, zoom, limit, FILTER_KEYS[order_clause], db)
+
+    req = TileBatchRequest(zoom=zoom, tiles=tiles)
+    sql, params = build_single_tile_sql(req, limit, order_clause, map_points_ready(built), exclusive=False)
+    return group_tile_rows(tiles, execute_prepared(db, f"pertile:{FILTER_KEYS[order_clause]}", sql, params))
+
+
+def group_tile_rows(tiles: list, rows) -> dict:
+    """
+    Group rows tagged with a 1-based tile_idx into {(x, y): rows}.
+    """
+    results = {tuple(tile): [] for tile in tiles}
+    for row in rows:
+        row = dict(row)
+        tile = tiles[row.pop("tile_idx") - 1]
+        results[tuple(tile)].append(row)
+    return results
+
+
+def order_rows(rows: list, filter_key: str) -> list:
+    """
+    Sort row dicts like the SQL ORDER BY for filter_key, NULLs last, ties by structure number.
+    """
+    column, descending = SORT_COLUMNS[filter_key]
+    rows = sorted(rows, key=lambda row: row["structure_number_008"])
+    present = [row for row in rows if row[column] is not None]
+    present.sort(key=lambda row: row[column], reverse=descending)
+    return present + [row for row in rows if row[column] is None]
+
+
+def assemble_tiles(tile_rows: list, limit: int, filter_key: str, mode: str) -> list:
+    """
+    Combine per-tile top-N lists into a single or batch mode response.
+    Single mode keeps every tile's list in tile order; batch mode takes the top N
+    of the union, which is always contained in the per-tile top-N lists.
+    """
+    seen = set()
+    merged = []
+    for rows in tile_rows:
+        for row in rows:
+            if row["structure_number_008"] not in seen:
+                seen.add(row["structure_number_008"])
+                merged.append(row)
+
+    if mode == "single":
+        return merged
+    return order_rows(merged, filter_key)[:limit]
+
+
+def cached_tiles(req: TileBatchRequest, limit: int, filter_key: str, version: int):
+    """
+    Look up every requested tile in the cache.
+    Returns ({tile: key} in request order, {tile: rows} of cached tiles, [missing tiles]).
+    """
+    # Cache keys carry the dataset version, so a reload invalidates every entry
+    keys = {}
     for x, y in req.tiles:
-        lat_min, lat_max, lon_min, lon_max = tile_to_bbox(x, y, req.zoom)
-        envelopes.append(f"ST_MakeEnvelope({lon_min}, {lat_min}, {lon_max}, {lat_max}, 4326)")
+        keys.setdefault((x, y), TileCache.key(version, req.zoom, x, y, filter_key, limit))
 
-    # Create union of all tile geometries
-    union = "ST_Union(ARRAY[" + ", ".join(envelopes) + "])"
+    per_tile = {}
+    cached = tile_cache.get_many(list(keys.values()))
+    missing = []
+    for tile, key in keys.items():
+        if key in cached:
+            per_tile[tile] = cached[key]
+        else:
+            missing.append(list(tile))
+    return keys, per_tile, missing
 
-    # SQL query to fetch bridges intersecting the unioned area
-    sql = f"""
-        SELECT 
-            structure_number_008,
-            state_code_001,
-            lat_016,
-            long_017,
-            year_built_027,
-            adt_029,
-            deck_cond_058,
-            superstructure_cond_059,
-            substructure_cond_060,
-            channel_cond_061,
-            culvert_cond_062,
-            year_reconstructed_106,
-            bridge_condition,
-            lowest_rating,
-            deck_area
-        FROM bridge_core
-        WHERE ST_Intersects(geom, {union})
-        ORDER BY {order_clause}
-        LIMIT :limit;
-    """
-    return db.execute(text(sql), {"limit": limit}).mappings().all()
\ No newline at end of file
+
+def assemble_from_cache(req: TileBatchRequest, limit: int, mode: str) -> bool:
+    """
+    Whether to answer from per-tile cache entries. Batch mode needs every tile's full
+    top-N list, so wide requests with a large limit skip the cache and run one batch query.
+    """
+    if not tile_cache.enabled:
+        return False
+    if mode == "single":
+        return True
+    return len(set(map(tuple, req.tiles))) * limit <= settings.TILE_ASSEMBLE_MAX_ROWS
+
+
+def memory_index_for(db: Session):
+    """
+    The in-memory index to answer from, or None to use PostGIS (disabled, numpy missing or still loading).
+    """
+    if not settings.MEMORY_INDEX_ENABLED or not memory_index.available:
+        return None
+    return memory_index.current(current_dataset_version(db))
+
+
+def flight_key(req: TileBatchRequest, limit: int, filter_key: str, mode: str) -> tuple:
+    """
+    Normalized identity of a tile request for single-flight sharing (tile order and duplicates ignored)
+    """
+    return req.zoom, tuple(sorted({(x, y) for x, y in req.tiles})), filter_key, limit, mode
+
+
+def fetch_tile_bridges(req: TileBatchRequest, limit: int, filter_key: str, mode: str,
+                       db: Session) -> tuple[list, int]:
+    """
+    Answer a tile request from the in-memory index when loaded, otherwise from the
+    per-tile cache, querying PostGIS only for missing tiles. Concurrent identical
+    requests share one database round.
+    Returns (rows, dataset version the rows were answered from).
+    """
+    index = memory_index_for(db)
+    if index is not None:
+        # The index may still be the previous version while its replacement loads
+        with timed("memory_index"):
+            return index.query(req.tiles, req.zoom, limit, filter_key, mode), index.version
+
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return query_tile_bridges(req, limit, filter_key, mode, db)
+    return tile_flights.do(flight_key(req, limit, filter_key, mode),
+                           lambda: query_tile_bridges(req, limit, filter_key, mode, db))
+
+
+def query_tile_bridges(req: TileBatchRequest, limit: int, filter_key: str, mode: str,
+                       db: Session) -> tuple[list, int]:
+    """
+    Answer a tile request from the per-tile cache and PostGIS. Returns (rows, dataset version).
+    """
+    order_clause = ORDER_CLAUSES[filter_key]
+    version = current_dataset_version(db)
+    if not assemble_from_cache(req, limit, mode):
+        query = single_tile_query if mode == "single" else batch_tile_query
+        return [dict(row) for row in query(req, limit, order_clause, db)], version
+
+    keys, per_tile, missing = cached_tiles(req, limit, filter_key, version)
+    if missing:
+        fetched = per_tile_query(missing, req.zoom, limit, order_clause, db)
+        tile_cache.put_many({keys[tile]: rows for tile, rows in fetched.items()})
+        per_tile.update(fetched)
+
+    with timed("assemble"):
+        return assemble_tiles([per_tile[tile] for tile in keys], limit, filter_key, mode), version
+
+
+def build_cluster_sql(req: TileBatchRequest):
+    """
+    Build the SQL and bind parameters that fetch the precomputed cluster cells of the requested tiles.
+    """
+    tiles = list(dict.fromkeys((x, y) for x, y in req.tiles))
+    cells = 2 ** CLUSTER_CELL_BITS
+
+    # Cells of tile (x, y) are the cell_x/cell_y ranges [x * cells, (x + 1) * cells), a primary key range scan
+    sql = """
+    SELECT c.zoom, c.cell_x, c.cell_y, c.lat, c.lon, c.bridge_count, c.worst_lowest_rating, c.max_adt_029,
+           c.good_count, c.fair_count, c.poor_count, c.unknown_count
+    FROM unnest(CAST(:tile_x AS integer[]), CAST(:tile_y AS integer[])) AS t(x, y)
+    JOIN bridge_cluster c
+      ON c.zoom = :zoom
+     AND c.cell_x BETWEEN t.x * :cells AND (t.x + 1) * :cells - 1
+     AND c.cell_y BETWEEN t.y * :cells AND (t.y + 1) * :cells - 1;
+    """
+    params = {"tile_x": [x for x, _ in tiles], "tile_y": [y for _, y in tiles], "zoom": req.zoom, "cells": cells}
+    return sql, params
+
+
+def cluster_tile_query(req: TileBatchRequest, db: Session):
+    """
+    Return the aggregated bridge clusters covering the requested tiles.
+    """
+    sql, params = build_cluster_sql(req)
+    return db.execute(text(sql), params).mappings().all()
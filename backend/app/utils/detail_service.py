@@ -0,0 +1,86 @@
+"""
+Bridge detail lookups with a cache of serialized payloads.
+
+Each bridge's BridgeDetailsResponse JSON is encoded once per dataset version and
+kept in a byte-bounded LRU keyed by (dataset version, structure number), so repeat
+lookups skip both the ~80 column query and the Pydantic model. Batch lookups fetch
+every missing structure number with a single query and join the cached payloads
+into one JSON array. ETags follow the dataset version, like the vector tiles.
+"""
+import hashlib
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.tables import bridge_details
+from app.utils.fast_json import dumps
+from app.utils.tile_cache import TileCache
+
+# Columns of a detail payload (the fields of BridgeDetailsResponse)
+DETAIL_COLUMNS = [column.name for column in bridge_details.columns]
+
+# Serialized detail payloads shared by all requests in this process
+detail_cache = TileCache(settings.DETAIL_CACHE_MAX_BYTES)
+
+
+def detail_key(version: int, structure_number: str) -> str:
+    return f"v{version}:detail:{structure_number}"
+
+
+def detail_etag(version: int, structure_numbers: list) -> str:
+    """
+    ETag of one or more bridge details; it only changes when the dataset version does
+    """
+    if len(structure_numbers) == 1:
+        return f'"v{version}-{structure_numbers[0]}"'
+    digest = hashlib.sha1("\n".join(structure_numbers).encode()).hexdigest()[:16]
+    return f'"v{version}-{len(structure_numbers)}-{digest}"'
+
+
+def build_details_query(structure_numbers: list):
+    """
+    SELECT of the detail columns for a list of structure numbers
+    """
+    return select(*[bridge_details.c[column] for column in DETAIL_COLUMNS]).where(
+        bridge_details.c.structure_number_008.in_(structure_numbers)
+    )
+
+
+def cached_details(structure_numbers: list, version: int):
+    """
+    Look up serialized details in the cache.
+    Returns ({structure number: payload} of cached bridges, [missing structure numbers]).
+    """
+    if not detail_cache.enabled:
+        return {}, list(structure_numbers)
+    keys = {number: detail_key(version, number) for number in structure_numbers}
+    payloads = detail_cache.get_payloads(list(keys.values()))
+    found = {number: payloads[key] for number, key in keys.items() if key in payloads}
+    return found, [number for number in structure_numbers if number not in found]
+
+
+def store_details(rows: list, version: int) -> dict:
+    """
+    Serialize fetched detail rows, cache them and return {structure number: payload}
+    """
+    payloads = {row["structure_number_008"]: dumps(dict(row)) for row in rows}
+    if detail_cache.enabled:
+        detail_cache.put_payloads({detail_key(version, number): payload for number, payload in payloads.items()})
+    return payloads
+
+
+def fetch_bridge_details(structure_numbers: list, version: int, db: Session) -> dict:
+    """
+    Serialized details of the requested bridges, from the cache or one query for the rest.
+    Returns {structure number: payload}; unknown numbers are left out.
+    """
+    payloads, missing = cached_details(structure_numbers, version)
+    if missing:
+        payloads.update(store_details(db.execute(build_details_query(missing)).mappings().all(), version))
+    return payloads
+
+
+def join_details(structure_numbers: list, payloads: dict) -> bytes:
+    """
+    JSON array of the found details in request order
+    """
+    return b"[" + b",".join(payloads[number] for number in structure_numbers if number in payloads) + b"]"
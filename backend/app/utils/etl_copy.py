@@ -0,0 +1,260 @@
+"""
+Bulk loads bridge data with PostgreSQL COPY instead of ORM inserts.
+
+Rows are converted chunk by chunk with the vectorized transforms from etl_loader
+and streamed into `COPY ... FROM STDIN` as CSV (geometry as EWKT). Secondary
+indexes are built after the data is in place. In staging mode the load goes into
+separate tables that are swapped in with one short transaction, so the API keeps
+serving the previous data while the load runs.
+"""
+import io
+import time
+import argparse
+import pandas as pd
+from app.db.session import engine
+from app.db.base import Base
+from app.db.maintenance import GEOM_INDEX, cluster_and_analyze
+from app.db.dataset_version import bump_dataset_version
+from app.db.clusters import refresh_bridge_clusters
+from app.db.tile_top import refresh_tile_top
+from app.db.map_points import refresh_map_points, vacuum_map_points
+from app.utils.etl_loader import (
+    CORE_COLUMNS, DETAILS_COLUMNS, DEFAULT_CHUNKSIZE, read_nbi_chunks, transform_chunk
+)
+
+CORE_TABLE = "bridge_core"
+DETAILS_TABLE = "bridge_details"
+STAGING_SUFFIX = "_staging"
+
+# NULL marker used in the CSV stream, so empty strings stay empty strings
+COPY_NULL = r"\N"
+
+
+def frame_to_csv(frame: pd.DataFrame) -> str:
+    """
+    Serialize a transformed frame as headerless CSV for COPY
+    """
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+    return buffer.getvalue()
+
+
+def copy_csv(cursor, table: str, columns: list, csv_text: str):
+    """
+    Stream CSV text into a table with COPY FROM STDIN (psycopg2 or psycopg 3 cursor)
+    """
+    if not csv_text:
+        return
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    if hasattr(cursor, "copy_expert"):
+        cursor.copy_expert(sql, io.StringIO(csv_text))
+    else:
+        with cursor.copy(sql) as copy:
+            copy.write(csv_text)
+
+
+def copy_frames(cursor, core: pd.DataFrame, details: pd.DataFrame,
+                core_table: str = CORE_TABLE, details_table: str = DETAILS_TABLE):
+    """
+    COPY one transformed chunk into the core and details tables
+    """
+    copy_csv(cursor, core_table, CORE_COLUMNS, frame_to_csv(core))
+    copy_csv(cursor, details_table, DETAILS_COLUMNS, frame_to_csv(details))
+
+
+def secondary_index_definitions(cursor, table: str) -> list[tuple[str, str]]:
+    """
+    Return (name, CREATE INDEX statement) for every index not backing a constraint
+    """
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+        ORDER BY i.relname
+        """,
+        (table,),
+    )
+    return [(name, definition) for name, definition in cursor.fetchall()]
+
+
+def _retarget_index(definition: str, name: str, new_name: str, new_table: str) -> str:
+    """
+    Rewrite a pg_get_indexdef() statement to create the same index on another table
+    """
+    head, tail = definition.split(" ON ", 1)
+    target, rest = tail.split(" ", 1)
+    schema = target.rsplit(".", 1)[0] + "." if "." in target else ""
+    head = head.replace(f" {name}", f" {new_name}", 1)
+    return f"{head} ON {schema}{new_table} {rest}"
+
+
+def _create_constraints(cursor, core_table: str, details_table: str):
+    """
+    Add the primary and foreign keys of the bridge tables after the data is loaded
+    """
+    cursor.execute(f"ALTER TABLE {core_table} ADD CONSTRAINT {core_table}_pkey PRIMARY KEY (structure_number_008)")
+    cursor.execute(f"ALTER TABLE {details_table} ADD CONSTRAINT {details_table}_pkey PRIMARY KEY (structure_number_008)")
+    cursor.execute(
+        f"ALTER TABLE {details_table} ADD CONSTRAINT {details_table}_structure_number_008_fkey "
+        f"FOREIGN KEY (structure_number_008) REFERENCES {core_table} (structure_number_008)"
+    )
+
+
+def _copy_files(cursor, file_paths: list, chunksize: int, core_table: str, details_table: str) -> tuple[int, int]:
+    """
+    Convert and COPY every file chunk by chunk. Returns (rows read, rows loaded)
+    """
+    rows_read = rows_loaded = 0
+    started = time.perf_counter()
+    for file_path in file_paths:
+        for chunk in read_nbi_chunks(file_path, chunksize):
+            core, details = transform_chunk(chunk)
+            copy_frames(cursor, core, details, core_table, details_table)
+
+            rows_read += len(chunk)
+            rows_loaded += len(core)
+            elapsed = time.perf_counter() - started
+            print(f"{file_path}: {rows_loaded} rows copied ({rows_loaded / elapsed:,.0f} rows/sec)")
+    return rows_read, rows_loaded
+
+
+def _load_in_place(cursor, file_paths: list, chunksize: int) -> tuple[int, int]:
+    """
+    Truncate the live tables, drop secondary indexes, COPY, then rebuild the indexes
+    """
+    indexes = secondary_index_definitions(cursor, CORE_TABLE) + secondary_index_definitions(cursor, DETAILS_TABLE)
+
+    cursor.execute(f"TRUNCATE {DETAILS_TABLE}, {CORE_TABLE}")
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {name}")
+
+    counts = _copy_files(cursor, file_paths, chunksize, CORE_TABLE, DETAILS_TABLE)
+
+    for _, definition in indexes:
+        cursor.execute(definition)
+    cluster_and_analyze(cursor)
+    refresh_bridge_clusters(cursor)
+    refresh_tile_top(cursor)
+    refresh_map_points(cursor)
+    bump_dataset_version(cursor)
+    return counts
+
+
+def create_staging_tables(cursor) -> tuple[str, str]:
+    """
+    (Re)create empty staging copies of the bridge tables, without keys or indexes.
+    Returns (core staging table, details staging table)
+    """
+    core_staging = CORE_TABLE + STAGING_SUFFIX
+    details_staging = DETAILS_TABLE + STAGING_SUFFIX
+    cursor.execute(f"DROP TABLE IF EXISTS {details_staging}, {core_staging}")
+    cursor.execute(f"CREATE TABLE {core_staging} (LIKE {CORE_TABLE} INCLUDING DEFAULTS)")
+    cursor.execute(f"CREATE TABLE {details_staging} (LIKE {DETAILS_TABLE} INCLUDING DEFAULTS)")
+    return core_staging, details_staging
+
+
+def swap_in_staging_tables(connection):
+    """
+    Build keys and indexes on the loaded staging tables, then swap them in atomically.
+    The caller commits the swap.
+    """
+    core_staging = CORE_TABLE + STAGING_SUFFIX
+    details_staging = DETAILS_TABLE + STAGING_SUFFIX
+    cursor = connection.cursor()
+
+    _create_constraints(cursor, core_staging, details_staging)
+    renames = []
+    for table, staging in ((CORE_TABLE, core_staging), (DETAILS_TABLE, details_staging)):
+        for name, definition in secondary_index_definitions(cursor, table):
+            staging_name = (name + STAGING_SUFFIX)[:63]
+            cursor.execute(_retarget_index(definition, name, staging_name, staging))
+            renames.append((staging_name, name))
+
+    # Clustering the staging table is free of downtime since nothing reads it yet
+    geom_index = next(staging_name for staging_name, name in renames if name == GEOM_INDEX)
+    cluster_and_analyze(cursor, core_staging, details_staging, geom_index=geom_index)
+    connection.commit()
+
+    # Cluster summaries, per-tile top-N lists and map points are rebuilt from staging before
+    # taking the lock and become visible together with the swapped tables
+    refresh_bridge_clusters(cursor, core_staging)
+    refresh_tile_top(cursor, core_staging)
+    refresh_map_points(cursor, core_staging)
+
+    # Swap: readers see either the old or the new tables, never a partial load
+    cursor.execute(f"LOCK TABLE {CORE_TABLE}, {DETAILS_TABLE} IN ACCESS EXCLUSIVE MODE")
+    cursor.execute(f"DROP TABLE {DETAILS_TABLE}, {CORE_TABLE}")
+    cursor.execute(f"ALTER TABLE {core_staging} RENAME TO {CORE_TABLE}")
+    cursor.execute(f"ALTER TABLE {details_staging} RENAME TO {DETAILS_TABLE}")
+    cursor.execute(f"ALTER TABLE {CORE_TABLE} RENAME CONSTRAINT {core_staging}_pkey TO {CORE_TABLE}_pkey")
+    cursor.execute(f"ALTER TABLE {DETAILS_TABLE} RENAME CONSTRAINT {details_staging}_pkey TO {DETAILS_TABLE}_pkey")
+    cursor.execute(
+        f"ALTER TABLE {DETAILS_TABLE} RENAME CONSTRAINT {details_staging}_structure_number_008_fkey "
+        f"TO {DETAILS_TABLE}_structure_number_008_fkey"
+    )
+    for staging_name, name in renames:
+        cursor.execute(f"ALTER INDEX {staging_name} RENAME TO {name}")
+    bump_dataset_version(cursor)
+
+
+def _load_via_staging(connection, file_paths: list, chunksize: int) -> tuple[int, int]:
+    """
+    Load into staging tables, build keys and indexes there, then swap them in atomically
+    """
+    # Build the staging tables outside the serving path (live tables untouched)
+    cursor = connection.cursor()
+    core_staging, details_staging = create_staging_tables(cursor)
+    counts = _copy_files(cursor, file_paths, chunksize, core_staging, details_staging)
+    swap_in_staging_tables(connection)
+    return counts
+
+
+def copy_bridges_from_txt(file_paths, staging: bool = False, chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+    """
+    Full reload of bridge_core and bridge_details from one or more NBI files using COPY
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+
+    # Make sure the live tables exist so their index definitions can be reused
+    Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+    connection = engine.raw_connection()
+    try:
+        if staging:
+            rows_read, rows_loaded = _load_via_staging(connection, file_paths, chunksize)
+        else:
+            rows_read, rows_loaded = _load_in_place(connection.cursor(), file_paths, chunksize)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    vacuum_map_points()
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "files": file_paths,
+        "mode": "staging" if staging else "in_place",
+        "rows_read": rows_read,
+        "rows_loaded": rows_loaded,
+        "rows_skipped": rows_read - rows_loaded,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows_loaded / elapsed, 1) if elapsed else 0.0,
+    }
+    print(f"Copied {rows_loaded}/{rows_read} rows in {elapsed:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load NBI files with COPY")
+    parser.add_argument("files", nargs="+", help="NBI delimited .txt files")
+    parser.add_argument("--staging", action="store_true", help="Load into staging tables and swap them in")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+    copy_bridges_from_txt(args.files, staging=args.staging, chunksize=args.chunksize)
@@ -1,13 +1,200 @@
 """
 Loads bridge data from a .txt file into the database.
 Converts coordinates, parses values, and handles missing data.
+
+The file is read in chunks and every conversion is done as a vectorized column
+operation, so memory stays flat regardless of file size.
 """
+import time
 import pandas as pd
-from shapely.geometry import Point
-from geoalchemy2.shape import from_shape
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 from app.db.models import BridgeCore, BridgeDetails
 from app.db.session import SessionLocal
+from app.db.maintenance import optimize_bridge_tables
+from app.db.dataset_version import BUMP_VERSION_SQL
+from app.db.clusters import refresh_clusters_sql
+from app.db.tile_top import refresh_tile_top_sql
+from app.db.map_points import refresh_map_points_sql, vacuum_map_points
+
+# Number of source rows parsed and written per round trip
+DEFAULT_CHUNKSIZE = 50_000
+
+# ───────────────────────────────────────────────
+# Column Mappings (model column, source column, parser)
+#   text  → raw string value
+#   key   → stripped string value
+#   int   → int if the value is all digits, else None
+#   cost  → int * 1000 if the value is all digits, else None (values are in $1000s)
+#   float → float if the value is non-empty, else None
+# ───────────────────────────────────────────────
+CORE_FIELDS = [
+    # Identification
+    ("structure_number_008", "STRUCTURE_NUMBER_008", "key"),
+
+    # Location Info
+    ("state_code_001", "STATE_CODE_001", "text"),
+    ("location_009", "LOCATION_009", "text"),
+
+    # Classification & Route Info
+    ("record_type_005a", "RECORD_TYPE_005A", "text"),
+    ("route_prefix_005b", "ROUTE_PREFIX_005B", "text"),
+    ("service_level_005c", "SERVICE_LEVEL_005C", "text"),
+    ("maintenance_021", "MAINTENANCE_021", "text"),
+    ("owner_022", "OWNER_022", "text"),
+    ("functional_class_026", "FUNCTIONAL_CLASS_026", "text"),
+
+    # Structure & Traffic Info
+    ("year_built_027", "YEAR_BUILT_027", "int"),
+    ("traffic_lanes_on_028a", "TRAFFIC_LANES_ON_028A", "int"),
+    ("traffic_lanes_und_028b", "TRAFFIC_LANES_UND_028B", "int"),
+    ("adt_029", "ADT_029", "int"),
+    ("design_load_031", "DESIGN_LOAD_031", "text"),
+
+    # Structure Types
+    ("structure_kind_043a", "STRUCTURE_KIND_043A", "text"),
+    ("structure_type_043b", "STRUCTURE_TYPE_043B", "text"),
+
+    # Condition Ratings
+    ("deck_cond_058", "DECK_COND_058", "text"),
+    ("superstructure_cond_059", "SUPERSTRUCTURE_COND_059", "text"),
+    ("substructure_cond_060", "SUBSTRUCTURE_COND_060", "text"),
+    ("channel_cond_061", "CHANNEL_COND_061", "text"),
+    ("culvert_cond_062", "CULVERT_COND_062", "text"),
+
+    # Maintenance & Evaluation
+    ("year_reconstructed_106", "YEAR_RECONSTRUCTED_106", "int"),
+    ("bridge_condition", "BRIDGE_CONDITION", "text"),
+    ("lowest_rating", "LOWEST_RATING", "int"),
+    ("deck_area", "DECK_AREA", "float"),
+]
+
+DETAILS_FIELDS = [
+    # Identification
+    ("structure_number_008", "STRUCTURE_NUMBER_008", "key"),
+
+    # Descriptions & Features
+    ("features_desc_006a", "FEATURES_DESC_006A", "text"),
+    ("critical_facility_006b", "CRITICAL_FACILITY_006B", "text"),
+    ("facility_carried_007", "FACILITY_CARRIED_007", "text"),
+
+    # Geometry & Location Details
+    ("min_vert_clr_010", "MIN_VERT_CLR_010", "float"),
+    ("kilometerpoint_011", "KILOPOINT_011", "float"),
+    ("base_hwy_network_012", "BASE_HWY_NETWORK_012", "text"),
+    ("lrs_inv_route_013a", "LRS_INV_ROUTE_013A", "text"),
+    ("subroute_no_013b", "SUBROUTE_NO_013B", "text"),
+    ("route_number_005d", "ROUTE_NUMBER_005D", "text"),
+    ("direction_005e", "DIRECTION_005E", "text"),
+    ("highway_district_002", "HIGHWAY_DISTRICT_002", "text"),
+    ("county_code_003", "COUNTY_CODE_003", "text"),
+    ("place_code_004", "PLACE_CODE_004", "text"),
+
+    # Travel & Toll
+    ("detour_kilos_019", "DETOUR_KILOS_019", "int"),
+    ("toll_020", "TOLL_020", "text"),
+
+    # Traffic & Width
+    ("year_adt_030", "YEAR_ADT_030", "int"),
+    ("appr_width_mt_032", "APPR_WIDTH_MT_032", "float"),
+    ("median_code_033", "MEDIAN_CODE_033", "text"),
+    ("degrees_skew_034", "DEGREES_SKEW_034", "int"),
+
+    # Structural Features
+    ("structure_flared_035", "STRUCTURE_FLARED_035", "text"),
+    ("railings_036a", "RAILINGS_036A", "text"),
+    ("transitions_036b", "TRANSITIONS_036B", "text"),
+    ("appr_rail_036c", "APPR_RAIL_036C", "text"),
+    ("appr_rail_end_036d", "APPR_RAIL_END_036D", "text"),
+
+    # Navigation
+    ("history_037", "HISTORY_037", "text"),
+    ("navigation_038", "NAVIGATION_038", "text"),
+    ("nav_vert_clr_mt_039", "NAV_VERT_CLR_MT_039", "float"),
+    ("nav_horr_clr_mt_040", "NAV_HORR_CLR_MT_040", "float"),
+
+    # Posting & Service
+    ("open_closed_posted_041", "OPEN_CLOSED_POSTED_041", "text"),
+    ("service_on_042a", "SERVICE_ON_042A", "text"),
+    ("service_und_042b", "SERVICE_UND_042B", "text"),
+
+    # Ratings
+    ("operating_rating_064", "OPERATING_RATING_064", "float"),
+    ("opr_rating_meth_063", "OPR_RATING_METH_063", "text"),
+    ("inventory_rating_066", "INVENTORY_RATING_066", "float"),
+    ("inv_rating_meth_065", "INV_RATING_METH_065", "text"),
+
+    # Evaluations
+    ("structural_eval_067", "STRUCTURAL_EVAL_067", "text"),
+    ("deck_geometry_eval_068", "DECK_GEOMETRY_EVAL_068", "text"),
+    ("undclrenc_eval_069", "UNDCLRENCE_EVAL_069", "text"),
+    ("posting_eval_070", "POSTING_EVAL_070", "text"),
+    ("waterway_eval_071", "WATERWAY_EVAL_071", "text"),
+    ("appr_road_eval_072", "APPR_ROAD_EVAL_072", "text"),
+
+    # Work Info
+    ("work_proposed_075a", "WORK_PROPOSED_075A", "text"),
+    ("work_done_by_075b", "WORK_DONE_BY_075B", "text"),
+    ("imp_len_mt_076", "IMP_LEN_MT_076", "float"),
+
+    # Inspection Info
+    ("date_of_inspect_090", "DATE_OF_INSPECT_090", "text"),
+    ("inspect_freq_months_091", "INSPECT_FREQ_MONTHS_091", "text"),
+    ("fracture_092a", "FRACTURE_092A", "text"),
+    ("undwater_look_see_092b", "UNDWATER_LOOK_SEE_092B", "text"),
+    ("spec_inspect_092c", "SPEC_INSPECT_092C", "text"),
+    ("fracture_last_date_093a", "FRACTURE_LAST_DATE_093A", "text"),
+    ("undwater_last_date_093b", "UNDWATER_LAST_DATE_093B", "text"),
+    ("spec_last_date_093c", "SPEC_LAST_DATE_093C", "text"),
+
+    # Costs
+    ("bridge_imp_cost_094", "BRIDGE_IMP_COST_094", "cost"),
+    ("roadway_imp_cost_095", "ROADWAY_IMP_COST_095", "cost"),
+    ("total_imp_cost_096", "TOTAL_IMP_COST_096", "cost"),
+    ("year_of_imp_097", "YEAR_OF_IMP_097", "int"),
+
+    # Other State & Parallel Structures
+    ("other_state_code_098a", "OTHER_STATE_CODE_098A", "text"),
+    ("other_state_pcnt_098b", "OTHER_STATE_PCNT_098B", "text"),
+    ("othr_state_struc_no_099", "OTHR_STATE_STRUC_NO_099", "text"),
+    ("parallel_structure_101", "PARALLEL_STRUCTURE_101", "text"),
+
+    # Deck Details
+    ("temp_structure_103", "TEMP_STRUCTURE_103", "text"),
+    ("deck_structure_type_107", "DECK_STRUCTURE_TYPE_107", "text"),
+    ("surface_type_108a", "SURFACE_TYPE_108A", "text"),
+    ("membrane_type_108b", "MEMBRANE_TYPE_108B", "text"),
+    ("deck_protection_108c", "DECK_PROTECTION_108C", "text"),
+
+    # Traffic & Protection
+    ("percent_adt_truck_109", "PERCENT_ADT_TRUCK_109", "int"),
+    ("national_network_110", "NATIONAL_NETWORK_110", "text"),
+    ("pier_protection_111", "PIER_PROTECTION_111", "text"),
+    ("bridge_len_ind_112", "BRIDGE_LEN_IND_112", "text"),
+    ("scour_critical_113", "SCOUR_CRITICAL_113", "text"),
+
+    # Future Projections
+    ("future_adt_114", "FUTURE_ADT_114", "int"),
+    ("year_of_future_adt_115", "YEAR_OF_FUTURE_ADT_115", "int"),
+    ("min_nav_clr_mt_116", "MIN_NAV_CLR_MT_116", "float"),
+
+    # System & Agency
+    ("fed_agency", "FED_AGENCY", "text"),
+    ("submitted_by", "SUBMITTED_BY", "text"),
+    ("strahnet_highway_100", "STRAHNET_HIGHWAY_100", "text"),
+    ("traffic_direction_102", "TRAFFIC_DIRECTION_102", "text"),
+    ("highway_system_104", "HIGHWAY_SYSTEM_104", "text"),
+    ("federal_lands_105", "FEDERAL_LANDS_105", "text"),
+]
+
+# Final column order of the frames produced by transform_chunk
+CORE_COLUMNS = ["structure_number_008", "state_code_001", "lat_016", "long_017", "geom"] + [
+    name for name, _, _ in CORE_FIELDS[2:]
+] + ["row_hash"]
+DETAILS_COLUMNS = [name for name, _, _ in DETAILS_FIELDS]
+
+# Source columns that feed the two tables; the row hash covers exactly these
+SOURCE_COLUMNS = sorted({source for _, source, _ in CORE_FIELDS + DETAILS_FIELDS} | {"LAT_016", "LONG_017"})
 
 
 def convert_dms_to_decimal(value: str, is_latitude=True) -> float:
@@ -27,201 +214,188 @@ def convert_dms_to_decimal(value: str, is_latitude=True) -> float:
     return round(decimal if is_latitude else -decimal, 6)
 
 
-def load_bridges_from_txt(file_path: str):
+def _parse_whole(values: pd.Series) -> pd.Series:
+    """
+    Parse strings the way int() does (optional sign, surrounding whitespace), NaN otherwise
+    """
+    stripped = values.str.strip()
+    return pd.to_numeric(stripped.where(stripped.str.fullmatch(r"[+-]?\d+")), errors="coerce")
+
+
+def convert_dms_series(values: pd.Series, is_latitude=True) -> tuple[pd.Series, pd.Series]:
+    """
+    Vectorized convert_dms_to_decimal. Returns (decimal degrees, invalid mask);
+    empty strings map to NaN and are not considered invalid.
+    """
+    width, deg_len = (8, 2) if is_latitude else (9, 3)
+    padded = values.str.zfill(width)
+
+    deg = _parse_whole(padded.str[:deg_len])
+    minutes = _parse_whole(padded.str[deg_len:deg_len + 2])
+    seconds = pd.to_numeric(padded.str[deg_len + 2:].str.strip(), errors="coerce") / 100
+
+    # Same operation order as the scalar version so results are bit-identical
+    decimal = deg + (minutes / 60) + (seconds / 3600)
+    if not is_latitude:
+        decimal = -decimal
+
+    # Python's round() is correctly rounded while numpy's is not, so keep round() for parity
+    valid = decimal.notna() & (values != "")
+    decimal = decimal.astype(object)
+    decimal[valid] = [round(v, 6) for v in decimal[valid]]
+    decimal = pd.to_numeric(decimal.where(valid), errors="coerce")
+
+    invalid = (values != "") & decimal.isna()
+    return decimal, invalid
+
+
+def _parse_column(values: pd.Series, kind: str) -> tuple[pd.Series, pd.Series | None]:
+    """
+    Apply one field parser to a whole column. Returns (parsed values, invalid mask or None)
+    """
+    match kind:
+        case "text":
+            return values, None
+        case "key":
+            return values.str.strip(), None
+        case "int" | "cost":
+            # Only all-digit values are converted, everything else becomes NULL
+            parsed = pd.to_numeric(values.where(values.str.isdigit()), errors="coerce").astype("Int64")
+            return (parsed * 1000 if kind == "cost" else parsed), None
+        case "float":
+            # Non-empty values that are not numbers invalidate the whole row
+            parsed = pd.to_numeric(values.str.strip(), errors="coerce").astype(float)
+            return parsed, (values != "") & parsed.isna()
+        case _:
+            raise ValueError(f"Unknown field parser: {kind}")
+
+
+def hash_rows(df: pd.DataFrame) -> pd.Series:
+    """
+    Stable 64-bit hash of each row's source values, as a signed value for a BIGINT column
+    """
+    hashed = pd.util.hash_pandas_object(df[SOURCE_COLUMNS], index=False)
+    return pd.Series(hashed.to_numpy().view("int64"), index=df.index)
+
+
+def _build_frame(df: pd.DataFrame, fields: list) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Build a frame of model columns from source columns, collecting invalid rows
+    """
+    columns = {}
+    invalid = pd.Series(False, index=df.index)
+    for name, source, kind in fields:
+        parsed, bad = _parse_column(df[source], kind)
+        columns[name] = parsed
+        if bad is not None:
+            for row in df.index[bad]:
+                print(f"Skipping row due to error: could not convert {source}={df.at[row, source]!r}")
+            invalid |= bad
+    return pd.DataFrame(columns, index=df.index), invalid
+
+
+def transform_chunk(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Convert a chunk of raw NBI rows into bridge_core and bridge_details frames.
+    Rows with unparsable values are dropped, matching the row-by-row loader.
+    """
+    # Convert lat/lon to decimal and create geometry as EWKT
+    lat, bad_lat = convert_dms_series(df["LAT_016"])
+    lon, bad_lon = convert_dms_series(df["LONG_017"], is_latitude=False)
+    for row in df.index[bad_lat | bad_lon]:
+        print(f"Skipping row due to error: invalid coordinates {df.at[row, 'LAT_016']!r}, {df.at[row, 'LONG_017']!r}")
+
+    has_point = lat.notna() & (lat != 0) & lon.notna() & (lon != 0)
+    geom = ("SRID=4326;POINT(" + lon.astype(str) + " " + lat.astype(str) + ")").where(has_point)
+
+    core, bad_core = _build_frame(df, CORE_FIELDS)
+    core["lat_016"] = lat
+    core["long_017"] = lon
+    core["geom"] = geom
+    core["row_hash"] = hash_rows(df)
+    core = core[CORE_COLUMNS]
+
+    details, bad_details = _build_frame(df, DETAILS_FIELDS)
+
+    keep = ~(bad_lat | bad_lon | bad_core | bad_details)
+    return core[keep], details[keep]
+
+
+def frame_to_records(frame: pd.DataFrame) -> list[dict]:
+    """
+    Convert a transformed frame into plain Python records (None for missing values)
+    """
+    columns = list(frame.columns)
+    values = [frame[name].astype(object).where(frame[name].notna(), None).tolist() for name in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def read_nbi_chunks(file_path: str, chunksize: int = DEFAULT_CHUNKSIZE):
+    """
+    Yield raw NBI rows from a delimited file as all-string DataFrame chunks
+    """
+    with pd.read_csv(file_path, dtype=str, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk.fillna("")
+
+
+def write_chunk(db: Session, core: pd.DataFrame, details: pd.DataFrame):
+    """
+    Insert one transformed chunk (core rows first because of the details foreign key)
+    """
+    if core.empty:
+        return
+    db.execute(insert(BridgeCore.__table__), frame_to_records(core))
+    db.execute(insert(BridgeDetails.__table__), frame_to_records(details))
+
+
+def load_bridges_from_txt(file_path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
     """
-    Main function to load bridge records from a text file
+    Main function to load bridge records from a text file.
+    Reads, converts and writes one chunk at a time inside a single transaction.
     """
     db = SessionLocal()
-    df = pd.read_csv(file_path, dtype=str).fillna("")
-
-    bridge_core_objs = []
-    bridge_details_objs = []
-
-    for _, row in df.iterrows():
-        try:
-            # Convert lat/lon to decimal and create geometry
-            lat = convert_dms_to_decimal(row["LAT_016"]) if row["LAT_016"] else None
-            lon = convert_dms_to_decimal(row["LONG_017"], is_latitude=False) if row["LONG_017"] else None
-            geom = from_shape(Point(lon, lat), srid=4326) if lat and lon else None
-
-            # Create BridgeCore record
-            core = BridgeCore(
-                # Identification
-                structure_number_008 = row["STRUCTURE_NUMBER_008"].strip(),
-
-                # Location Info
-                state_code_001 = row["STATE_CODE_001"],
-                lat_016 = lat,
-                long_017 = lon,
-                geom = geom,
-                location_009 = row["LOCATION_009"],
-
-                # Classification & Route Info
-                record_type_005a = row["RECORD_TYPE_005A"],
-                route_prefix_005b = row["ROUTE_PREFIX_005B"],
-                service_level_005c = row["SERVICE_LEVEL_005C"],
-                maintenance_021 = row["MAINTENANCE_021"],
-                owner_022 = row["OWNER_022"],
-                functional_class_026 = row["FUNCTIONAL_CLASS_026"],
-
-                # Structure & Traffic Info
-                year_built_027 = int(row["YEAR_BUILT_027"]) if row["YEAR_BUILT_027"].isdigit() else None,
-                traffic_lanes_on_028a = int(row["TRAFFIC_LANES_ON_028A"]) if row["TRAFFIC_LANES_ON_028A"].isdigit() else None,
-                traffic_lanes_und_028b = int(row["TRAFFIC_LANES_UND_028B"]) if row["TRAFFIC_LANES_UND_028B"].isdigit() else None,
-                adt_029 = int(row["ADT_029"]) if row["ADT_029"].isdigit() else None,
-                design_load_031 = row["DESIGN_LOAD_031"],
-
-                # Structure Types
-                structure_kind_043a = row["STRUCTURE_KIND_043A"],
-                structure_type_043b = row["STRUCTURE_TYPE_043B"],
-
-                # Condition Ratings
-                deck_cond_058 = row["DECK_COND_058"],
-                superstructure_cond_059 = row["SUPERSTRUCTURE_COND_059"],
-                substructure_cond_060 = row["SUBSTRUCTURE_COND_060"],
-                channel_cond_061 = row["CHANNEL_COND_061"],
-                culvert_cond_062 = row["CULVERT_COND_062"],
-
-                # Maintenance & Evaluation
-                year_reconstructed_106 = int(row["YEAR_RECONSTRUCTED_106"]) if row["YEAR_RECONSTRUCTED_106"].isdigit() else None,
-                bridge_condition = row["BRIDGE_CONDITION"],
-                lowest_rating = int(row["LOWEST_RATING"]) if row["LOWEST_RATING"].isdigit() else None,
-                deck_area = float(row["DECK_AREA"]) if row["DECK_AREA"] else None,
-            )
-
-            # Create BridgeDetails record
-            details = BridgeDetails(
-                # Identification
-                structure_number_008 = row["STRUCTURE_NUMBER_008"].strip(),
-
-                # Descriptions & Features
-                features_desc_006a = row["FEATURES_DESC_006A"],
-                critical_facility_006b = row["CRITICAL_FACILITY_006B"],
-                facility_carried_007 = row["FACILITY_CARRIED_007"],
-
-                # Geometry & Location Details
-                min_vert_clr_010 = float(row["MIN_VERT_CLR_010"]) if row["MIN_VERT_CLR_010"] else None,
-                kilometerpoint_011 = float(row["KILOPOINT_011"]) if row["KILOPOINT_011"] else None,
-                base_hwy_network_012 = row["BASE_HWY_NETWORK_012"],
-                lrs_inv_route_013a = row["LRS_INV_ROUTE_013A"],
-                subroute_no_013b = row["SUBROUTE_NO_013B"],
-                route_number_005d = row["ROUTE_NUMBER_005D"],
-                direction_005e = row["DIRECTION_005E"],
-                highway_district_002 = row["HIGHWAY_DISTRICT_002"],
-                county_code_003 = row["COUNTY_CODE_003"],
-                place_code_004 = row["PLACE_CODE_004"],
-
-                # Travel & Toll
-                detour_kilos_019 = int(row["DETOUR_KILOS_019"]) if row["DETOUR_KILOS_019"].isdigit() else None,
-                toll_020 = row["TOLL_020"],
-
-                # Traffic & Width
-                year_adt_030 = int(row["YEAR_ADT_030"]) if row["YEAR_ADT_030"].isdigit() else None,
-                appr_width_mt_032 = float(row["APPR_WIDTH_MT_032"]) if row["APPR_WIDTH_MT_032"] else None,
-                median_code_033 = row["MEDIAN_CODE_033"],
-                degrees_skew_034 = int(row["DEGREES_SKEW_034"]) if row["DEGREES_SKEW_034"].isdigit() else None,
-
-                # Structural Features
-                structure_flared_035 = row["STRUCTURE_FLARED_035"],
-                railings_036a = row["RAILINGS_036A"],
-                transitions_036b = row["TRANSITIONS_036B"],
-                appr_rail_036c = row["APPR_RAIL_036C"],
-                appr_rail_end_036d = row["APPR_RAIL_END_036D"],
-
-                # Navigation
-                history_037 = row["HISTORY_037"],
-                navigation_038 = row["NAVIGATION_038"],
-                nav_vert_clr_mt_039 = float(row["NAV_VERT_CLR_MT_039"]) if row["NAV_VERT_CLR_MT_039"] else None,
-                nav_horr_clr_mt_040 = float(row["NAV_HORR_CLR_MT_040"]) if row["NAV_HORR_CLR_MT_040"] else None,
-
-                # Posting & Service
-                open_closed_posted_041 = row["OPEN_CLOSED_POSTED_041"],
-                service_on_042a = row["SERVICE_ON_042A"],
-                service_und_042b = row["SERVICE_UND_042B"],
-
-                # Ratings
-                operating_rating_064 = float(row["OPERATING_RATING_064"]) if row["OPERATING_RATING_064"] else None,
-                opr_rating_meth_063 = row["OPR_RATING_METH_063"],
-                inventory_rating_066 = float(row["INVENTORY_RATING_066"]) if row["INVENTORY_RATING_066"] else None,
-                inv_rating_meth_065 = row["INV_RATING_METH_065"],
-
-                # Evaluations
-                structural_eval_067 = row["STRUCTURAL_EVAL_067"],
-                deck_geometry_eval_068 = row["DECK_GEOMETRY_EVAL_068"],
-                undclrenc_eval_069 = row["UNDCLRENCE_EVAL_069"],
-                posting_eval_070 = row["POSTING_EVAL_070"],
-                waterway_eval_071 = row["WATERWAY_EVAL_071"],
-                appr_road_eval_072 = row["APPR_ROAD_EVAL_072"],
-
-                # Work Info
-                work_proposed_075a = row["WORK_PROPOSED_075A"],
-                work_done_by_075b = row["WORK_DONE_BY_075B"],
-                imp_len_mt_076 = float(row["IMP_LEN_MT_076"]) if row["IMP_LEN_MT_076"] else None,
-
-                # Inspection Info
-                date_of_inspect_090 = row["DATE_OF_INSPECT_090"],
-                inspect_freq_months_091 = row["INSPECT_FREQ_MONTHS_091"],
-                fracture_092a = row["FRACTURE_092A"],
-                undwater_look_see_092b = row["UNDWATER_LOOK_SEE_092B"],
-                spec_inspect_092c = row["SPEC_INSPECT_092C"],
-                fracture_last_date_093a = row["FRACTURE_LAST_DATE_093A"],
-                undwater_last_date_093b = row["UNDWATER_LAST_DATE_093B"],
-                spec_last_date_093c = row["SPEC_LAST_DATE_093C"],
-
-                # Costs
-                bridge_imp_cost_094 = int(row["BRIDGE_IMP_COST_094"]) * 1000 if row["BRIDGE_IMP_COST_094"].isdigit() else None,
-                roadway_imp_cost_095 = int(row["ROADWAY_IMP_COST_095"]) * 1000 if row["ROADWAY_IMP_COST_095"].isdigit() else None,
-                total_imp_cost_096 = int(row["TOTAL_IMP_COST_096"]) * 1000 if row["TOTAL_IMP_COST_096"].isdigit() else None,
-                year_of_imp_097 = int(row["YEAR_OF_IMP_097"]) if row["YEAR_OF_IMP_097"].isdigit() else None,
-
-                # Other State & Parallel Structures
-                other_state_code_098a = row["OTHER_STATE_CODE_098A"],
-                other_state_pcnt_098b = row["OTHER_STATE_PCNT_098B"],
-                othr_state_struc_no_099 = row["OTHR_STATE_STRUC_NO_099"],
-                parallel_structure_101 = row["PARALLEL_STRUCTURE_101"],
-
-                # Deck Details
-                temp_structure_103 = row["TEMP_STRUCTURE_103"],
-                deck_structure_type_107 = row["DECK_STRUCTURE_TYPE_107"],
-                surface_type_108a = row["SURFACE_TYPE_108A"],
-                membrane_type_108b = row["MEMBRANE_TYPE_108B"],
-                deck_protection_108c = row["DECK_PROTECTION_108C"],
-
-                # Traffic & Protection
-                percent_adt_truck_109 = int(row["PERCENT_ADT_TRUCK_109"]) if row["PERCENT_ADT_TRUCK_109"].isdigit() else None,
-                national_network_110 = row["NATIONAL_NETWORK_110"],
-                pier_protection_111 = row["PIER_PROTECTION_111"],
-                bridge_len_ind_112 = row["BRIDGE_LEN_IND_112"],
-                scour_critical_113 = row["SCOUR_CRITICAL_113"],
-
-                # Future Projections
-                future_adt_114 = int(row["FUTURE_ADT_114"]) if row["FUTURE_ADT_114"].isdigit() else None,
-                year_of_future_adt_115 = int(row["YEAR_OF_FUTURE_ADT_115"]) if row["YEAR_OF_FUTURE_ADT_115"].isdigit() else None,
-                min_nav_clr_mt_116 = float(row["MIN_NAV_CLR_MT_116"]) if row["MIN_NAV_CLR_MT_116"] else None,
-
-                # System & Agency
-                fed_agency = row["FED_AGENCY"],
-                submitted_by = row["SUBMITTED_BY"],
-                strahnet_highway_100 = row["STRAHNET_HIGHWAY_100"],
-                traffic_direction_102 = row["TRAFFIC_DIRECTION_102"],
-                highway_system_104 = row["HIGHWAY_SYSTEM_104"],
-                federal_lands_105 = row["FEDERAL_LANDS_105"],
-            )
-
-            # Add to bulk insert list
-            bridge_core_objs.append(core)
-            bridge_details_objs.append(details)
-
-        except Exception as e:
-            print(f"Skipping row due to error: {e}")
-            continue
-
-    # Bulk insert into the database
-    db.bulk_save_objects(bridge_core_objs)
-    db.bulk_save_objects(bridge_details_objs)
-    db.commit()
-    db.close()
+    started = time.perf_counter()
+    rows_read = rows_loaded = 0
+
+    try:
+        for chunk in read_nbi_chunks(file_path, chunksize):
+            core, details = transform_chunk(chunk)
+            write_chunk(db, core, details)
+
+            rows_read += len(chunk)
+            rows_loaded += len(core)
+            elapsed = time.perf_counter() - started
+            print(f"{file_path}: {rows_loaded} rows loaded ({rows_loaded / elapsed:,.0f} rows/sec)")
+
+        # Rebuild cluster summaries, per-tile top-N lists and map points; new data invalidates every cached tile result
+        for statement in refresh_clusters_sql() + refresh_tile_top_sql() + refresh_map_points_sql():
+            db.execute(text(statement))
+        db.execute(text(BUMP_VERSION_SQL))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    # Cluster by location and refresh planner statistics for the new data
+    optimize_bridge_tables()
+    vacuum_map_points()
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "file": file_path,
+        "rows_read": rows_read,
+        "rows_loaded": rows_loaded,
+        "rows_skipped": rows_read - rows_loaded,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows_loaded / elapsed, 1) if elapsed else 0.0,
+    }
+    print(f"Loaded {rows_loaded}/{rows_read} rows from {file_path} in {elapsed:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec)")
+    return stats
 
 
 if __name__ == "__main__":
-    load_bridges_from_txt("app/db/data/PA22.txt")
\ No newline at end of file
+    load_bridges_from_txt("app/db/data/PA22.txt")
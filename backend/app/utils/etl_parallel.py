@@ -0,0 +1,254 @@
+"""
+Parallel multi-state ingest of NBI files.
+
+Files are parsed and converted in a process pool sized to the machine's cores and
+handed as COPY-ready CSV to a bounded number of writer threads, each with its own
+database connection. Every file is written in its own transaction that first
+removes the bridges of the states it contains, so a file can be reloaded safely
+and a bad file never aborts the others. With --truncate the files are written into
+staging tables that are swapped in at the end (see etl_copy), so the API keeps
+serving the previous data during the load. A full reload is all or nothing: if any
+file fails, the staging tables are dropped, the previous data stays in place and the
+command exits non-zero, since swapping would drop every bridge of the failed states.
+
+Usage:
+    python -m app.utils.etl_parallel app/db/data/ --workers 8 --writers 4
+    python -m app.utils.etl_parallel "data/*22.txt" --truncate
+"""
+import os
+import glob
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from app.db.session import engine
+from app.db.base import Base
+from app.db.dataset_version import BUMP_VERSION_SQL
+from app.db.clusters import refresh_clusters_sql
+from app.db.tile_top import refresh_tile_top_sql
+from app.db.map_points import refresh_map_points_sql, vacuum_map_points
+from app.utils.etl_loader import CORE_COLUMNS, DETAILS_COLUMNS, DEFAULT_CHUNKSIZE, read_nbi_chunks, transform_chunk
+from app.utils.etl_copy import (
+    CORE_TABLE, DETAILS_TABLE, copy_csv, create_staging_tables, frame_to_csv, swap_in_staging_tables
+)
+
+
+def resolve_inputs(patterns: list) -> list:
+    """
+    Expand directories (all .txt files inside) and glob patterns into a sorted file list
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.update(glob.glob(os.path.join(pattern, "*.txt")))
+        else:
+            files.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(files)
+
+
+def convert_file(file_path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+    """
+    Parse and convert one NBI file into COPY-ready CSV (runs in a worker process)
+    """
+    started = time.perf_counter()
+    core_parts, details_parts, states = [], [], set()
+    rows_read = rows_loaded = 0
+
+    for chunk in read_nbi_chunks(file_path, chunksize):
+        core, details = transform_chunk(chunk)
+        core_parts.append(frame_to_csv(core))
+        details_parts.append(frame_to_csv(details))
+        states.update(core["state_code_001"].unique().tolist())
+        rows_read += len(chunk)
+        rows_loaded += len(core)
+
+    return {
+        "file": file_path,
+        "states": sorted(states),
+        "rows_read": rows_read,
+        "rows_loaded": rows_loaded,
+        "core_csv": "".join(core_parts),
+        "details_csv": "".join(details_parts),
+        "convert_seconds": time.perf_counter() - started,
+    }
+
+
+def write_file(converted: dict, replace_states: bool = True,
+               core_table: str = CORE_TABLE, details_table: str = DETAILS_TABLE) -> float:
+    """
+    COPY one converted file in its own transaction. Returns the write time in seconds
+    """
+    started = time.perf_counter()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+
+        # Replace whatever this file's states had before
+        if replace_states and converted["states"]:
+            in_states = f"SELECT structure_number_008 FROM {core_table} WHERE state_code_001 = ANY(%s)"
+            cursor.execute(f"DELETE FROM {details_table} WHERE structure_number_008 IN ({in_states})",
+                           (converted["states"],))
+            cursor.execute(f"DELETE FROM {core_table} WHERE state_code_001 = ANY(%s)", (converted["states"],))
+
+        copy_csv(cursor, core_table, CORE_COLUMNS, converted["core_csv"])
+        copy_csv(cursor, details_table, DETAILS_COLUMNS, converted["details_csv"])
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    return time.perf_counter() - started
+
+
+def _run_sql(statements: list):
+    """
+    Execute maintenance statements in one transaction
+    """
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _create_staging() -> tuple[str, str]:
+    """
+    Create empty staging tables for a full reload and commit them so every writer can see them
+    """
+    connection = engine.raw_connection()
+    try:
+        tables = create_staging_tables(connection.cursor())
+        connection.commit()
+        return tables
+    finally:
+        connection.close()
+
+
+def _swap_in_staging():
+    """
+    Index the loaded staging tables and swap them in place of the live tables
+    """
+    connection = engine.raw_connection()
+    try:
+        swap_in_staging_tables(connection)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def ingest_files(file_paths: list, workers: int | None = None, writers: int = 4,
+                 truncate: bool = False, chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+    """
+    Convert files in a process pool and write them through a bounded set of writer connections
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    results, failures = [], []
+
+    Base.metadata.create_all(bind=engine)
+
+    # A full reload writes into unindexed staging tables; the live tables keep serving until the swap
+    core_table, details_table = CORE_TABLE, DETAILS_TABLE
+    if truncate:
+        core_table, details_table = _create_staging()
+
+    queue = list(file_paths)
+    # Cap converted-but-unwritten files so memory stays bounded when writers fall behind
+    max_in_flight = workers + writers
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as parse_pool, \
+            ThreadPoolExecutor(max_workers=writers) as write_pool:
+        pending = {}
+
+        def submit_next():
+            while queue and len(pending) < max_in_flight:
+                file_path = queue.pop(0)
+                pending[parse_pool.submit(convert_file, file_path, chunksize)] = ("convert", file_path, None)
+
+        submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, file_path, converted = pending.pop(future)
+                try:
+                    if stage == "convert":
+                        converted = future.result()
+                        write_future = write_pool.submit(write_file, converted, not truncate, core_table, details_table)
+                        pending[write_future] = ("write", file_path, converted)
+                        continue
+
+                    write_seconds = future.result()
+                    result = {
+                        "file": file_path,
+                        "states": converted["states"],
+                        "rows_read": converted["rows_read"],
+                        "rows_loaded": converted["rows_loaded"],
+                        "convert_seconds": round(converted["convert_seconds"], 3),
+                        "write_seconds": round(write_seconds, 3),
+                    }
+                    results.append(result)
+                    print(f"[{len(results) + len(failures)}/{len(file_paths)}] {file_path}: "
+                          f"{result['rows_loaded']} rows (convert {result['convert_seconds']:.2f}s, "
+                          f"write {result['write_seconds']:.2f}s)")
+                except Exception as e:
+                    failures.append({"file": file_path, "stage": stage, "error": str(e)})
+                    print(f"[{len(results) + len(failures)}/{len(file_paths)}] {file_path}: FAILED during {stage}: {e}")
+            submit_next()
+
+    # One rebuild of the derived tables and one version bump for the whole run (the swap does both).
+    # A full reload with any failed file keeps the previous data rather than losing those states.
+    swapped = False
+    if truncate and results and not failures:
+        _swap_in_staging()
+        swapped = True
+    elif truncate:
+        _run_sql([f"DROP TABLE IF EXISTS {details_table}, {core_table}"])
+        print(f"Full reload abandoned ({len(failures)} failed files), previous data kept")
+    elif results:
+        _run_sql(refresh_clusters_sql() + refresh_tile_top_sql() + refresh_map_points_sql() + [BUMP_VERSION_SQL])
+    if swapped or (results and not truncate):
+        vacuum_map_points()
+
+    elapsed = time.perf_counter() - started
+    rows = sum(result["rows_loaded"] for result in results)
+    summary = {
+        "files_ok": len(results),
+        "files_failed": len(failures),
+        "rows_loaded": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+        "workers": workers,
+        "writers": writers,
+        "results": results,
+        "failures": failures,
+        "swapped": swapped,
+    }
+    print(f"Ingested {rows} rows from {len(results)} files in {elapsed:.2f}s "
+          f"({summary['rows_per_sec']:,.0f} rows/sec, {len(failures)} failed)")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load many NBI files in parallel")
+    parser.add_argument("inputs", nargs="+", help="NBI files, directories or glob patterns")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent database writer connections")
+    parser.add_argument("--truncate", action="store_true",
+                        help="Replace all data: load into staging tables and swap them in only if every file loads")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+
+    files = resolve_inputs(args.inputs)
+    if not files:
+        parser.error("No input files found")
+    summary = ingest_files(files, workers=args.workers, writers=args.writers,
+                           truncate=args.truncate, chunksize=args.chunksize)
+    raise SystemExit(1 if summary["files_failed"] else 0)
@@ -0,0 +1,173 @@
+"""
+Incremental (delta) reload of bridge data keyed on structure_number_008.
+
+Each incoming row carries a hash of its source values (see etl_loader.hash_rows).
+Rows whose hash matches the stored one are left alone; new and changed bridges are
+upserted into bridge_core and bridge_details. Bridges missing from the file can
+optionally be deleted, limited to the states present in the file so a single
+state file never removes other states.
+"""
+import time
+import argparse
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from app.db.models import BridgeCore, BridgeDetails
+from app.db.session import SessionLocal
+from app.db.init_db import init_db
+from app.db.maintenance import optimize_bridge_tables
+from app.db.dataset_version import BUMP_VERSION_SQL, read_dataset_state
+from app.db.clusters import refresh_clusters_sql
+from app.db.map_points import MAP_POINTS_TABLE, refresh_map_points_keys_sql, refresh_map_points_sql, vacuum_map_points
+from app.db.tile_top import (
+    CREATE_TOUCHED_SQL, RECORD_TOUCHED_SQL, TILE_TOP_TABLE, TOUCHED_TABLE, refresh_tile_top_sql,
+    refresh_touched_tiles_sql,
+)
+from app.utils.etl_loader import DEFAULT_CHUNKSIZE, frame_to_records, read_nbi_chunks, transform_chunk
+
+
+def _upsert(table):
+    """
+    Build an INSERT ... ON CONFLICT (structure_number_008) DO UPDATE for a table
+    """
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=["structure_number_008"],
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name != "structure_number_008"},
+    )
+
+
+def _existing_hashes(db: Session, keys: list) -> dict:
+    """
+    Return {structure_number: row_hash} for the given keys already in bridge_core
+    """
+    rows = db.execute(
+        text("SELECT structure_number_008, row_hash FROM bridge_core WHERE structure_number_008 = ANY(:keys)"),
+        {"keys": keys},
+    )
+    return dict(rows.all())
+
+
+def _delete_missing(db: Session, states: list) -> int:
+    """
+    Delete bridges of the given states that were not seen in this sync
+    """
+    missing = """
+        SELECT structure_number_008 FROM bridge_core
+        WHERE state_code_001 = ANY(:states)
+          AND structure_number_008 NOT IN (SELECT structure_number_008 FROM sync_seen_keys)
+    """
+    # Their tiles lose a bridge, so record where they were
+    db.execute(
+        text(f"INSERT INTO {TOUCHED_TABLE} (geom) SELECT geom FROM bridge_core "
+             f"WHERE geom IS NOT NULL AND structure_number_008 IN ({missing})"),
+        {"states": states},
+    )
+    db.execute(text(f"DELETE FROM {MAP_POINTS_TABLE} WHERE structure_number_008 IN ({missing})"), {"states": states})
+    db.execute(text(f"DELETE FROM bridge_details WHERE structure_number_008 IN ({missing})"), {"states": states})
+    result = db.execute(text(f"DELETE FROM bridge_core WHERE structure_number_008 IN ({missing})"), {"states": states})
+    return result.rowcount
+
+
+def sync_bridges_from_txt(file_path: str, delete_missing: bool = False, chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+    """
+    Upsert only new or changed bridges from an NBI file. Returns inserted, updated,
+    unchanged and deleted counts.
+    """
+    init_db(reset=False)
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0, "skipped": 0}
+    states = set()
+    core_upsert = _upsert(BridgeCore.__table__)
+    details_upsert = _upsert(BridgeDetails.__table__)
+
+    try:
+        # Keys seen in the file, used to find bridges that disappeared
+        db.execute(text("CREATE TEMP TABLE sync_seen_keys (structure_number_008 VARCHAR(15) PRIMARY KEY) ON COMMIT DROP"))
+
+        # Positions of changed bridges, so only their tiles' top-N lists are refreshed
+        db.execute(text(CREATE_TOUCHED_SQL))
+
+        # Derived tables built for the current version are patched; any other is rebuilt in full
+        built = read_dataset_state(db).built
+
+        # Changed bridges are re-copied into bridge_map_points, unless it was never built
+        map_points_built = MAP_POINTS_TABLE in built
+
+        for chunk in read_nbi_chunks(file_path, chunksize):
+            core, details = transform_chunk(chunk)
+            stats["skipped"] += len(chunk) - len(core)
+            if core.empty:
+                continue
+
+            keys = core["structure_number_008"].tolist()
+            states.update(core["state_code_001"].unique().tolist())
+            db.execute(
+                text("INSERT INTO sync_seen_keys VALUES (:key) ON CONFLICT DO NOTHING"),
+                [{"key": key} for key in keys],
+            )
+
+            # Classify rows by comparing the incoming hash to the stored one
+            stored = _existing_hashes(db, keys)
+            hashes = core["row_hash"].tolist()
+            is_new = pd.Series([key not in stored for key in keys], index=core.index)
+            is_changed = pd.Series(
+                [key in stored and stored[key] != row_hash for key, row_hash in zip(keys, hashes)],
+                index=core.index,
+            )
+            stats["inserted"] += int(is_new.sum())
+            stats["updated"] += int(is_changed.sum())
+            stats["unchanged"] += int((~is_new & ~is_changed).sum())
+
+            touched = is_new | is_changed
+            if touched.any():
+                # Tiles at both the old and the new position of a changed bridge need refreshing
+                touched_keys = core.loc[is_changed, "structure_number_008"].tolist()
+                if touched_keys:
+                    db.execute(text(RECORD_TOUCHED_SQL), {"keys": touched_keys})
+                db.execute(core_upsert, frame_to_records(core[touched]))
+                db.execute(details_upsert, frame_to_records(details[touched]))
+                db.execute(text(RECORD_TOUCHED_SQL), {"keys": core.loc[touched, "structure_number_008"].tolist()})
+                if map_points_built:
+                    for statement in refresh_map_points_keys_sql():
+                        db.execute(text(statement), {"keys": core.loc[touched, "structure_number_008"].tolist()})
+
+        if delete_missing and states:
+            stats["deleted"] = _delete_missing(db, sorted(states))
+
+        # Only a real change rebuilds cluster summaries, refreshes the touched tiles'
+        # top-N lists (all of them if the table was never built) and invalidates cached results
+        if stats["inserted"] or stats["updated"] or stats["deleted"]:
+            tile_top = refresh_touched_tiles_sql() if TILE_TOP_TABLE in built else refresh_tile_top_sql()
+            map_points = [] if map_points_built else refresh_map_points_sql()
+            for statement in refresh_clusters_sql() + tile_top + map_points:
+                db.execute(text(statement))
+            db.execute(text(BUMP_VERSION_SQL))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    # Statistics only; CLUSTER would lock the tables the API is reading
+    optimize_bridge_tables(cluster=False)
+    vacuum_map_points()
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    print(f"Synced {file_path}: {stats['inserted']} inserted, {stats['updated']} updated, "
+          f"{stats['unchanged']} unchanged, {stats['deleted']} deleted in {stats['seconds']:.2f}s")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally sync an NBI file into the database")
+    parser.add_argument("file", help="NBI delimited .txt file")
+    parser.add_argument("--delete-missing", action="store_true",
+                        help="Delete bridges of the file's states that are no longer present")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+    sync_bridges_from_txt(args.file, delete_missing=args.delete_missing, chunksize=args.chunksize)
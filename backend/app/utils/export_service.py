@@ -0,0 +1,88 @@
+"""
+Streaming export of bridge_core rows as NDJSON or CSV with constant server memory.
+
+Rows come from a server-side cursor in batches of EXPORT_BATCH_SIZE and are encoded
+and sent batch by batch. Results are ordered by structure_number_008 so an export can
+be resumed or paged with `after` (keyset pagination).
+"""
+import io
+import csv
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.db.tables import bridge_core
+from app.db.session import SessionLocal
+from app.schemas.bridge import BridgeExportFilters
+from app.utils.bridge_service import TILE_COLUMNS
+from app.utils.fast_json import dumps
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def build_export_query(filters: BridgeExportFilters):
+    """
+    SELECT of the exported columns with every filter applied, in keyset order
+    """
+    table = bridge_core
+    query = select(*[table.c[column] for column in TILE_COLUMNS])
+
+    if filters.state:
+        query = query.where(table.c.state_code_001.in_(filters.state))
+    if filters.bbox:
+        west, south, east, north = filters.bbox
+        query = query.where(table.c.geom.isnot(None)).where(
+            func.ST_Intersects(table.c.geom, func.ST_MakeEnvelope(west, south, east, north, 4326))
+        )
+    if filters.max_lowest_rating is not None:
+        query = query.where(table.c.lowest_rating <= filters.max_lowest_rating)
+    if filters.min_lowest_rating is not None:
+        query = query.where(table.c.lowest_rating >= filters.min_lowest_rating)
+    if filters.min_adt is not None:
+        query = query.where(table.c.adt_029 >= filters.min_adt)
+    if filters.bridge_condition:
+        query = query.where(table.c.bridge_condition.in_(filters.bridge_condition))
+
+    # Keyset pagination: resume strictly after the last structure number already received
+    if filters.after:
+        query = query.where(table.c.structure_number_008 > filters.after)
+    query = query.order_by(table.c.structure_number_008)
+    if filters.limit:
+        query = query.limit(filters.limit)
+    return query
+
+
+def _encode_ndjson(rows: list) -> bytes:
+    return b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def _encode_csv(rows: list, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=TILE_COLUMNS, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def stream_export(filters: BridgeExportFilters, format: str = "ndjson"):
+    """
+    Yield encoded chunks of the export. Opens its own session because the response
+    body is produced after the request's dependencies have been closed.
+    """
+    db = SessionLocal()
+    try:
+        query = build_export_query(filters).execution_options(
+            stream_results=True, yield_per=settings.EXPORT_BATCH_SIZE
+        )
+        result = db.execute(query).mappings()
+
+        first = True
+        for batch in result.partitions():
+            rows = [dict(row) for row in batch]
+            yield _encode_csv(rows, header=first) if format == "csv" else _encode_ndjson(rows)
+            first = False
+
+        # An empty CSV export still gets its header line
+        if first and format == "csv":
+            yield _encode_csv([], header=True)
+    finally:
+        db.close()
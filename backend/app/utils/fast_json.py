@@ -0,0 +1,48 @@
+"""
+Fast JSON encoding of tile query rows.
+
+The tile queries already select exactly the BridgeCoreResponse fields with matching
+types, so rows can be written out directly instead of building and validating one
+Pydantic model per bridge. Uses orjson when it is installed and the stdlib json
+module otherwise.
+"""
+import json
+from app.utils.bridge_service import TILE_COLUMNS
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# Response layouts accepted by the tile endpoints' `format` parameter
+TILE_FORMATS = ("rows", "columnar")
+
+
+def dumps(value) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def encode_rows(rows: list) -> bytes:
+    """
+    List of BridgeCoreResponse objects, the same JSON the response_model path produces
+    """
+    return dumps(rows)
+
+
+def encode_columnar(rows: list, columns: list = TILE_COLUMNS) -> bytes:
+    """
+    Parallel arrays per field: {"count": n, "columns": {"structure_number_008": [...], ...}}
+    """
+    return dumps({"count": len(rows), "columns": {column: [row[column] for row in rows] for column in columns}})
+
+
+def encode_tile_rows(rows: list, layout: str = "rows") -> bytes:
+    """
+    Encode tile rows in one of TILE_FORMATS
+    """
+    return encode_columnar(rows) if layout == "columnar" else encode_rows(rows)
@@ -0,0 +1,240 @@
+"""
+In-memory spatial index of bridge_core for answering tile queries without PostGIS.
+
+The mapped bridges are held in compact NumPy column arrays sorted by the Morton
+(Z-order) code of their zoom-16 tile. Every tile at zoom <= 16 is then one contiguous
+slice of the arrays, found with two binary searches; deeper tiles filter a single
+zoom-16 slice. Each filterKey ordering is precomputed as a global rank per bridge,
+so the top N of any set of tiles is an argpartition over ranks.
+
+PostGIS stays the source of truth: the index is loaded in a background thread
+and reloaded whenever the dataset version changes. Until the first load completes,
+callers fall back to the SQL path. A failed load is not retried for retry_seconds,
+so a broken database does not get a full scan from every request. A bridge belongs to the one tile containing its
+point, as in bridge_tile_top.
+"""
+import time
+import logging
+import threading
+from sqlalchemy import text
+from app.db.session import SessionLocal
+from app.db.tile_math import mappable_sql
+
+try:
+    import numpy as np
+except ImportError:  # the serving mode is only available with numpy installed
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Zoom of the Morton-sorted grid; tiles up to this zoom are single slices
+MORTON_ZOOM = 16
+
+# Tile row columns stored as float64 (NaN = NULL) and converted back on output
+FLOAT_COLUMNS = {"lat_016", "long_017", "deck_area"}
+INT_COLUMNS = {"year_built_027", "adt_029", "year_reconstructed_106", "lowest_rating"}
+
+
+def _spread_bits(values):
+    """
+    Interleave zeros between the low 32 bits of each value (Morton helper)
+    """
+    values = values.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+def morton_codes(x, y):
+    """
+    Z-order codes of tile coordinates (x bits in even positions, y bits in odd positions)
+    """
+    return _spread_bits(x) | (_spread_bits(y) << np.uint64(1))
+
+
+def world_fractions(lon, lat):
+    """
+    Position in [0, 1) Web Mercator world space, the inverse of tile_to_bbox
+    """
+    fx = (lon + 180.0) / 360.0
+    lat_rad = np.radians(lat)
+    fy = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / np.pi) / 2.0
+    return np.clip(fx, 0.0, np.nextafter(1.0, 0.0)), np.clip(fy, 0.0, np.nextafter(1.0, 0.0))
+
+
+class BridgeMemoryIndex:
+    """
+    Immutable Morton-sorted column store of one dataset version
+    """
+    def __init__(self, rows: list, columns: list, sort_columns: dict, version: int):
+        self.version = version
+        self.columns = columns
+        self.size = len(rows)
+
+        lon = np.array([row["lon"] for row in rows], dtype=np.float64)
+        lat = np.array([row["lat"] for row in rows], dtype=np.float64)
+        fx, fy = world_fractions(lon, lat)
+        scale = float(2 ** MORTON_ZOOM)
+        codes = morton_codes((fx * scale).astype(np.int64), (fy * scale).astype(np.int64))
+        order = np.argsort(codes, kind="stable")
+
+        self.codes = codes[order]
+        self.fx = fx[order]
+        self.fy = fy[order]
+
+        # Columns in Morton order: numbers as float arrays, text as (interned) Python lists
+        interned = {}
+        self.data = {}
+        for column in columns:
+            values = [rows[i][column] for i in order]
+            if column in FLOAT_COLUMNS or column in INT_COLUMNS:
+                self.data[column] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                self.data[column] = [interned.setdefault(v, v) for v in values]
+
+        # Global rank of every bridge per filterKey: ORDER BY column (ASC/DESC) NULLS LAST, structure number
+        structure_numbers = np.array(self.data["structure_number_008"], dtype=object)
+        tie_break = np.argsort(structure_numbers, kind="stable").argsort()
+        self.ranks = {}
+        for filter_key, (column, descending) in sort_columns.items():
+            values = self.data[column]
+            if isinstance(values, list):
+                present = sorted({v for v in values if v is not None})
+                codes_by_value = {v: i for i, v in enumerate(present)}
+                values = np.array([np.nan if v is None else codes_by_value[v] for v in values], dtype=np.float64)
+            key = -values if descending else values.copy()
+            key[np.isnan(key)] = np.inf
+            ranking = np.lexsort((tie_break, key))
+            rank = np.empty(self.size, dtype=np.int64)
+            rank[ranking] = np.arange(self.size)
+            self.ranks[filter_key] = rank
+
+    def tile_indexes(self, x: int, y: int, zoom: int):
+        """
+        Positions of the bridges inside tile (x, y) at zoom
+        """
+        if zoom <= MORTON_ZOOM:
+            shift = np.uint64(2 * (MORTON_ZOOM - zoom))
+            code = morton_codes(np.array([x]), np.array([y]))[0]
+            start = np.searchsorted(self.codes, code << shift, side="left")
+            end = np.searchsorted(self.codes, (code + np.uint64(1)) << shift, side="left")
+            return np.arange(start, end)
+
+        # Deeper than the grid: take the enclosing grid cell and filter by position
+        levels = zoom - MORTON_ZOOM
+        candidates = self.tile_indexes(x >> levels, y >> levels, MORTON_ZOOM)
+        scale = float(2 ** zoom)
+        inside = (np.floor(self.fx[candidates] * scale) == x) & (np.floor(self.fy[candidates] * scale) == y)
+        return candidates[inside]
+
+    def top(self, indexes, limit: int, filter_key: str):
+        """
+        The `limit` best positions among indexes, in filterKey order
+        """
+        ranks = self.ranks[filter_key]
+        if len(indexes) > limit:
+            indexes = indexes[np.argpartition(ranks[indexes], limit)[:limit]]
+        return indexes[np.argsort(ranks[indexes], kind="stable")]
+
+    def rows(self, indexes) -> list:
+        """
+        Build tile row dicts (BridgeCoreResponse fields) for positions
+        """
+        values = []
+        for column in self.columns:
+            data = self.data[column]
+            if column in FLOAT_COLUMNS:
+                values.append([None if v != v else v for v in data[indexes].tolist()])
+            elif column in INT_COLUMNS:
+                values.append([None if v != v else int(v) for v in data[indexes].tolist()])
+            else:
+                values.append([data[i] for i in indexes.tolist()])
+        return [dict(zip(self.columns, row)) for row in zip(*values)]
+
+    def query(self, tiles: list, zoom: int, limit: int, filter_key: str, mode: str) -> list:
+        """
+        Answer a tile request: top N per tile in tile order (single) or top N of all tiles (batch)
+        """
+        per_tile = [self.tile_indexes(x, y, zoom) for x, y in dict.fromkeys((x, y) for x, y in tiles)]
+        if mode == "single":
+            chosen = [self.top(indexes, limit, filter_key) for indexes in per_tile]
+            return self.rows(np.concatenate(chosen) if chosen else np.array([], dtype=np.int64))
+        indexes = np.concatenate(per_tile) if per_tile else np.array([], dtype=np.int64)
+        return self.rows(self.top(indexes, limit, filter_key))
+
+
+class MemoryIndexManager:
+    """
+    Holds the current index and reloads it in the background when the dataset version changes
+    """
+    def __init__(self, columns: list, sort_columns: dict, retry_seconds: float = 60.0):
+        self.columns = columns
+        self.sort_columns = sort_columns
+        self.retry_seconds = retry_seconds
+        self.index = None
+        self._loading = False
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"loads": 0, "last_load_seconds": None, "last_error": None}
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def current(self, version: int) -> BridgeMemoryIndex | None:
+        """
+        The loaded index, starting a reload if it is missing or older than version.
+        A previous version keeps serving while its replacement loads, and after a
+        failed load no new one starts until retry_seconds have passed.
+        """
+        index = self.index
+        if index is None or index.version != version:
+            with self._lock:
+                if not self._loading and time.monotonic() >= self._retry_at:
+                    self._loading = True
+                    threading.Thread(target=self._load, args=(version,), daemon=True).start()
+        return index
+
+    def _load(self, version: int):
+        started = time.perf_counter()
+        try:
+            self.index = BridgeMemoryIndex(self._fetch_rows(), self.columns, self.sort_columns, version)
+            self._stats["loads"] += 1
+            self._stats["last_load_seconds"] = round(time.perf_counter() - started, 3)
+            self._stats["last_error"] = None
+            logger.info("Loaded in-memory bridge index v%s: %s bridges in %.2fs",
+                        version, self.index.size, time.perf_counter() - started)
+        except Exception as e:
+            self._stats["last_error"] = str(e)
+            with self._lock:
+                self._retry_at = time.monotonic() + self.retry_seconds
+            logger.exception("Failed to load in-memory bridge index, retrying in %.0fs", self.retry_seconds)
+        finally:
+            with self._lock:
+                self._loading = False
+
+    def _fetch_rows(self) -> list:
+        """
+        Read every mapped bridge with its point coordinates
+        """
+        db = SessionLocal()
+        try:
+            sql = f"""
+                SELECT {", ".join(self.columns)}, ST_X(geom) AS lon, ST_Y(geom) AS lat
+                FROM bridge_core
+                WHERE {mappable_sql("geom")}
+            """
+            result = db.execute(text(sql).execution_options(stream_results=True, yield_per=50_000))
+            return [dict(row) for row in result.mappings()]
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        index = self.index
+        return {
+            **self._stats,
+            "version": index.version if index is not None else None,
+            "bridges": index.size if index is not None else 0,
+            "loading": self._loading,
+        }
@@ -0,0 +1,113 @@
+"""
+Single-flight deduplication: concurrent identical calls share one execution and its result.
+
+When a shared link or the default map view sends the same tile request from many clients
+at once, the first caller (the leader) runs the query and everyone arriving while it is
+in flight waits for that result instead of running their own. Nothing is kept after the
+call finishes; caching is the tile cache's job. Works for threads (the sync endpoints)
+and asyncio tasks (the async endpoints); an error in the leader is raised in every waiter.
+If an async leader is cancelled (its client went away), its waiters run the call again
+instead of failing. Every caller receives the same result object, so it must be treated
+as read-only.
+"""
+import asyncio
+import threading
+
+# Result set on an async call whose leader was cancelled; waiters retry instead of returning it
+_CANCELLED = object()
+
+
+class _Call:
+    """
+    One in-flight execution and its outcome
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-safe registry of in-flight calls by key, with execution counters
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._futures = {}
+        self._stats = {"executions": 0, "saved": 0}
+
+    def _count(self, leader: bool):
+        with self._lock:
+            self._stats["executions" if leader else "saved"] += 1
+
+    def do(self, key, fn):
+        """
+        Run fn() unless an identical call is in flight, in which case wait for its result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                self._stats["saved"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, fn):
+        """
+        Await fn() unless an identical call is in flight on this event loop, in which case await its result
+        """
+        future = self._futures.get(key)
+        while future is not None:
+            # Shielded so a disconnecting waiter does not cancel the leader's query
+            try:
+                result = await asyncio.shield(future)
+            except Exception:
+                self._count(leader=False)
+                raise
+            if result is not _CANCELLED:
+                self._count(leader=False)
+                return result
+            # The leader was cancelled: join whoever leads the retry, or lead it
+            future = self._futures.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        self._count(leader=True)
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Waiters must not see this task's cancellation as their own
+            future.set_result(_CANCELLED)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case nobody was waiting
+            future.exception()
+            raise
+        finally:
+            del self._futures[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls) + len(self._futures)}
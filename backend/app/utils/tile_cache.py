@@ -0,0 +1,135 @@
+"""
+Per-tile result cache for the bridge tile API.
+
+Each entry holds the JSON-encoded top-N bridges of one tile for one
+(dataset version, zoom, x, y, filterKey, limit). Both tile modes are assembled
+from these per-tile lists, so a cached tile serves `single` and `batch` requests
+alike (batch requests only up to TILE_ASSEMBLE_MAX_ROWS tiles x limit). Entries
+live in a byte-bounded in-process LRU. A SharedCacheBackend passed to TileCache
+lets several workers reuse each other's results. Because the dataset version is
+part of every key, bumping it after a load invalidates everything at once and
+old entries simply age out.
+"""
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class SharedCacheBackend(ABC):
+    """
+    Interface for a cache shared between worker processes (e.g. Redis or memcached)
+    """
+    @abstractmethod
+    def get_many(self, keys: list) -> dict:
+        """
+        Return {key: serialized bytes} for the keys the shared cache holds
+        """
+
+    @abstractmethod
+    def set_many(self, items: dict):
+        """
+        Store {key: serialized bytes}
+        """
+
+
+class TileCache:
+    """
+    Thread-safe LRU of serialized tile results bounded by total bytes
+    """
+    def __init__(self, max_bytes: int, shared: SharedCacheBackend | None = None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def key(version: int, zoom: int, x: int, y: int, filter_key: str, limit: int) -> str:
+        return f"v{version}:{zoom}:{x}:{y}:{filter_key}:{limit}"
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get_many(self, keys: list) -> dict:
+        """
+        Return {key: rows} for cached keys, checking the local LRU then the shared backend
+        """
+        return {key: json.loads(payload) for key, payload in self.get_payloads(keys).items()}
+
+    def get_payloads(self, keys: list) -> dict:
+        """
+        Return {key: serialized bytes} for cached keys, without decoding them
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                payload = self._entries.get(key)
+                if payload is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = payload
+            self._stats["hits"] += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.shared is not None:
+            shared = self.shared.get_many(missing)
+            for key, payload in shared.items():
+                self._store(key, payload)
+                found[key] = payload
+            with self._lock:
+                self._stats["shared_hits"] += len(shared)
+
+        with self._lock:
+            self._stats["misses"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: dict):
+        """
+        Cache {key: rows} locally and in the shared backend
+        """
+        self.put_payloads({key: json.dumps(rows, separators=(",", ":")).encode() for key, rows in items.items()})
+
+    def put_payloads(self, payloads: dict):
+        """
+        Cache {key: serialized bytes} that are already encoded
+        """
+        for key, payload in payloads.items():
+            self._store(key, payload)
+        if self.shared is not None and payloads:
+            self.shared.set_many(payloads)
+
+    def _store(self, key: str, payload: bytes):
+        """
+        Insert one payload and evict least recently used entries beyond max_bytes
+        """
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._bytes += len(payload)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["shared_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": round((self._stats["hits"] + self._stats["shared_hits"]) / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "shared_backend": type(self.shared).__name__ if self.shared is not None else None,
+            }
@@ -0,0 +1,162 @@
+"""
+Binary columnar encodings of tile rows and HTTP content negotiation for the tile endpoints.
+
+Clients pick a body format with the Accept header:
+    application/json                      JSON (rows or columnar, see fast_json)
+    application/vnd.apache.arrow.stream   Arrow IPC stream (needs pyarrow on the server)
+    application/vnd.bridges.packed        packed little-endian arrays, layout below
+
+Packed layout (all little-endian, every numeric block starts 4-byte aligned):
+    magic     4 bytes  b"BRG1"
+    count     uint32   number of bridges n
+    lat_016, long_017                                 float32[n] each, NaN = null
+    adt_029, lowest_rating, year_built_027            int32[n] each, -1 = null
+    bridge_condition, deck_cond_058, superstructure_cond_059,
+    substructure_cond_060, channel_cond_061, culvert_cond_062
+                                                      uint8[n] each, ASCII code, 0 = null
+    structure_number_008                              n x 15 bytes ASCII, NUL padded
+
+Bodies are gzip or brotli compressed when the client accepts it (brotli needs the brotli package).
+"""
+import sys
+import gzip
+from array import array
+from app.utils.fast_json import encode_tile_rows
+
+try:
+    import pyarrow
+except ImportError:  # Arrow responses are only offered when pyarrow is installed
+    pyarrow = None
+
+try:
+    import brotli
+except ImportError:  # brotli falls back to gzip
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PACKED_MEDIA_TYPE = "application/vnd.bridges.packed"
+
+PACKED_MAGIC = b"BRG1"
+STRUCTURE_NUMBER_WIDTH = 15
+
+# Fields carried by the binary formats: what the map needs to place and style markers
+FLOAT_COLUMNS = ["lat_016", "long_017"]
+INT_COLUMNS = ["adt_029", "lowest_rating", "year_built_027"]
+CODE_COLUMNS = [
+    "bridge_condition",
+    "deck_cond_058",
+    "superstructure_cond_059",
+    "substructure_cond_060",
+    "channel_cond_061",
+    "culvert_cond_062",
+]
+BINARY_COLUMNS = ["structure_number_008"] + FLOAT_COLUMNS + INT_COLUMNS + CODE_COLUMNS
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_packed(rows: list) -> bytes:
+    """
+    Encode rows in the packed layout described in the module docstring
+    """
+    nan = float("nan")
+    blocks = [PACKED_MAGIC, _little_endian(array("I", [len(rows)]))]
+    for column in FLOAT_COLUMNS:
+        blocks.append(_little_endian(array("f", [nan if row[column] is None else row[column] for row in rows])))
+    for column in INT_COLUMNS:
+        blocks.append(_little_endian(array("i", [-1 if row[column] is None else row[column] for row in rows])))
+    for column in CODE_COLUMNS:
+        blocks.append(bytes(ord(row[column][0]) if row[column] else 0 for row in rows))
+
+    # Pad the uint8 blocks so a decoder can keep reading at a 4-byte boundary
+    padding = (-len(rows) * len(CODE_COLUMNS)) % 4
+    blocks.append(b"\0" * padding)
+    blocks.append(b"".join(
+        (row["structure_number_008"] or "").encode("ascii")[:STRUCTURE_NUMBER_WIDTH].ljust(STRUCTURE_NUMBER_WIDTH, b"\0")
+        for row in rows
+    ))
+    return b"".join(blocks)
+
+
+def encode_arrow(rows: list) -> bytes:
+    """
+    Encode rows as a single-batch Arrow IPC stream
+    """
+    schema = pyarrow.schema(
+        [("structure_number_008", pyarrow.string())]
+        + [(column, pyarrow.float32()) for column in FLOAT_COLUMNS]
+        + [(column, pyarrow.int32()) for column in INT_COLUMNS]
+        + [(column, pyarrow.string()) for column in CODE_COLUMNS]
+    )
+    table = pyarrow.table({column: [row[column] for row in rows] for column in BINARY_COLUMNS}, schema=schema)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _accepted(header: str) -> list:
+    """
+    Media types or encodings from an Accept/Accept-Encoding header, best first (q=0 dropped)
+    """
+    choices = []
+    for position, part in enumerate(header.split(",")):
+        value, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if value and quality > 0:
+            choices.append((-quality, position, value.lower()))
+    return [value for _, _, value in sorted(choices)]
+
+
+def negotiate_media_type(accept: str | None) -> str | None:
+    """
+    Response media type for an Accept header, or None when nothing offered is acceptable
+    """
+    offered = [JSON_MEDIA_TYPE, PACKED_MEDIA_TYPE] + ([ARROW_MEDIA_TYPE] if pyarrow is not None else [])
+    if not accept:
+        return JSON_MEDIA_TYPE
+    for media_type in _accepted(accept):
+        if media_type in ("*/*", "application/*"):
+            return JSON_MEDIA_TYPE
+        if media_type in offered:
+            return media_type
+    return None
+
+
+def encode_tile_body(rows: list, media_type: str, layout: str = "rows") -> bytes:
+    """
+    Encode tile rows for a negotiated media type
+    """
+    if media_type == ARROW_MEDIA_TYPE:
+        return encode_arrow(rows)
+    if media_type == PACKED_MEDIA_TYPE:
+        return encode_packed(rows)
+    return encode_tile_rows(rows, layout)
+
+
+def compress_body(body: bytes, accept_encoding: str | None) -> tuple[bytes, str | None]:
+    """
+    Compress with brotli or gzip if accepted and worthwhile. Returns (body, content encoding)
+    """
+    if not accept_encoding or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    for encoding in _accepted(accept_encoding):
+        if encoding == "br" and brotli is not None:
+            return brotli.compress(body, quality=4), "br"
+        if encoding == "gzip":
+            return gzip.compress(body, compresslevel=5), "gzip"
+    return body, None
@@ -0,0 +1,85 @@
+"""
+Tile-set geometry for the tile queries: coalescing tile lists into rectangles and tile bounds.
+
+A viewport (minus the tiles a client already has) is a handful of contiguous blocks, so
+the batch query matches bridges against a few axis-aligned rectangles with `&&`
+instead of a union of one envelope per tile. Bounds are computed with NumPy for large
+tile lists when it is installed.
+"""
+from math import atan, exp, pi
+
+try:
+    import numpy as np
+except ImportError:  # optional: plain Python math below
+    np = None
+
+# Below this many rectangles the Python loop is faster than building arrays
+VECTORIZE_MIN = 32
+
+
+def coalesce_tiles(tiles: list) -> list:
+    """
+    Merge tiles into axis-aligned rectangles (x_min, y_min, x_max, y_max), inclusive tile indexes.
+    Contiguous X runs are found per row, then runs spanning the same columns on consecutive rows are merged.
+    """
+    rows = {}
+    for x, y in tiles:
+        rows.setdefault(y, set()).add(x)
+
+    rects = []
+    open_rects = {}
+    for y in sorted(rows):
+        xs = sorted(rows[y])
+        runs = []
+        start = previous = xs[0]
+        for x in xs[1:]:
+            if x != previous + 1:
+                runs.append((start, previous))
+                start = x
+            previous = x
+        runs.append((start, previous))
+
+        next_open = {}
+        for run in runs:
+            rect = open_rects.pop(run, None)
+            if rect is not None and rect[3] == y - 1:
+                rect[3] = y
+            else:
+                if rect is not None:
+                    rects.append(rect)
+                rect = [run[0], y, run[1], y]
+            next_open[run] = rect
+        rects.extend(open_rects.values())
+        open_rects = next_open
+    rects.extend(open_rects.values())
+    return [tuple(rect) for rect in rects]
+
+
+def _edge_lat(y: float, n: int) -> float:
+    """
+    Latitude of the top edge of tile row y (same formula as tile_to_bbox)
+    """
+    return 180 / pi * (2 * atan(exp(pi * (1 - 2 * y / n))) - pi / 2)
+
+
+def rect_bounds(rects: list, zoom: int) -> dict:
+    """
+    EPSG:4326 bounds of tile rectangles as parallel lists (lon_min, lat_min, lon_max, lat_max)
+    """
+    n = 2 ** zoom
+    if np is not None and len(rects) >= VECTORIZE_MIN:
+        r = np.asarray(rects, dtype=np.float64)
+        edge_lat = lambda y: 180 / np.pi * (2 * np.arctan(np.exp(np.pi * (1 - 2 * y / n))) - np.pi / 2)
+        return {
+            "lon_min": (r[:, 0] / n * 360.0 - 180.0).tolist(),
+            "lat_min": edge_lat(r[:, 3] + 1).tolist(),
+            "lon_max": ((r[:, 2] + 1) / n * 360.0 - 180.0).tolist(),
+            "lat_max": edge_lat(r[:, 1]).tolist(),
+        }
+
+    return {
+        "lon_min": [x_min / n * 360.0 - 180.0 for x_min, _, _, _ in rects],
+        "lat_min": [_edge_lat(y_max + 1, n) for _, _, _, y_max in rects],
+        "lon_max": [(x_max + 1) / n * 360.0 - 180.0 for _, _, x_max, _ in rects],
+        "lat_max": [_edge_lat(y_min, n) for _, y_min, _, _ in rects],
+    }
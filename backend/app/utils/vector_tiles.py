@@ -0,0 +1,85 @@
+"""
+Mapbox Vector Tile (MVT) encoding of bridge tiles, done entirely in PostGIS with ST_AsMVT.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from app.utils.bridge_service import ORDER_CLAUSES, SORT_COLUMNS, TILE_COLUMNS, tile_to_bbox
+
+# Layer name, tile extent and clip buffer used for every tile
+MVT_LAYER = "bridges"
+MVT_EXTENT = 4096
+MVT_BUFFER = 64
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+# Attributes carried by features from a given zoom upwards; low zooms only need enough to style points
+MVT_ZOOM_ATTRIBUTES = [
+    (0, ["structure_number_008", "lowest_rating"]),
+    (8, ["structure_number_008", "lowest_rating", "bridge_condition", "adt_029", "year_built_027"]),
+    (12, [column for column in TILE_COLUMNS if column not in ("lat_016", "long_017")]),
+]
+
+
+def tile_in_range(z: int, x: int, y: int) -> bool:
+    """
+    Check that x/y are valid tile indexes at zoom z
+    """
+    n = 2 ** z
+    return 0 <= x < n and 0 <= y < n
+
+
+def attributes_for_zoom(zoom: int, filter_key: str) -> list:
+    """
+    Feature attributes for a zoom level, always including the column the filterKey sorts on
+    """
+    columns = []
+    for min_zoom, zoom_columns in MVT_ZOOM_ATTRIBUTES:
+        if zoom >= min_zoom:
+            columns = zoom_columns
+    sort_column = SORT_COLUMNS[filter_key][0]
+    return columns if sort_column in columns else columns + [sort_column]
+
+
+def build_mvt_sql(z: int, x: int, y: int, filter_key: str, limit: int):
+    """
+    Build the SQL and bind parameters for one vector tile.
+    The bbox comes from tile_to_bbox so features match the JSON tile endpoints exactly.
+    """
+    lat_min, lat_max, lon_min, lon_max = tile_to_bbox(x, y, z)
+    columns = ", ".join(attributes_for_zoom(z, filter_key))
+
+    # Top N bridges of the tile in filterKey order, projected to Web Mercator tile space
+    sql = f"""
+    WITH bounds AS (
+        SELECT ST_MakeEnvelope(:lon_min, :lat_min, :lon_max, :lat_max, 4326) AS envelope,
+               ST_Transform(ST_MakeEnvelope(:lon_min, :lat_min, :lon_max, :lat_max, 4326), 3857) AS tile
+    ),
+    features AS (
+        SELECT {columns},
+               ST_AsMVTGeom(ST_Transform(geom, 3857), bounds.tile, {MVT_EXTENT}, {MVT_BUFFER}, true) AS geom
+        FROM bridge_core, bounds
+        WHERE geom IS NOT NULL
+          AND ST_Intersects(geom, bounds.envelope)
+        ORDER BY {ORDER_CLAUSES[filter_key]}
+        LIMIT :limit
+    )
+    SELECT ST_AsMVT(features, '{MVT_LAYER}', {MVT_EXTENT}, 'geom')
+    FROM features;
+    """
+    params = {"lon_min": lon_min, "lat_min": lat_min, "lon_max": lon_max, "lat_max": lat_max, "limit": limit}
+    return sql, params
+
+
+def mvt_tile(z: int, x: int, y: int, filter_key: str, limit: int, db: Session) -> bytes:
+    """
+    Return the encoded vector tile (empty bytes when the tile has no bridges)
+    """
+    sql, params = build_mvt_sql(z, x, y, filter_key, limit)
+    tile = db.execute(text(sql), params).scalar()
+    return bytes(tile) if tile else b""
+
+
+def mvt_etag(version: int, z: int, x: int, y: int, filter_key: str, limit: int) -> str:
+    """
+    ETag of a vector tile; it only changes when the dataset version does
+    """
+    return f'"v{version}-{z}-{x}-{y}-{filter_key}-{limit}"'
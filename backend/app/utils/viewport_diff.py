@@ -0,0 +1,167 @@
+"""
+"Already have" tokens for /batch, so panning and zooming only transfers bridges the client lacks.
+
+Every tile response comes with a token (X-Tile-Have header) describing what the client
+now holds: the requested tiles at that zoom as a bitmap over their bounding box, plus a
+cursor on the filterKey ranking (value and structure number of the limit-th best row).
+A client that keeps every row it receives holds all bridges of those tiles that rank at
+or above the cursor, or every bridge when the response had fewer than `limit` rows.
+The client sends its tokens back with later requests and the server drops rows a token
+proves the client already has.
+
+Tokens of another dataset version or filterKey are ignored. Ignoring a token is always
+safe, it only means more rows, so the client may drop old tokens at any time.
+"""
+import json
+import base64
+import binascii
+from math import cos, floor, log, pi, radians, tan
+from app.core.config import settings
+from app.utils.bridge_service import SORT_COLUMNS
+
+HAVE_HEADER = "X-Tile-Have"
+
+
+def _rank_key(value, structure_number: str, descending: bool):
+    """
+    Sort key matching ORDER_CLAUSES: better values first, NULLs last, then structure number
+    """
+    if value is None:
+        return (1, 0, structure_number)
+    return (0, -value if descending else value, structure_number)
+
+
+def _world_fractions(lat: float, lon: float):
+    """
+    Position in [0, 1) Web Mercator world space (tile = floor(fraction * 2^zoom))
+    """
+    fx = (lon + 180) / 360
+    fy = (1 - log(tan(radians(lat)) + 1 / cos(radians(lat))) / pi) / 2
+    return min(max(fx, 0.0), 0.999999999), min(max(fy, 0.0), 0.999999999)
+
+
+def have_token(version: int, filter_key: str, zoom: int, tiles: list, rows: list, limit: int) -> str | None:
+    """
+    Token for a full tile response (before dropping held rows), or None if the tiles span too large an area
+    """
+    xs = [x for x, _ in tiles]
+    ys = [y for _, y in tiles]
+    x0, y0 = min(xs), min(ys)
+    width, height = max(xs) - x0 + 1, max(ys) - y0 + 1
+    if width * height > settings.TILE_HAVE_MAX_AREA:
+        return None
+
+    bitmap = bytearray((width * height + 7) // 8)
+    for x, y in tiles:
+        bit = (y - y0) * width + (x - x0)
+        bitmap[bit // 8] |= 1 << (bit % 8)
+
+    # With `limit` rows or more, the client holds everything ranked up to the limit-th best row
+    complete = len(rows) < limit
+    cursor = None
+    if not complete:
+        column, descending = SORT_COLUMNS[filter_key]
+        row = sorted(rows, key=lambda r: _rank_key(r[column], r["structure_number_008"], descending))[limit - 1]
+        cursor = [row[column], row["structure_number_008"]]
+
+    payload = [version, filter_key, zoom, x0, y0, width, height,
+               base64.b64encode(bytes(bitmap)).decode(), int(complete), cursor]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_have_token(token: str) -> dict:
+    """
+    Parse a token; raises ValueError when it is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        version, filter_key, zoom, x0, y0, width, height, bitmap, complete, cursor = json.loads(raw)
+        bitmap = base64.b64decode(bitmap, validate=True)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError("Malformed have token") from e
+
+    numbers = (version, zoom, x0, y0, width, height)
+    if not all(isinstance(n, int) for n in numbers) or not 0 <= zoom <= 30 or width <= 0 or height <= 0:
+        raise ValueError("Malformed have token")
+    if width * height > settings.TILE_HAVE_MAX_AREA or len(bitmap) != (width * height + 7) // 8:
+        raise ValueError("Malformed have token")
+    if not complete and not (isinstance(cursor, list) and len(cursor) == 2 and isinstance(cursor[1], str)):
+        raise ValueError("Malformed have token")
+    return {"version": version, "filter_key": filter_key, "zoom": zoom, "x0": x0, "y0": y0,
+            "width": width, "height": height, "bitmap": bitmap, "complete": bool(complete), "cursor": cursor}
+
+
+class HaveSummary:
+    """
+    What a client holds according to its tokens, merged per zoom into {(x, y): claim}
+    """
+    def __init__(self, tokens: list, version: int, filter_key: str):
+        self.column, self.descending = SORT_COLUMNS[filter_key]
+        self.claims = {}
+        for token in tokens:
+            if token["version"] != version or token["filter_key"] != filter_key:
+                continue
+            try:
+                self._add(token)
+            except TypeError:
+                # A forged cursor of the wrong type; skipping it only means more rows
+                continue
+
+    def _add(self, token: dict):
+        claim = (0, None) if token["complete"] else (1, _rank_key(*token["cursor"], self.descending))
+        tiles = self.claims.setdefault(token["zoom"], {})
+        width, bitmap = token["width"], token["bitmap"]
+        for bit in range(width * token["height"]):
+            if bitmap[bit // 8] >> (bit % 8) & 1:
+                tile = (token["x0"] + bit % width, token["y0"] + bit // width)
+                # Several tokens on one tile: the most inclusive claim wins
+                if tile not in tiles or self._covers(claim, tiles[tile]):
+                    tiles[tile] = claim
+
+    def _covers(self, claim, other) -> bool:
+        """
+        Whether claim holds at least every bridge other holds (complete, or a cursor ranked no better)
+        """
+        if claim[0] == 0:
+            return True
+        return other[0] == 1 and claim[1] >= other[1]
+
+    def holds(self, row: dict) -> bool:
+        """
+        Whether the client already has this row
+        """
+        if row["lat_016"] is None or row["long_017"] is None:
+            return False
+        fx, fy = _world_fractions(row["lat_016"], row["long_017"])
+        key = None
+        for zoom, tiles in self.claims.items():
+            n = 2 ** zoom
+            claim = tiles.get((floor(fx * n), floor(fy * n)))
+            if claim is None:
+                continue
+            if claim[0] == 0:
+                return True
+            if key is None:
+                key = _rank_key(row[self.column], row["structure_number_008"], self.descending)
+            # A forged cursor of another type cannot prove anything
+            try:
+                if key <= claim[1]:
+                    return True
+            except TypeError:
+                continue
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self.claims)
+
+
+def diff_tile_rows(rows: list, tokens: list, version: int, filter_key: str, zoom: int, tiles: list,
+                   limit: int):
+    """
+    Return (rows the client lacks, token for the full response) for a tile request
+    """
+    token = have_token(version, filter_key, zoom, tiles, rows, limit)
+    summary = HaveSummary(tokens, version, filter_key)
+    if summary:
+        rows = [row for row in rows if not summary.holds(row)]
+    return rows, token
@@ -0,0 +1,101 @@
+"""
+Helpers shared by the benchmarks: tile math, percentiles, memory and result files.
+
+Results are written as JSON with run metadata (time, git commit, Python, host) under
+benchmarks/results/ unless an explicit path is given, so runs can be compared over
+time with `python -m benchmarks.compare`.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import platform
+import resource
+import subprocess
+from math import cos, floor, log, pi, radians, tan
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def lat_lng_to_tile(lat: float, lng: float, zoom: int):
+    """
+    Convert latitude/longitude to tile X/Y (same math as the frontend's latLngToTile)
+    """
+    n = 2 ** zoom
+    x = floor((lng + 180) / 360 * n)
+    y = floor((1 - log(tan(radians(lat)) + 1 / cos(radians(lat))) / pi) / 2 * n)
+    return x, y
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies: list, elapsed: float) -> dict:
+    """
+    Request count, throughput and latency percentiles (ms) of latencies in seconds
+    """
+    values = sorted(latency * 1000 for latency in latencies)
+    return {
+        "requests": len(values),
+        "rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+    }
+
+
+def peak_rss_mb(pid: int | None = None) -> float | None:
+    """
+    Peak resident memory of this process, or of another process via /proc (Linux)
+    """
+    if pid is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+def run_metadata() -> dict:
+    """
+    When and where a benchmark ran, so results from different commits can be compared
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "host": socket.gethostname(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_result(name: str, result: dict, output: str | None = None) -> str:
+    """
+    Write a result with run metadata to output, or to benchmarks/results/<name>-<time>.json
+    """
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump({"benchmark": name, **run_metadata(), **result}, f, indent=2)
+    return output
@@ -0,0 +1,53 @@
+"""
+Compare two benchmark result files and print the change of every numeric value.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/trace-a.json benchmarks/results/trace-b.json
+"""
+import json
+import argparse
+
+
+def numeric_leaves(value, prefix: str = "") -> dict:
+    """
+    Flatten nested dicts/lists to {"a.b.0.c": number}
+    """
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return {prefix: value} if isinstance(value, (int, float)) and not isinstance(value, bool) else {}
+    leaves = {}
+    for key, child in items:
+        leaves.update(numeric_leaves(child, f"{prefix}.{key}" if prefix else str(key)))
+    return leaves
+
+
+def compare(before: dict, after: dict) -> list:
+    """
+    (key, before, after, percent change) for numeric values present in both results
+    """
+    old, new = numeric_leaves(before), numeric_leaves(after)
+    rows = []
+    for key in old:
+        if key in new and key != "cpus":
+            change = (new[key] - old[key]) / old[key] * 100 if old[key] else None
+            rows.append((key, old[key], new[key], change))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"{before.get('git_commit')} -> {after.get('git_commit')}")
+    for key, old, new, change in compare(before, after):
+        print(f"{key:<45} {old:>12} {new:>12} {'' if change is None else f'{change:+.1f}%':>9}")
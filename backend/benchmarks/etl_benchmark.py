@@ -0,0 +1,80 @@
+"""
+End-to-end timing of load_bridges_from_txt on synthetic NBI files of increasing size.
+
+For every size the file is generated (not timed), the bridge tables are truncated and
+the load runs in a fresh process, so the reported peak RSS belongs to that load alone.
+The load includes the derived-table rebuilds and the post-load CLUSTER/ANALYZE.
+Needs DATABASE_URL pointing at a scratch PostGIS database (see benchmarks/docker-compose.yml);
+its bridge tables are emptied.
+
+Usage:
+    python -m benchmarks.etl_benchmark --rows 10000 100000 1000000
+"""
+import os
+import time
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.common import peak_rss_mb, save_result
+from benchmarks.synthetic_nbi import generate_nbi_file
+
+
+def _load_in_process(path: str, chunksize: int) -> dict:
+    """
+    Truncate the bridge tables and load one file (runs in a child process)
+    """
+    from sqlalchemy import text
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.utils.etl_loader import load_bridges_from_txt
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("TRUNCATE bridge_details, bridge_core"))
+
+    started = time.perf_counter()
+    stats = load_bridges_from_txt(path, chunksize)
+    return {**stats, "wall_seconds": round(time.perf_counter() - started, 3), "peak_rss_mb": peak_rss_mb()}
+
+
+def run(sizes: list, seed: int, chunksize: int, keep_files: bool) -> dict:
+    """
+    Generate and load each size; returns one entry per size
+    """
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    for rows in sizes:
+        path = os.path.join(tempfile.gettempdir(), f"nbi_synthetic_{rows}_{seed}.txt")
+        generated = time.perf_counter()
+        generate_nbi_file(path, rows, seed)
+        generate_seconds = round(time.perf_counter() - generated, 3)
+
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                stats = pool.submit(_load_in_process, path, chunksize).result()
+        finally:
+            if not keep_files:
+                os.remove(path)
+
+        entry = {"rows": rows, "generate_seconds": generate_seconds, **stats}
+        entry.pop("file", None)
+        runs.append(entry)
+        print(f"{rows:>9} rows: {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec), "
+              f"peak RSS {stats['peak_rss_mb']} MB")
+    return {"seed": seed, "chunksize": chunksize, "runs": runs}
+
+
+if __name__ == "__main__":
+    from app.utils.etl_loader import DEFAULT_CHUNKSIZE
+
+    parser = argparse.ArgumentParser(description="Time load_bridges_from_txt on synthetic NBI files")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="File sizes to load")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--keep-files", action="store_true", help="Keep the generated files in the temp dir")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/etl-<time>.json)")
+    args = parser.parse_args()
+
+    result = run(args.rows, args.seed, args.chunksize, args.keep_files)
+    print(save_result("etl", result, args.output))
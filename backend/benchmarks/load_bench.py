@@ -0,0 +1,132 @@
+"""
+HTTP load test for the tile and detail endpoints.
+
+Simulates map clients that keep panning around a region: each client posts a
+viewport of tiles to /api/bridges/batch and occasionally opens a bridge detail.
+Reports requests/sec and latency percentiles, so the sync and async stacks can
+be compared by running it against the same server started both ways:
+
+    uvicorn app.main:app --workers 1                  # sync path
+    ASYNC_DB=true uvicorn app.main:app --workers 1    # async path
+
+Usage:
+    python -m benchmarks.load_bench --clients 300 --duration 30 --label sync --output sync.json
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+import httpx
+from benchmarks.common import lat_lng_to_tile, percentile
+
+FILTER_KEYS = ["lowestRating", "highestADT", "worstBridgeCondition"]
+
+
+def random_viewport(rng: random.Random, bbox: tuple, zooms: tuple, span: int) -> dict:
+    """
+    A span x span block of tiles around a random point of the bbox (south, west, north, east)
+    """
+    south, west, north, east = bbox
+    zoom = rng.randint(*zooms)
+    cx, cy = lat_lng_to_tile(rng.uniform(south, north), rng.uniform(west, east), zoom)
+    tiles = [[x, y] for x in range(cx - span // 2, cx - span // 2 + span)
+             for y in range(cy - span // 2, cy - span // 2 + span)]
+    return {"zoom": zoom, "tiles": tiles}
+
+
+async def run_client(client: httpx.AsyncClient, rng: random.Random, deadline: float, args, samples: list):
+    """
+    One map client: request viewports back to back until the deadline
+    """
+    known_bridges = []
+    while time.perf_counter() < deadline:
+        if known_bridges and rng.random() < args.detail_ratio:
+            method, url, kwargs = "GET", f"/api/bridges/detail/{rng.choice(known_bridges)}", {}
+            endpoint = "detail"
+        else:
+            params = {"limit": args.limit, "filterKey": rng.choice(FILTER_KEYS), "mode": rng.choice(args.modes)}
+            body = random_viewport(rng, args.bbox, (args.min_zoom, args.max_zoom), args.span)
+            method, url, kwargs = "POST", "/api/bridges/batch", {"params": params, "json": body}
+            endpoint = "batch"
+
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+            if endpoint == "batch" and status == 200:
+                known_bridges = [row["structure_number_008"] for row in response.json()[:50]] or known_bridges
+        except httpx.HTTPError:
+            status = 0
+        samples.append((endpoint, status, time.perf_counter() - started))
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """
+    Throughput, error count and latency percentiles (ms) overall and per endpoint
+    """
+    def stats(rows):
+        latencies = sorted(latency * 1000 for _, _, latency in rows)
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for _, status, _ in rows if status != 200),
+            "rps": round(len(rows) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        }
+
+    endpoints = sorted({endpoint for endpoint, _, _ in samples})
+    return {
+        "overall": stats(samples),
+        "endpoints": {endpoint: stats([s for s in samples if s[0] == endpoint]) for endpoint in endpoints},
+    }
+
+
+async def load_bench(args) -> dict:
+    """
+    Warm up, then run all clients concurrently for args.duration seconds
+    """
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        warmup_deadline = time.perf_counter() + args.warmup
+        await asyncio.gather(*(run_client(client, random.Random(args.seed + i), warmup_deadline, args, [])
+                               for i in range(min(args.clients, 10))))
+
+        samples = []
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(run_client(client, random.Random(args.seed + i), deadline, args, samples)
+                               for i in range(args.clients)))
+        elapsed = time.perf_counter() - started
+
+    return {"label": args.label, "url": args.url, "clients": args.clients, "duration_s": round(elapsed, 2),
+            **summarize(samples, elapsed)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent map-client load test for the bridge API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=300, help="Concurrent simulated map clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured warm-up seconds")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--span", type=int, default=4, help="Tiles per side of each viewport")
+    parser.add_argument("--min-zoom", type=int, default=9)
+    parser.add_argument("--max-zoom", type=int, default=14)
+    parser.add_argument("--modes", nargs="+", default=["batch", "single"])
+    parser.add_argument("--bbox", type=float, nargs=4, default=(39.7, -80.5, 42.3, -74.7),
+                        metavar=("SOUTH", "WEST", "NORTH", "EAST"), help="Area to pan around (default: PA)")
+    parser.add_argument("--detail-ratio", type=float, default=0.1, help="Share of requests that open a detail")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(load_bench(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
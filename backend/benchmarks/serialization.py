@@ -0,0 +1,100 @@
+"""
+Serialization cost of tile responses per 1k rows: FastAPI response_model validation vs the fast JSON path.
+
+No database needed; rows are synthetic but have the exact keys and types the tile queries return.
+
+Usage:
+    python -m benchmarks.serialization --rows 5000 --repeat 20
+"""
+import json
+import time
+import random
+import argparse
+from typing import List
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.schemas.bridge import BridgeCoreResponse
+from app.utils import fast_json
+
+
+def synthetic_tile_rows(count: int, seed: int = 1) -> list:
+    """
+    Rows shaped like the tile query output (TILE_COLUMNS, including NULLs)
+    """
+    rng = random.Random(seed)
+    rating = lambda: rng.choice("0123456789N")
+    maybe = lambda value: value if rng.random() > 0.1 else None
+    return [
+        {
+            "structure_number_008": f"{rng.randrange(10 ** 14):015d}",
+            "state_code_001": rng.choice(["042", "036", "006", "048"]),
+            "lat_016": round(rng.uniform(25, 49), 6),
+            "long_017": round(rng.uniform(-124, -67), 6),
+            "year_built_027": rng.randint(1900, 2024),
+            "adt_029": maybe(rng.randint(0, 200_000)),
+            "deck_cond_058": rating(),
+            "superstructure_cond_059": rating(),
+            "substructure_cond_060": rating(),
+            "channel_cond_061": rating(),
+            "culvert_cond_062": rating(),
+            "year_reconstructed_106": maybe(rng.randint(1950, 2024)),
+            "bridge_condition": rng.choice("GFP"),
+            "lowest_rating": maybe(rng.randint(0, 9)),
+            "deck_area": maybe(round(rng.uniform(10, 5000), 2)),
+        }
+        for _ in range(count)
+    ]
+
+
+def response_model_path(adapter: TypeAdapter, rows: list) -> bytes:
+    """
+    What FastAPI does for response_model=List[BridgeCoreResponse]: validate, dump, JSONResponse
+    """
+    validated = adapter.validate_python(rows)
+    return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+
+def time_path(encode, rows: list, repeat: int) -> float:
+    """
+    Best-of-repeat milliseconds per 1k rows
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encode(rows)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000 / (len(rows) / 1000)
+
+
+def run(rows: int, repeat: int) -> dict:
+    """
+    Time every path on the same rows and check the fast path returns the same JSON
+    """
+    data = synthetic_tile_rows(rows)
+    adapter = TypeAdapter(List[BridgeCoreResponse])
+    if json.loads(response_model_path(adapter, data)) != json.loads(fast_json.encode_rows(data)):
+        raise AssertionError("fast JSON output differs from the response_model output")
+
+    paths = {
+        "response_model": lambda r: response_model_path(adapter, r),
+        "fast_rows": fast_json.encode_rows,
+        "fast_columnar": fast_json.encode_columnar,
+    }
+    results = {"rows": rows, "encoder": "orjson" if fast_json.orjson is not None else "json", "ms_per_1k_rows": {}}
+    for name, encode in paths.items():
+        results["ms_per_1k_rows"][name] = round(time_path(encode, data, repeat), 3)
+    results["payload_bytes"] = {
+        "rows": len(fast_json.encode_rows(data)),
+        "columnar": len(fast_json.encode_columnar(data)),
+    }
+    baseline = results["ms_per_1k_rows"]["response_model"]
+    results["speedup"] = {name: round(baseline / ms, 1) for name, ms in results["ms_per_1k_rows"].items() if ms}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare tile response serialization paths")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
@@ -0,0 +1,154 @@
+"""
+Measure API cold start: import time of app.main and time to the first successful tile response.
+
+Every run uses a fresh interpreter, like a new container or uvicorn worker. The import
+phase also records which ETL-only modules got loaded; the serving path should load none.
+The first-response phase starts uvicorn and polls /api/bridges/batch until it returns
+200. Those times include process startup, the first connection and the first query.
+
+Usage:
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --runs 5 --skip-server   # import time only, no database needed
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import statistics
+import httpx
+from benchmarks.common import save_result
+
+# Modules only the ETL, migrations and init_db should need
+ETL_ONLY_MODULES = ["pandas", "geoalchemy2", "shapely", "alembic", "app.db.models", "app.db.base"]
+
+IMPORT_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - started
+modules = {modules!r}
+loaded = [m for m in modules if m in sys.modules]
+loaded += sorted(m for m in sys.modules if m.startswith("app.utils.etl_"))
+print(json.dumps({{"seconds": seconds, "etl_modules": loaded, "modules": len(sys.modules)}}))
+"""
+
+
+def backend_dir() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def server_env() -> dict:
+    return {**os.environ, "PYTHONPATH": backend_dir()}
+
+
+def import_once() -> dict:
+    """
+    Import app.main in a fresh interpreter and report the time and ETL-only modules loaded
+    """
+    probe = IMPORT_PROBE.format(modules=ETL_ONLY_MODULES)
+    output = subprocess.run([sys.executable, "-c", probe], cwd=backend_dir(), env=server_env(),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(count: int) -> list:
+    """
+    Packages with the largest cumulative import time (python -X importtime), wherever they were first imported
+    """
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=backend_dir(),
+                            env=server_env(), capture_output=True, text=True, check=True).stderr
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if "." not in name:
+            packages[name] = int(cumulative) / 1000
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+    return [{"module": name, "ms": round(ms, 1)} for name, ms in ranked]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def first_response_once(args) -> dict:
+    """
+    Start uvicorn and poll /batch until the first 200; returns seconds to first HTTP answer and first 200
+    """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/bridges/batch"
+    body = {"zoom": args.zoom, "tiles": [[args.x, args.y]]}
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+                               "--log-level", "warning"], cwd=backend_dir(), env=server_env())
+    listening = None
+    try:
+        with httpx.Client(timeout=args.timeout) as client:
+            while time.perf_counter() - started < args.timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+                try:
+                    response = client.post(url, params={"mode": args.mode}, json=body)
+                except httpx.TransportError:
+                    time.sleep(0.005)
+                    continue
+                if listening is None:
+                    listening = time.perf_counter() - started
+                if response.status_code == 200:
+                    return {"listening_seconds": listening, "first_tile_seconds": time.perf_counter() - started}
+                time.sleep(0.005)
+        raise RuntimeError(f"no successful tile response within {args.timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summary(values: list) -> dict:
+    values = sorted(values)
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "min_ms": round(values[0] * 1000, 1),
+        "max_ms": round(values[-1] * 1000, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure API import time and time to first tile response")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-server", action="store_true", help="Only measure the import")
+    parser.add_argument("--zoom", type=int, default=10)
+    parser.add_argument("--x", type=int, default=293, help="Tile X of the probe request (default: Harrisburg, PA)")
+    parser.add_argument("--y", type=int, default=386, help="Tile Y of the probe request")
+    parser.add_argument("--mode", default="batch")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/startup-<time>.json)")
+    args = parser.parse_args()
+
+    imports = [import_once() for _ in range(args.runs)]
+    result = {
+        "runs": args.runs,
+        "import": {
+            **summary([run["seconds"] for run in imports]),
+            "modules_loaded": imports[-1]["modules"],
+            "etl_modules_loaded": imports[-1]["etl_modules"],
+            "slowest": slowest_imports(10),
+        },
+    }
+    print(f"import app.main: median {result['import']['median_ms']} ms, "
+          f"ETL-only modules loaded: {result['import']['etl_modules_loaded'] or 'none'}")
+
+    if not args.skip_server:
+        starts = [first_response_once(args) for _ in range(args.runs)]
+        result["listening"] = summary([run["listening_seconds"] for run in starts])
+        result["first_tile"] = summary([run["first_tile_seconds"] for run in starts])
+        print(f"first HTTP response: median {result['listening']['median_ms']} ms, "
+              f"first 200 from /batch: median {result['first_tile']['median_ms']} ms")
+
+    print(save_result("startup", result, args.output))
@@ -0,0 +1,112 @@
+"""
+Synthetic NBI files at any scale, in the format of app/db/data/sample_bridges.txt.
+
+Every row starts from one of the sample rows and gets a unique structure number, a
+location drawn around a set of "urban" centers (so tiles have realistic density
+differences), and fresh year built, ADT, condition ratings and deck area. About 1%
+of rows have no coordinates, like the real inventory. Output is deterministic for a
+given seed.
+
+Usage:
+    python -m benchmarks.synthetic_nbi /tmp/nbi_100k.txt --rows 100000
+"""
+import os
+import csv
+import random
+import argparse
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), "..", "app", "db", "data", "sample_bridges.txt")
+
+# Continental US (south, west, north, east)
+DEFAULT_BBOX = (25.0, -124.0, 49.0, -67.0)
+
+CONDITION_COLUMNS = [
+    "DECK_COND_058", "SUPERSTRUCTURE_COND_059", "SUBSTRUCTURE_COND_060", "CHANNEL_COND_061", "CULVERT_COND_062",
+]
+
+
+def encode_dms(value: float, is_latitude=True) -> str:
+    """
+    Encode decimal degrees as NBI DMS digits (DDMMSSss / DDDMMSSss), the inverse of convert_dms_to_decimal
+    """
+    value = abs(value)
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    hundredths = min(int(round(((value - degrees) * 60 - minutes) * 60 * 100)), 5999)
+    return f"{degrees:0{2 if is_latitude else 3}d}{minutes:02d}{hundredths:04d}"
+
+
+def read_sample(path: str = SAMPLE_FILE):
+    """
+    Header and rows of the sample file (raw strings)
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        return header, [row for row in reader if len(row) == len(header)]
+
+
+def synthetic_rows(count: int, seed: int = 1, bbox: tuple = DEFAULT_BBOX, centers: int = 200):
+    """
+    Yield `count` synthetic rows (lists of strings in sample column order)
+    """
+    header, templates = read_sample()
+    column = {name: i for i, name in enumerate(header)}
+    rng = random.Random(seed)
+    south, west, north, east = bbox
+    hubs = [(rng.uniform(south, north), rng.uniform(west, east), rng.uniform(0.05, 0.8)) for _ in range(centers)]
+
+    for i in range(count):
+        row = list(rng.choice(templates))
+        row[column["STRUCTURE_NUMBER_008"]] = f"{i:015d}"
+
+        # Most bridges cluster around a hub, the rest are spread over the whole area
+        if rng.random() < 0.01:
+            lat = lon = None
+        elif rng.random() < 0.8:
+            hub_lat, hub_lon, spread = rng.choice(hubs)
+            lat = min(max(rng.gauss(hub_lat, spread), south), north)
+            lon = min(max(rng.gauss(hub_lon, spread), west), east)
+        else:
+            lat, lon = rng.uniform(south, north), rng.uniform(west, east)
+        row[column["LAT_016"]] = encode_dms(lat) if lat is not None else ""
+        row[column["LONG_017"]] = encode_dms(lon, is_latitude=False) if lon is not None else ""
+
+        row[column["YEAR_BUILT_027"]] = str(rng.randint(1900, 2024))
+        row[column["ADT_029"]] = str(int(rng.lognormvariate(7, 1.6)))
+        # Component ratings vary around an overall condition; culverts and channels are often N/A
+        base = int(rng.triangular(2, 9, 7))
+        ratings = [str(min(9, max(0, base + rng.choice((-1, 0, 0, 1))))) for _ in CONDITION_COLUMNS]
+        ratings[3] = "N" if rng.random() < 0.3 else ratings[3]
+        ratings[4] = "N" if rng.random() < 0.8 else ratings[4]
+        for name, rating in zip(CONDITION_COLUMNS, ratings):
+            row[column[name]] = rating
+        numeric = [int(r) for r in ratings if r != "N"]
+        lowest = min(numeric) if numeric else None
+        row[column["LOWEST_RATING"]] = str(lowest) if lowest is not None else ""
+        row[column["BRIDGE_CONDITION"]] = "" if lowest is None else "P" if lowest <= 4 else "F" if lowest <= 6 else "G"
+        row[column["DECK_AREA"]] = f"{rng.uniform(20, 5000):.2f}"
+        yield row
+
+
+def generate_nbi_file(path: str, rows: int, seed: int = 1, bbox: tuple = DEFAULT_BBOX) -> str:
+    """
+    Write a synthetic NBI file with `rows` bridges and return its path
+    """
+    header, _ = read_sample()
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(synthetic_rows(rows, seed, bbox))
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic NBI file")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--bbox", type=float, nargs=4, default=DEFAULT_BBOX,
+                        metavar=("SOUTH", "WEST", "NORTH", "EAST"))
+    args = parser.parse_args()
+    print(generate_nbi_file(args.path, args.rows, args.seed, tuple(args.bbox)))
@@ -0,0 +1,184 @@
+"""
+Replay realistic map-session traces against /api/bridges/batch.
+
+A session starts at zoom 9 somewhere in the area and then pans and zooms like a user
+would. After every move the visible tiles of a 1280x800 viewport are computed the
+way the frontend's getTileKeys does, tiles this session already fetched for the
+current filterKey are dropped (like useTileFetcher), and the rest are posted as one
+/batch request. Traces are deterministic for a seed and can be saved and replayed,
+so the same sessions run against every mode and every commit.
+
+Each mode replays the full trace; the shared per-tile cache is warm after the first
+mode, so for cold comparisons restart the server between modes or run it with
+TILE_CACHE_MAX_BYTES=0. Pass --have to send X-Tile-Have tokens back like the map client,
+and --server-pid to record the server's peak RSS.
+
+Usage:
+    python -m benchmarks.trace_replay --sessions 50 --moves 40 --modes single batch --have --server-pid 1234
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+import httpx
+from math import floor
+from benchmarks.common import lat_lng_to_tile, latency_summary, peak_rss_mb, save_result
+
+FILTER_KEYS = ["lowestRating", "highestADT", "worstBridgeCondition"]
+TILE_SIZE = 256
+MAX_HAVE_TOKENS = 64
+
+
+def visible_tiles(center_x: float, center_y: float, zoom: int, width: int, height: int) -> list:
+    """
+    Tiles covered by a viewport centered on world pixel coordinates at this zoom
+    """
+    n = 2 ** zoom
+    x1 = max(0, floor((center_x - width / 2) / TILE_SIZE))
+    x2 = min(n - 1, floor((center_x + width / 2) / TILE_SIZE))
+    y1 = max(0, floor((center_y - height / 2) / TILE_SIZE))
+    y2 = min(n - 1, floor((center_y + height / 2) / TILE_SIZE))
+    return [[x, y] for x in range(x1, x2 + 1) for y in range(y1, y2 + 1)]
+
+
+def session_trace(rng: random.Random, bbox: tuple, moves: int, zooms: tuple, viewport: tuple) -> list:
+    """
+    One session's /batch requests: pans, zooms and the occasional filter change
+    """
+    south, west, north, east = bbox
+    width, height = viewport
+    zoom = min(max(9, zooms[0]), zooms[1])
+    x, y = lat_lng_to_tile(rng.uniform(south, north), rng.uniform(west, east), zoom)
+    center_x, center_y = (x + 0.5) * TILE_SIZE, (y + 0.5) * TILE_SIZE
+    filter_key = rng.choice(FILTER_KEYS)
+    fetched = {}
+    requests = []
+
+    for move in range(moves + 1):
+        if move:
+            action = rng.random()
+            if action < 0.6:
+                # Pan by up to half a viewport
+                center_x += rng.uniform(-0.5, 0.5) * width
+                center_y += rng.uniform(-0.5, 0.5) * height
+            elif action < 0.95:
+                step = rng.choice((-1, 1))
+                if zooms[0] <= zoom + step <= zooms[1]:
+                    zoom += step
+                    center_x, center_y = center_x * 2 ** step, center_y * 2 ** step
+            else:
+                filter_key = rng.choice(FILTER_KEYS)
+            world = TILE_SIZE * 2 ** zoom
+            center_x, center_y = center_x % world, min(max(center_y, 0), world)
+
+        seen = fetched.setdefault(filter_key, set())
+        tiles = [tile for tile in visible_tiles(center_x, center_y, zoom, width, height)
+                 if (zoom, tile[0], tile[1]) not in seen]
+        seen.update((zoom, tx, ty) for tx, ty in tiles)
+        if tiles:
+            requests.append({"zoom": zoom, "tiles": tiles, "filterKey": filter_key})
+    return requests
+
+
+def build_trace(args) -> list:
+    """
+    Deterministic traces for args.sessions sessions
+    """
+    return [session_trace(random.Random(args.seed + i), args.bbox, args.moves, (args.min_zoom, args.max_zoom),
+                          (args.width, args.height))
+            for i in range(args.sessions)]
+
+
+async def replay_session(client: httpx.AsyncClient, session: list, mode: str, args, samples: list):
+    """
+    Post a session's requests one after another, like a single map client
+    """
+    have = {}
+    for request in session:
+        params = {"limit": args.limit, "filterKey": request["filterKey"], "mode": mode}
+        body = {"zoom": request["zoom"], "tiles": request["tiles"]}
+        if args.have:
+            # Send back the last X-Tile-Have tokens, like useTileFetcher
+            body["have"] = have.get(request["filterKey"], [])[-MAX_HAVE_TOKENS:]
+        started = time.perf_counter()
+        try:
+            response = await client.post("/api/bridges/batch", params=params, json=body)
+            status, size = response.status_code, len(response.content)
+            if args.have and "x-tile-have" in response.headers:
+                have.setdefault(request["filterKey"], []).append(response.headers["x-tile-have"])
+        except httpx.HTTPError:
+            status, size = 0, 0
+        samples.append((status, time.perf_counter() - started, len(request["tiles"]), size))
+
+
+async def replay(trace: list, mode: str, args) -> dict:
+    """
+    Replay all sessions concurrently in one mode
+    """
+    limits = httpx.Limits(max_connections=len(trace), max_keepalive_connections=len(trace))
+    samples = []
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(replay_session(client, session, mode, args, samples) for session in trace))
+        elapsed = time.perf_counter() - started
+
+    tiles = sorted(tiles for _, _, tiles, _ in samples)
+    return {
+        **latency_summary([latency for _, latency, _, _ in samples], elapsed),
+        "errors": sum(1 for status, _, _, _ in samples if status != 200),
+        "seconds": round(elapsed, 3),
+        "tiles_per_request": round(sum(tiles) / len(tiles), 1) if tiles else 0.0,
+        "max_tiles_per_request": tiles[-1] if tiles else 0,
+        "response_bytes": sum(size for _, _, _, size in samples),
+        "server_peak_rss_mb": peak_rss_mb(args.server_pid) if args.server_pid else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay map-session traces against /api/bridges/batch")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--sessions", type=int, default=50, help="Concurrent map sessions")
+    parser.add_argument("--moves", type=int, default=40, help="Pans/zooms per session")
+    parser.add_argument("--modes", nargs="+", default=["single", "batch"])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--min-zoom", type=int, default=5)
+    parser.add_argument("--max-zoom", type=int, default=16)
+    parser.add_argument("--width", type=int, default=1280, help="Viewport width in pixels")
+    parser.add_argument("--height", type=int, default=800, help="Viewport height in pixels")
+    parser.add_argument("--bbox", type=float, nargs=4, default=(39.7, -80.5, 42.3, -74.7),
+                        metavar=("SOUTH", "WEST", "NORTH", "EAST"), help="Area the sessions start in (default: PA)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--trace", help="Replay a trace saved with --save-trace instead of generating one")
+    parser.add_argument("--save-trace", help="Write the generated trace to this file")
+    parser.add_argument("--have", action="store_true", help="Send X-Tile-Have tokens back like the map client")
+    parser.add_argument("--server-pid", type=int, help="API server process, to record its peak RSS")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/trace-<time>.json)")
+    args = parser.parse_args()
+
+    if args.trace:
+        with open(args.trace) as f:
+            trace = json.load(f)["sessions"]
+    else:
+        trace = build_trace(args)
+    if args.save_trace:
+        with open(args.save_trace, "w") as f:
+            json.dump({"seed": args.seed, "sessions": trace}, f)
+
+    modes = {}
+    for mode in args.modes:
+        modes[mode] = asyncio.run(replay(trace, mode, args))
+        print(f"{mode:>6}: {modes[mode]['rps']} req/s, p50 {modes[mode]['p50_ms']} ms, "
+              f"p95 {modes[mode]['p95_ms']} ms, p99 {modes[mode]['p99_ms']} ms")
+
+    result = {
+        "url": args.url,
+        "sessions": len(trace),
+        "requests_per_session": round(sum(len(session) for session in trace) / len(trace), 1) if trace else 0.0,
+        "trace": args.trace,
+        "seed": args.seed,
+        "have_tokens": args.have,
+        "modes": modes,
+    }
+    print(save_result("trace", result, args.output))
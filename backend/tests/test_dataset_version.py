@@ -0,0 +1,30 @@
+"""
+Unit tests for the dataset version row and build stamps (app/db/dataset_version.py).
+"""
+from app.db.dataset_version import (
+    BUILD_STAMPS, BUMP_VERSION_SQL, DatasetState, cached_dataset_state, dataset_state, remember_dataset_state
+)
+
+
+def test_missing_row_is_version_zero_with_nothing_built():
+    assert dataset_state(None) == DatasetState(0, frozenset())
+
+
+def test_table_counts_as_built_only_for_the_current_version():
+    tables = list(BUILD_STAMPS)
+    assert dataset_state((7, *[7] * len(tables))).built == frozenset(tables)
+    assert dataset_state((7, *[6] * len(tables))).built == frozenset()
+    assert dataset_state((7, *[None] * len(tables))).built == frozenset()
+
+
+def test_bump_carries_every_stamp():
+    for column in BUILD_STAMPS.values():
+        assert f"{column} = CASE WHEN dataset_version.{column} = dataset_version.version" in BUMP_VERSION_SQL
+
+
+def test_state_is_cached_per_database():
+    remember_dataset_state("replica:5432/bridges", DatasetState(3, frozenset()))
+    remember_dataset_state("primary:5432/bridges", DatasetState(4, frozenset()))
+    assert cached_dataset_state("replica:5432/bridges").version == 3
+    assert cached_dataset_state("primary:5432/bridges").version == 4
+    assert cached_dataset_state("other:5432/bridges") is None
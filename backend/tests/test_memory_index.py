@@ -0,0 +1,125 @@
+"""
+Unit tests for the in-memory Morton index (app/utils/memory_index.py).
+"""
+import time
+import random
+from math import floor
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.utils.bridge_service import SORT_COLUMNS, TILE_COLUMNS, order_rows, tile_to_bbox
+from app.utils.memory_index import BridgeMemoryIndex, MemoryIndexManager, morton_codes, world_fractions
+
+ZOOM = 10
+TILE = (293, 386)
+
+
+def bridge(number: str, lon: float, lat: float, **values) -> dict:
+    row = {column: None for column in TILE_COLUMNS}
+    row.update(structure_number_008=number, long_017=lon, lat_016=lat, lon=lon, lat=lat, **values)
+    return row
+
+
+def point_in_tile(x: int, y: int, zoom: int, fx: float = 0.5, fy: float = 0.5) -> tuple:
+    lat_min, lat_max, lon_min, lon_max = tile_to_bbox(x, y, zoom)
+    return lon_min + (lon_max - lon_min) * fx, lat_min + (lat_max - lat_min) * fy
+
+
+def tile_of(row: dict, zoom: int) -> tuple:
+    fx, fy = world_fractions(np.array([row["lon"]]), np.array([row["lat"]]))
+    return floor(fx[0] * 2 ** zoom), floor(fy[0] * 2 ** zoom)
+
+
+def test_morton_codes_interleave_x_and_y_bits():
+    x = np.array([0, 1, 0, 1, 2, 3, 65535])
+    y = np.array([0, 0, 1, 1, 0, 5, 65535])
+    assert morton_codes(x, y).tolist() == [0, 1, 2, 3, 4, 0b100111, 2 ** 32 - 1]
+
+
+def test_tile_indexes_match_brute_force_at_every_zoom():
+    rng = random.Random(7)
+    rows = [bridge(f"B{i:05d}", rng.uniform(-80.6, -74.6), rng.uniform(39.7, 42.3)) for i in range(2000)]
+    index = BridgeMemoryIndex(rows, TILE_COLUMNS, SORT_COLUMNS, version=1)
+    numbers = index.data["structure_number_008"]
+
+    for zoom in (4, 9, 16, 18):
+        expected = {}
+        for row in rows:
+            expected.setdefault(tile_of(row, zoom), set()).add(row["structure_number_008"])
+        for tile in rng.sample(sorted(expected), min(20, len(expected))):
+            found = {numbers[i] for i in index.tile_indexes(tile[0], tile[1], zoom).tolist()}
+            assert found == expected[tile], (zoom, tile)
+
+
+def test_batch_query_ranks_like_order_clauses():
+    lon, lat = point_in_tile(*TILE, ZOOM)
+    rows = [
+        bridge("b", lon, lat, lowest_rating=3, adt_029=10, bridge_condition="G"),
+        bridge("B", lon, lat, lowest_rating=3, adt_029=None, bridge_condition="P"),
+        bridge("a", lon, lat, lowest_rating=None, adt_029=500, bridge_condition=None),
+        bridge("C", lon, lat, lowest_rating=5, adt_029=500, bridge_condition="F"),
+    ]
+    index = BridgeMemoryIndex(rows, TILE_COLUMNS, SORT_COLUMNS, version=1)
+
+    for filter_key in SORT_COLUMNS:
+        got = [row["structure_number_008"] for row in index.query([list(TILE)], ZOOM, 10, filter_key, "batch")]
+        assert got == [row["structure_number_008"] for row in order_rows(rows, filter_key)], filter_key
+
+    # Ties on the value break by structure number in byte order ("B" < "b"), NULLs last
+    top = index.query([list(TILE)], ZOOM, 2, "lowestRating", "batch")
+    assert [row["structure_number_008"] for row in top] == ["B", "b"]
+    assert index.query([list(TILE)], ZOOM, 1, "highestADT", "batch")[0]["structure_number_008"] == "C"
+
+
+def test_single_query_returns_top_n_per_tile_in_tile_order():
+    rows = []
+    for x in (293, 294):
+        for i, rating in enumerate((7, 2, 5)):
+            rows.append(bridge(f"{x}-{i}", *point_in_tile(x, 386, ZOOM, fx=0.2 + 0.3 * i), lowest_rating=rating))
+    index = BridgeMemoryIndex(rows, TILE_COLUMNS, SORT_COLUMNS, version=1)
+
+    got = index.query([[294, 386], [293, 386], [294, 386]], ZOOM, 2, "lowestRating", "single")
+    assert [row["structure_number_008"] for row in got] == ["294-1", "294-2", "293-1", "293-2"]
+
+
+def test_rows_restore_types_and_nulls():
+    lon, lat = point_in_tile(*TILE, ZOOM)
+    index = BridgeMemoryIndex([bridge("A", lon, lat, adt_029=1200, deck_area=None)], TILE_COLUMNS, SORT_COLUMNS, 1)
+    row = index.query([list(TILE)], ZOOM, 1, "highestADT", "batch")[0]
+    assert row["adt_029"] == 1200 and isinstance(row["adt_029"], int)
+    assert row["deck_area"] is None
+    assert set(row) == set(TILE_COLUMNS)
+
+
+def failing_manager(retry_seconds: float) -> tuple:
+    manager = MemoryIndexManager(TILE_COLUMNS, SORT_COLUMNS, retry_seconds)
+    calls = []
+
+    def fetch_rows():
+        calls.append(1)
+        raise RuntimeError("database unavailable")
+
+    manager._fetch_rows = fetch_rows
+    return manager, calls
+
+
+def test_failed_load_is_not_retried_before_retry_seconds():
+    manager, calls = failing_manager(retry_seconds=3600)
+    manager._load(1)
+    assert manager.stats()["last_error"] == "database unavailable"
+
+    assert manager.current(1) is None
+    assert not manager._loading
+    assert len(calls) == 1
+
+
+def test_failed_load_is_retried_after_retry_seconds():
+    manager, calls = failing_manager(retry_seconds=0)
+    manager._load(1)
+
+    assert manager.current(1) is None
+    deadline = time.monotonic() + 5
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(calls) == 2
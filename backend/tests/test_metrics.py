@@ -0,0 +1,22 @@
+"""
+Unit tests for the Prometheus text rendering (app/core/metrics.py).
+"""
+from app.core.metrics import render_family
+
+
+def test_family_has_help_and_type_lines():
+    lines = render_family("cache_bytes", "gauge", "Bytes of cached entries", [({"cache": "tile"}, 12)])
+    assert lines == [
+        "# HELP cache_bytes Bytes of cached entries",
+        "# TYPE cache_bytes gauge",
+        'cache_bytes{cache="tile"} 12',
+    ]
+
+
+def test_label_values_are_escaped():
+    lines = render_family("db_route_healthy", "gauge", "Health", [({"target": 'a"b\\c\nd'}, 1)])
+    assert lines[-1] == 'db_route_healthy{target="a\\"b\\\\c\\nd"} 1'
+
+
+def test_unlabelled_sample():
+    assert render_family("tile_query_saved_total", "counter", "Saved", [({}, 3)])[-1] == "tile_query_saved_total 3"
@@ -0,0 +1,153 @@
+"""
+Unit tests for single-flight sharing of identical tile queries (app/utils/single_flight.py).
+"""
+import asyncio
+import threading
+import pytest
+from app.utils.single_flight import SingleFlight
+
+
+def start_waiters(flights: SingleFlight, key, fn, count: int) -> tuple:
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(flights.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_threads_share_one_execution():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return [{"structure_number_008": "A"}], 7
+
+    threads, results, errors = start_waiters(flights, "k", fn, 5)
+    while flights.stats()["executions"] + flights.stats()["saved"] < 5:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert errors == []
+    assert results == [([{"structure_number_008": "A"}], 7)] * 5
+    assert flights.stats() == {"executions": 1, "saved": 4, "in_flight": 0}
+
+
+def test_thread_leader_error_is_raised_in_every_waiter():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        raise RuntimeError("statement timeout")
+
+    threads, results, errors = start_waiters(flights, "k", fn, 3)
+    while flights.stats()["executions"] + flights.stats()["saved"] < 3:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == []
+    assert [str(e) for e in errors] == ["statement timeout"] * 3
+
+    # Nothing is kept: the next call runs again
+    assert flights.do("k", lambda: "fresh") == "fresh"
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+    assert flights.do("a", lambda: 1) == 1
+    assert flights.do("b", lambda: 2) == 2
+    assert flights.stats()["executions"] == 2
+
+
+def test_async_waiters_share_one_execution():
+    async def main():
+        flights = SingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["row"], 7
+
+        results = await asyncio.gather(*(flights.do_async("k", fn) for _ in range(4)))
+        return calls, results, flights.stats()
+
+    calls, results, stats = asyncio.run(main())
+    assert calls == [1]
+    assert results == [(["row"], 7)] * 4
+    assert stats == {"executions": 1, "saved": 3, "in_flight": 0}
+
+
+def test_async_leader_error_is_raised_in_every_waiter():
+    async def main():
+        flights = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("statement timeout")
+
+        return await asyncio.gather(*(flights.do_async("k", fn) for _ in range(3)), return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+
+def test_cancelled_async_leader_does_not_cancel_waiters():
+    async def main():
+        flights = SingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return ["row"], 7
+
+        leader = asyncio.create_task(flights.do_async("k", fn))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(flights.do_async("k", fn)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return calls, results, flights.stats()
+
+    calls, results, stats = asyncio.run(main())
+    # One waiter re-runs the call and the other two share it
+    assert results == [(["row"], 7)] * 3
+    assert len(calls) == 2
+    assert stats == {"executions": 2, "saved": 2, "in_flight": 0}
+
+
+def test_cancelled_async_waiter_does_not_cancel_the_leader():
+    async def main():
+        flights = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.05)
+            return ["row"], 7
+
+        leader = asyncio.create_task(flights.do_async("k", fn))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flights.do_async("k", fn))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        return await leader
+
+    assert asyncio.run(main()) == (["row"], 7)
@@ -0,0 +1,117 @@
+"""
+Unit tests for the per-tile result cache (app/utils/tile_cache.py).
+"""
+import json
+import pytest
+from app.utils.tile_cache import SharedCacheBackend, TileCache
+
+
+class DictBackend(SharedCacheBackend):
+    """
+    Shared backend over a plain dict, standing in for Redis or memcached
+    """
+    def __init__(self):
+        self.items = {}
+
+    def get_many(self, keys: list) -> dict:
+        return {key: self.items[key] for key in keys if key in self.items}
+
+    def set_many(self, items: dict):
+        self.items.update(items)
+
+
+def test_round_trip_decodes_rows():
+    cache = TileCache(1024)
+    rows = [{"structure_number_008": "A1", "lowest_rating": 4}]
+    cache.put_many({"k": rows})
+    assert cache.get_many(["k", "missing"]) == {"k": rows}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_separates_versions_and_limits():
+    keys = {
+        TileCache.key(1, 10, 293, 386, "lowestRating", 100),
+        TileCache.key(2, 10, 293, 386, "lowestRating", 100),
+        TileCache.key(1, 10, 293, 386, "lowestRating", 50),
+        TileCache.key(1, 10, 293, 386, "highestADT", 100),
+    }
+    assert len(keys) == 4
+
+
+def test_bytes_track_stored_payloads():
+    cache = TileCache(1024)
+    cache.put_payloads({"a": b"x" * 100, "b": b"y" * 200})
+    assert cache.stats()["bytes"] == 300
+
+    # Replacing an entry swaps its size rather than adding to it
+    cache.put_payloads({"a": b"z" * 50})
+    assert cache.stats()["bytes"] == 250
+    assert cache.stats()["entries"] == 2
+
+    cache.clear()
+    assert cache.stats()["bytes"] == 0
+
+
+def test_evicts_least_recently_used_beyond_max_bytes():
+    cache = TileCache(300)
+    cache.put_payloads({"a": b"a" * 100, "b": b"b" * 100, "c": b"c" * 100})
+
+    # Reading "a" makes "b" the least recently used entry
+    cache.get_payloads(["a"])
+    cache.put_payloads({"d": b"d" * 100})
+
+    assert set(cache.get_payloads(["a", "b", "c", "d"])) == {"a", "c", "d"}
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 300
+
+
+def test_payload_larger_than_the_cache_is_not_stored():
+    cache = TileCache(100)
+    cache.put_payloads({"small": b"s" * 10, "huge": b"h" * 101})
+    assert set(cache.get_payloads(["small", "huge"])) == {"small"}
+    assert cache.stats()["bytes"] == 10
+
+
+def test_zero_bytes_disables_the_cache():
+    assert not TileCache(0).enabled
+    assert TileCache(1).enabled
+
+
+def test_shared_backend_fills_the_local_cache():
+    shared = DictBackend()
+    writer = TileCache(1024, shared)
+    writer.put_many({"k": [{"structure_number_008": "A1"}]})
+    assert json.loads(shared.items["k"]) == [{"structure_number_008": "A1"}]
+
+    # Another worker finds the entry in the shared backend and keeps a local copy
+    reader = TileCache(1024, shared)
+    assert reader.get_many(["k"]) == {"k": [{"structure_number_008": "A1"}]}
+    assert reader.stats()["shared_hits"] == 1
+    shared.items.clear()
+    assert reader.get_many(["k"]) == {"k": [{"structure_number_008": "A1"}]}
+    assert reader.stats()["hits"] == 1
+
+
+def test_shared_backend_must_implement_the_interface():
+    class Incomplete(SharedCacheBackend):
+        def get_many(self, keys: list) -> dict:
+            return {}
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_batch_requests_use_the_cache_only_under_the_row_cap(monkeypatch):
+    from app.core.config import settings
+    from app.schemas.bridge import TileBatchRequest
+    from app.utils.bridge_service import assemble_from_cache
+
+    monkeypatch.setattr(settings, "TILE_ASSEMBLE_MAX_ROWS", 1000)
+    req = TileBatchRequest(zoom=10, tiles=[[x, 386] for x in range(290, 300)] + [[290, 386]])
+
+    # Duplicate tiles count once: 10 tiles x 100 rows is at the cap
+    assert assemble_from_cache(req, 100, "batch")
+    assert not assemble_from_cache(req, 101, "batch")
+    assert assemble_from_cache(req, 1000, "single")
@@ -0,0 +1,80 @@
+"""
+Unit tests for coalescing tiles into rectangles (app/utils/tile_rects.py).
+"""
+import random
+import pytest
+from app.utils import tile_rects
+from app.utils.bridge_service import tile_to_bbox
+from app.utils.tile_rects import coalesce_tiles, rect_bounds
+
+
+def cells(rects: list) -> list:
+    """
+    Every tile of the rectangles, duplicates kept so overlaps show up
+    """
+    return [(x, y) for x0, y0, x1, y1 in rects for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+
+def block(x0: int, y0: int, width: int, height: int) -> list:
+    return [[x, y] for y in range(y0, y0 + height) for x in range(x0, x0 + width)]
+
+
+def test_full_viewport_is_one_rectangle():
+    assert coalesce_tiles(block(290, 380, 6, 4)) == [(290, 380, 295, 383)]
+
+
+def test_single_tile_and_duplicates():
+    assert coalesce_tiles([[5, 7], [5, 7]]) == [(5, 7, 5, 7)]
+
+
+def test_viewport_after_a_diagonal_pan():
+    # A 4 x 4 view minus the 3 x 3 block the client already has: an L of two rectangles
+    held = {(x, y) for x, y in block(10, 10, 3, 3)}
+    tiles = [tile for tile in block(10, 10, 4, 4) if tuple(tile) not in held]
+    assert sorted(coalesce_tiles(tiles)) == [(10, 13, 13, 13), (13, 10, 13, 12)]
+
+
+def test_rows_with_different_runs_are_not_merged():
+    tiles = [[0, 0], [1, 0], [0, 1], [1, 1], [2, 1], [0, 2], [1, 2]]
+    rects = coalesce_tiles(tiles)
+    assert sorted(cells(rects)) == sorted(map(tuple, tiles))
+    assert len(rects) == 3
+
+
+def test_gap_rows_close_open_rectangles():
+    assert sorted(coalesce_tiles([[3, 0], [3, 1], [3, 3]])) == [(3, 0, 3, 1), (3, 3, 3, 3)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_tile_sets_are_covered_exactly_once(seed):
+    rng = random.Random(seed)
+    tiles = {(rng.randrange(12), rng.randrange(12)) for _ in range(rng.randrange(1, 100))}
+    rects = coalesce_tiles([list(tile) for tile in tiles])
+
+    covered = cells(rects)
+    assert len(covered) == len(set(covered))
+    assert set(covered) == tiles
+    assert all(x0 <= x1 and y0 <= y1 for x0, y0, x1, y1 in rects)
+
+
+def test_bounds_match_tile_envelopes():
+    bounds = rect_bounds([(293, 386, 294, 387)], 10)
+    south, _, west, _ = tile_to_bbox(293, 387, 10)
+    _, north, _, east = tile_to_bbox(294, 386, 10)
+    assert bounds["lon_min"] == [pytest.approx(west)]
+    assert bounds["lat_min"] == [pytest.approx(south)]
+    assert bounds["lon_max"] == [pytest.approx(east)]
+    assert bounds["lat_max"] == [pytest.approx(north)]
+
+
+def test_vectorized_bounds_match_the_python_path(monkeypatch):
+    pytest.importorskip("numpy")
+    rng = random.Random(3)
+    rects = [(x, y, x + rng.randrange(3), y + rng.randrange(3))
+             for x, y in ((rng.randrange(1000), rng.randrange(1000)) for _ in range(tile_rects.VECTORIZE_MIN))]
+
+    vectorized = rect_bounds(rects, 10)
+    monkeypatch.setattr(tile_rects, "np", None)
+    python = rect_bounds(rects, 10)
+    for field in ("lon_min", "lat_min", "lon_max", "lat_max"):
+        assert vectorized[field] == pytest.approx(python[field])
@@ -0,0 +1,129 @@
+"""
+Unit tests for "already have" tokens and the viewport diff (app/utils/viewport_diff.py).
+"""
+import json
+import base64
+import pytest
+from app.core.config import settings
+from app.utils.bridge_service import tile_to_bbox
+from app.utils.viewport_diff import decode_have_token, diff_tile_rows, have_token
+
+ZOOM = 10
+TILES = [[293, 386], [294, 386], [293, 387]]
+
+
+def bridge(number: str, x: int, y: int, lowest_rating=None, fx: float = 0.5) -> dict:
+    lat_min, lat_max, lon_min, lon_max = tile_to_bbox(x, y, ZOOM)
+    return {
+        "structure_number_008": number,
+        "lat_016": (lat_min + lat_max) / 2,
+        "long_017": lon_min + (lon_max - lon_min) * fx,
+        "lowest_rating": lowest_rating,
+    }
+
+
+def numbers(rows: list) -> list:
+    return [row["structure_number_008"] for row in rows]
+
+
+def encode(payload: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_token_round_trip():
+    rows = [bridge("A", 293, 386, 3), bridge("B", 294, 386, 5)]
+    token = decode_have_token(have_token(7, "lowestRating", ZOOM, TILES, rows, limit=2))
+
+    assert token["version"] == 7
+    assert token["filter_key"] == "lowestRating"
+    assert (token["zoom"], token["x0"], token["y0"], token["width"], token["height"]) == (ZOOM, 293, 386, 2, 2)
+    # Bits cover the three requested tiles of the 2 x 2 box, not (294, 387)
+    assert token["bitmap"] == bytes([0b0111])
+    # With `limit` rows the client holds everything ranked up to the last one
+    assert not token["complete"]
+    assert token["cursor"] == [5, "B"]
+
+
+def test_token_with_fewer_rows_than_limit_is_complete():
+    token = decode_have_token(have_token(7, "lowestRating", ZOOM, TILES, [bridge("A", 293, 386, 3)], limit=2))
+    assert token["complete"]
+    assert token["cursor"] is None
+
+
+def test_no_token_for_a_too_large_area():
+    tiles = [[0, 0], [settings.TILE_HAVE_MAX_AREA, 0]]
+    assert have_token(7, "lowestRating", ZOOM, tiles, [], limit=10) is None
+
+
+@pytest.mark.parametrize("token", [
+    "not base64!",
+    encode([7, "lowestRating", ZOOM, 293, 386]),
+    encode([7, "lowestRating", 31, 293, 386, 1, 1, "AQ==", 1, None]),
+    encode([7, "lowestRating", ZOOM, 293, 386, 0, 1, "", 1, None]),
+    encode([7, "lowestRating", ZOOM, 293, 386, 2, 2, "AQID", 1, None]),
+    encode([7, "lowestRating", ZOOM, 293, 386, 1, 1, "AQ==", 0, None]),
+    encode([7, "lowestRating", ZOOM, 293, 386, 1, 1, "AQ==", 0, [3, 4]]),
+])
+def test_malformed_tokens_are_rejected(token):
+    with pytest.raises(ValueError):
+        decode_have_token(token)
+
+
+def test_complete_token_drops_every_row_of_its_tiles():
+    first = [bridge("A", 293, 386, 3), bridge("B", 294, 386, 5)]
+    token = decode_have_token(have_token(7, "lowestRating", ZOOM, TILES, first, limit=10))
+
+    # Panning right: (295, 386) is new, the others are held in full
+    rows = first + [bridge("C", 295, 386, 1)]
+    tiles = TILES + [[295, 386]]
+    remaining, _ = diff_tile_rows(rows, [token], 7, "lowestRating", ZOOM, tiles, limit=10)
+    assert numbers(remaining) == ["C"]
+
+
+def test_cursor_token_drops_only_rows_ranked_up_to_the_cursor():
+    first = [bridge("A", 293, 386, 2), bridge("B", 294, 386, 4)]
+    token = decode_have_token(have_token(7, "lowestRating", ZOOM, TILES, first, limit=2))
+
+    rows = [
+        bridge("A", 293, 386, 2),
+        bridge("B", 294, 386, 4),
+        bridge("Ba", 294, 386, 4, fx=0.3),     # same value, ranked after "B"
+        bridge("AB", 293, 386, 4, fx=0.3),     # same value, ranked before "B"
+        bridge("N", 293, 387, None),           # NULLs rank last
+    ]
+    remaining, _ = diff_tile_rows(rows, [token], 7, "lowestRating", ZOOM, TILES, limit=10)
+    assert numbers(remaining) == ["Ba", "N"]
+
+
+def test_descending_cursor_for_highest_adt():
+    first = [dict(bridge("A", 293, 386), adt_029=900), dict(bridge("B", 293, 386), adt_029=500)]
+    token = decode_have_token(have_token(7, "highestADT", ZOOM, TILES, first, limit=2))
+    assert token["cursor"] == [500, "B"]
+
+    rows = first + [dict(bridge("C", 293, 386), adt_029=700), dict(bridge("D", 293, 386), adt_029=100)]
+    remaining, _ = diff_tile_rows(rows, [token], 7, "highestADT", ZOOM, TILES, limit=10)
+    assert numbers(remaining) == ["D"]
+
+
+def test_tokens_of_another_version_or_filter_key_are_ignored():
+    rows = [bridge("A", 293, 386, 3)]
+    token = decode_have_token(have_token(7, "lowestRating", ZOOM, TILES, rows, limit=10))
+
+    assert numbers(diff_tile_rows(rows, [token], 8, "lowestRating", ZOOM, TILES, 10)[0]) == ["A"]
+    assert numbers(diff_tile_rows(rows, [token], 7, "worstBridgeCondition", ZOOM, TILES, 10)[0]) == ["A"]
+
+
+def test_token_from_another_zoom_covers_the_same_area():
+    rows = [bridge("A", 293, 386, 3)]
+    token = decode_have_token(have_token(7, "lowestRating", ZOOM, TILES, rows, limit=10))
+
+    # Zooming in: the zoom-11 children of (293, 386) lie inside the held zoom-10 tile
+    remaining, _ = diff_tile_rows(rows, [token], 7, "lowestRating", ZOOM + 1, [[586, 772], [587, 773]], 10)
+    assert remaining == []
+
+
+def test_forged_cursor_type_only_means_more_rows():
+    token = decode_have_token(encode([7, "lowestRating", ZOOM, 293, 386, 1, 1, "AQ==", 0, ["x", "B"]]))
+    rows = [bridge("A", 293, 386, 3)]
+    remaining, _ = diff_tile_rows(rows, [token], 7, "lowestRating", ZOOM, TILES, 10)
+    assert numbers(remaining) == ["A"]
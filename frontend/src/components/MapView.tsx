@@ -50,25 +50,21 @@ export default function MapView() {
     adtOp: ">=",
   });
 
-  // List of bridges to display
-  const [bridges, setBridges] = useState<Bridge[]>([]);
-
   // Re-fetch bridges whenever filter changes
   useEffect(() => {
-    setBridges([]);
     clearCache();
     if (mapRef.current) {
       mapRef.current.fire("moveend");
     }
   }, [filters.mainFilter, filters.limit]);
 
-  // Tile fetcher hook handles spatial fetching logic
-  const { mapRef, onMoveEnd, clearCache } = useTileFetcher({
+  // Tile fetcher hook handles spatial fetching logic and holds the fetched bridges
+  const { mapRef, onMoveEnd, clearCache, bridges, revision } = useTileFetcher({
     mainFilter: filters.mainFilter,
     limit: filters.limit,
 
     // Backend tile fetch function triggered by map movement or zoom level changes
-    fetchFromBackend: async (zoom, tileKeys, filterKey) => {
+    fetchFromBackend: async (zoom, tileKeys, filterKey, have) => {
       // Convert tileKeys like "tile_5_7" into [x, y] pairs
       const tiles = tileKeys.map((key) => {
         const [, x, y] = key.split("_").map(Number);
@@ -92,21 +88,19 @@ export default function MapView() {
           headers: {
             "Content-Type": "application/json",
           },
-          body: JSON.stringify({ tiles, zoom, mode }),
+          // `have` lists what we already hold, so only missing bridges come back
+          body: JSON.stringify({ tiles, zoom, mode, have }),
         }
       );
 
       if (!res.ok) {
         console.error("❌ Failed to fetch bridges");
-        return [];
+        return { bridges: [], have: null };
       }
 
-      const bridges = await res.json();
-      return bridges;
+      const bridges: Bridge[] = await res.json();
+      return { bridges, have: res.headers.get("X-Tile-Have") };
     },
-
-    // Callback to update global bridge state when new data is loaded
-    setBridges,
   });
 
   // Memoize the filtered bridge list to avoid unnecessary recalculations on every render
@@ -123,7 +117,7 @@ export default function MapView() {
     };
 
     // Filter bridge list based on active sub-filters:
-    return bridges.filter(
+    return Array.from(bridges.values()).filter(
       (b) =>
         compare(b.year_built_027, filters.yearFilter, filters.yearOp) &&
         compare(
@@ -134,7 +128,7 @@ export default function MapView() {
         compare(b.deck_area, filters.deckArea, filters.deckAreaOp) &&
         compare(b.adt_029, filters.adt, filters.adtOp)
     );
-  }, [bridges, filters]); // useMemo dependencies: re-run only when bridges or filters change
+  }, [bridges, revision, filters]); // useMemo dependencies: re-run only when bridges or filters change
 
   // Initial fetch when map is ready
   useEffect(() => {
@@ -168,8 +162,8 @@ export default function MapView() {
           <MapEventHandler onMoveEnd={onMoveEnd} />
 
           {/* Render filtered bridge markers */}
-          {finalFiltered.map((bridge, i) => (
-            <Marker key={i} position={[bridge.lat_016, bridge.long_017]}>
+          {finalFiltered.map((bridge) => (
+            <Marker key={bridge.structure_number_008} position={[bridge.lat_016, bridge.long_017]}>
               <Popup>
                 <BridgePopup bridge={bridge} map={mapRef.current} />
               </Popup>
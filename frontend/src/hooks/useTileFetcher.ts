@@ -31,9 +31,11 @@ function getTileKeys(map: L.Map, zoom: number) {
   const { x: x1, y: y1 } = latLngToTile(sw.lat, sw.lng, zoom);
   const { x: x2, y: y2 } = latLngToTile(ne.lat, ne.lng, zoom);
 
+  // Only tiles that exist at this zoom (the map can be panned past the world's edges)
+  const n = 2 ** zoom;
   const keys: string[] = [];
-  for (let x = x1; x <= x2; x++) {
-    for (let y = Math.min(y1, y2); y <= Math.max(y1, y2); y++) {
+  for (let x = Math.max(x1, 0); x <= Math.min(x2, n - 1); x++) {
+    for (let y = Math.max(Math.min(y1, y2), 0); y <= Math.min(Math.max(y1, y2), n - 1); y++) {
       keys.push(`${zoom}_${x}_${y}`);
     }
   }
@@ -41,28 +43,40 @@ function getTileKeys(map: L.Map, zoom: number) {
   return keys;
 }
 
+// The server accepts this many "already have" tokens per request; older ones are dropped
+const MAX_HAVE_TOKENS = 64;
+
 // Hook for tile-based bridge data fetching with caching
 export function useTileFetcher({
   mainFilter,
   limit,
   fetchFromBackend,
-  setBridges,
 }: {
   mainFilter: string;
   limit: number;
   fetchFromBackend: (
     zoom: number,
     tileKeys: string[],
-    filterKey: string
-  ) => Promise<Bridge[]>;
-  setBridges: React.Dispatch<React.SetStateAction<Bridge[]>>;
+    filterKey: string,
+    have: string[]
+  ) => Promise<{ bridges: Bridge[]; have: string | null }>;
 }) {
   // Cache of already fetched tile keys to avoid duplicate requests
   const tileCache = useRef<Record<string, Set<string>>>({});
 
-  // Clears all cached tiles (useful when filter changes)
+  // "Already have" tokens from tile responses per filterKey, sent back so the server skips bridges we hold
+  const haveTokens = useRef<Record<string, string[]>>({});
+
+  // Fetched bridges indexed by structure number; `revision` changes whenever bridges are added
+  const bridgeIndex = useRef<Map<string, Bridge>>(new Map());
+  const [revision, setRevision] = useState(0);
+
+  // Clears all cached tiles, tokens and bridges (useful when filter changes)
   const clearCache = () => {
     tileCache.current = {};
+    haveTokens.current = {};
+    bridgeIndex.current = new Map();
+    setRevision((r) => r + 1);
   };
 
   // Ref to store the Leaflet map instance
@@ -93,22 +107,38 @@ export function useTileFetcher({
     // If all tiles are cached, skip fetch
     if (newTileKeys.length === 0) return;
 
-    // Fetch bridge data for new tiles
-    const newBridges = await fetchFromBackend(zoom, newTileKeys, filterKey);
-
-    // Merge new data while avoiding duplicates
-    setBridges((prev) => {
-      const seen = new Set(prev.map((b) => b.structure_number_008));
-      return [
-        ...prev,
-        ...newBridges.filter((b) => !seen.has(b.structure_number_008)),
-      ];
-    });
+    // Fetch only the bridges of the new tiles that our tokens don't already cover
+    const { bridges: newBridges, have } = await fetchFromBackend(
+      zoom,
+      newTileKeys,
+      filterKey,
+      haveTokens.current[filterKey] ?? []
+    );
+
+    if (have) {
+      const tokens = (haveTokens.current[filterKey] ??= []);
+      tokens.push(have);
+      if (tokens.length > MAX_HAVE_TOKENS) {
+        tokens.splice(0, tokens.length - MAX_HAVE_TOKENS);
+      }
+    }
+
+    // Merge into the index; only the new bridges are touched
+    let added = 0;
+    for (const bridge of newBridges) {
+      if (!bridgeIndex.current.has(bridge.structure_number_008)) {
+        bridgeIndex.current.set(bridge.structure_number_008, bridge);
+        added++;
+      }
+    }
+    if (added > 0) setRevision((r) => r + 1);
   };
 
   return {
     mapRef,
     onMoveEnd,
     clearCache,
+    bridges: bridgeIndex.current,
+    revision,
   };
 }